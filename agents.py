@@ -1,5 +1,5 @@
 from crewai import Agent
-from tools import WebSearchTool, HeldraAPITool, FFMPEGTool, PostToSocialTool
+from tools import WebSearchTool, HeldraAPITool, FFMPEGTool, PostToSocialTool, CoverageCheckTool
 from config import Config
 
 class BabyTaxVideoAgents:
@@ -10,6 +10,7 @@ class BabyTaxVideoAgents:
         self.heldra_api_tool = HeldraAPITool()
         self.ffmpeg_tool = FFMPEGTool()
         self.social_media_tool = PostToSocialTool()
+        self.coverage_check_tool = CoverageCheckTool()
     
     def trend_researcher(self):
         """Agent responsible for finding trending topics."""
@@ -20,7 +21,7 @@ class BabyTaxVideoAgents:
             viral content, and cultural moments. You have a knack for identifying topics that resonate 
             with audiences and can be creatively tied to tax-related content. You understand what makes 
             content go viral and can spot opportunities for engaging, shareable content.""",
-            tools=[self.web_search_tool],
+            tools=[self.coverage_check_tool, self.web_search_tool],
             verbose=True,
             max_iter=3,
             memory=True
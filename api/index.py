@@ -4,16 +4,27 @@ McLan Tax Baby Video Creator - Vercel Deployment
 Serverless Flask app for Vercel deployment
 """
 
-from flask import Flask, jsonify, request, render_template_string
+from flask import Flask, Response, jsonify, request
 import json
 import os
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
 import uuid
 import time
 
+# The function bundle keeps the repo layout; shared modules live one level up
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assets import asset_url
+from json_provider import init_json
+from queries import parse_bulk_actions, parse_fields
+from storage import get_store
+
 app = Flask(__name__)
+init_json(app)
 
-# HTML Template (inline since Vercel has issues with template folders)
+# HTML shell (inline since Vercel has issues with template folders); the
+# dashboard itself is the prebuilt bundle from build_assets.py
 DASHBOARD_HTML = """
 <!DOCTYPE html>
 <html lang="en">
@@ -21,286 +32,25 @@ DASHBOARD_HTML = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>🍼 McLan Tax Baby Video Dashboard</title>
-    <script src="https://unpkg.com/react@18/umd/react.development.js"></script>
-    <script src="https://unpkg.com/react-dom@18/umd/react-dom.development.js"></script>
-    <script src="https://unpkg.com/@babel/standalone/babel.min.js"></script>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <style>
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-        }
-        .card {
-            background: rgba(255, 255, 255, 0.95);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255, 255, 255, 0.2);
-        }
-        .baby-gradient {
-            background: linear-gradient(45deg, #ff9a9e 0%, #fecfef 50%, #fecfef 100%);
-        }
-        .viral-button {
-            background: linear-gradient(45deg, #ff6b6b, #ee5a24);
-            transition: all 0.3s ease;
-        }
-        .viral-button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 10px 20px rgba(238, 90, 36, 0.3);
-        }
-        .reject-button {
-            background: linear-gradient(45deg, #ff6b6b, #c44569);
-        }
-        .reject-button:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 10px 20px rgba(196, 69, 105, 0.3);
-        }
-        .stat-card {
-            background: rgba(255, 255, 255, 0.1);
-            backdrop-filter: blur(15px);
-            border: 1px solid rgba(255, 255, 255, 0.2);
-        }
-    </style>
+    <link rel="preconnect" href="https://unpkg.com" crossorigin>
+    <script src="https://unpkg.com/react@18.3.1/umd/react.production.min.js" crossorigin defer></script>
+    <script src="https://unpkg.com/react-dom@18.3.1/umd/react-dom.production.min.js" crossorigin defer></script>
+    <link rel="stylesheet" href="{css_url}">
+    <script src="{js_url}" defer></script>
 </head>
 <body>
     <div id="dashboard-root"></div>
-
-    <script type="text/babel">
-        const { useState, useEffect } = React;
-
-        function Dashboard() {
-            const [videos, setVideos] = useState([]);
-            const [stats, setStats] = useState({});
-            const [loading, setLoading] = useState(true);
-            const [generating, setGenerating] = useState(false);
-
-            useEffect(() => {
-                fetchVideos();
-                fetchStats();
-                const interval = setInterval(() => {
-                    fetchVideos();
-                    fetchStats();
-                }, 30000);
-                return () => clearInterval(interval);
-            }, []);
-
-            const fetchVideos = async () => {
-                try {
-                    const response = await fetch('/api/videos');
-                    const data = await response.json();
-                    setVideos(data);
-                    setLoading(false);
-                } catch (error) {
-                    console.error('Error fetching videos:', error);
-                    setLoading(false);
-                }
-            };
-
-            const fetchStats = async () => {
-                try {
-                    const response = await fetch('/api/stats');
-                    const data = await response.json();
-                    setStats(data);
-                } catch (error) {
-                    console.error('Error fetching stats:', error);
-                }
-            };
-
-            const handleApprove = async (id) => {
-                try {
-                    const response = await fetch(`/api/videos/${id}/approve`, { 
-                        method: 'POST' 
-                    });
-                    const result = await response.json();
-                    
-                    if (result.success) {
-                        setVideos(prev => prev.filter(v => v.id !== id));
-                        fetchStats();
-                        alert(`✅ Video approved and posted to: ${result.platforms.join(', ')}`);
-                    }
-                } catch (error) {
-                    console.error('Error approving video:', error);
-                    alert('Error approving video');
-                }
-            };
-
-            const handleReject = async (id) => {
-                try {
-                    const response = await fetch(`/api/videos/${id}/reject`, { 
-                        method: 'POST' 
-                    });
-                    const result = await response.json();
-                    
-                    if (result.success) {
-                        setVideos(prev => prev.filter(v => v.id !== id));
-                        fetchStats();
-                        alert('❌ Video rejected');
-                    }
-                } catch (error) {
-                    console.error('Error rejecting video:', error);
-                    alert('Error rejecting video');
-                }
-            };
-
-            const handleGenerateVideo = async () => {
-                setGenerating(true);
-                try {
-                    const response = await fetch('/api/videos/generate', {
-                        method: 'POST'
-                    });
-                    const result = await response.json();
-                    
-                    if (result.success) {
-                        alert('🍼 New baby video generated! Refreshing...');
-                        setTimeout(() => {
-                            fetchVideos();
-                            fetchStats();
-                        }, 1000);
-                    }
-                } catch (error) {
-                    console.error('Error generating video:', error);
-                    alert('Error generating video');
-                } finally {
-                    setGenerating(false);
-                }
-            };
-
-            if (loading) {
-                return (
-                    <div className="min-h-screen flex items-center justify-center">
-                        <div className="text-white text-center">
-                            <div className="text-6xl mb-4">🍼</div>
-                            <div className="text-2xl font-bold">Loading Baby Videos...</div>
-                        </div>
-                    </div>
-                );
-            }
-
-            return (
-                <div className="min-h-screen p-6">
-                    <div className="max-w-7xl mx-auto">
-                        <div className="text-center mb-8">
-                            <h1 className="text-5xl font-bold text-white mb-4">
-                                🍼 McLan Tax Baby Video Dashboard
-                            </h1>
-                            <p className="text-xl text-white opacity-90">
-                                AI-Powered Viral Content Creation & Management
-                            </p>
-                        </div>
-
-                        <div className="grid grid-cols-1 md:grid-cols-4 gap-6 mb-8">
-                            <div className="stat-card rounded-2xl p-6 text-center text-white">
-                                <div className="text-3xl font-bold">{stats.pending || 0}</div>
-                                <div className="text-sm opacity-80">⏳ Pending Review</div>
-                            </div>
-                            <div className="stat-card rounded-2xl p-6 text-center text-white">
-                                <div className="text-3xl font-bold">{stats.approved || 0}</div>
-                                <div className="text-sm opacity-80">✅ Approved</div>
-                            </div>
-                            <div className="stat-card rounded-2xl p-6 text-center text-white">
-                                <div className="text-3xl font-bold">{stats.total_videos || 0}</div>
-                                <div className="text-sm opacity-80">📊 Total Videos</div>
-                            </div>
-                            <div className="stat-card rounded-2xl p-6 text-center text-white">
-                                <div className="text-3xl font-bold">{stats.recent_videos || 0}</div>
-                                <div className="text-sm opacity-80">📅 This Week</div>
-                            </div>
-                        </div>
-
-                        <div className="text-center mb-8">
-                            <button 
-                                onClick={handleGenerateVideo}
-                                disabled={generating}
-                                className="viral-button text-white px-8 py-4 rounded-full text-lg font-bold shadow-lg disabled:opacity-50"
-                            >
-                                {generating ? '🔄 Generating...' : '🚀 Generate New Baby Video'}
-                            </button>
-                        </div>
-
-                        {videos.length === 0 ? (
-                            <div className="text-center text-white">
-                                <div className="text-6xl mb-4">👶</div>
-                                <div className="text-2xl font-bold mb-2">No videos pending review</div>
-                                <div className="text-lg opacity-80">Generate some baby content to get started!</div>
-                            </div>
-                        ) : (
-                            <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6">
-                                {videos.map((video) => (
-                                    <div key={video.id} className="card rounded-2xl shadow-xl overflow-hidden">
-                                        <div className="baby-gradient p-4">
-                                            <h2 className="text-xl font-bold text-gray-800 mb-2">
-                                                🔥 {video.trend}
-                                            </h2>
-                                            <div className="text-sm text-gray-600">
-                                                📅 {new Date(video.created_at).toLocaleDateString()}
-                                            </div>
-                                        </div>
-                                        
-                                        <div className="p-6 space-y-4">
-                                            <div className="bg-gray-50 p-4 rounded-lg">
-                                                <div className="text-sm font-semibold text-gray-600 mb-2">👶 Baby Script:</div>
-                                                <p className="italic text-gray-800 text-sm leading-relaxed">
-                                                    "{video.script}"
-                                                </p>
-                                            </div>
-
-                                            <div className="bg-gray-100 p-4 rounded-lg text-center">
-                                                <div className="text-6xl mb-2">🎬</div>
-                                                <div className="text-sm text-gray-600">Video Preview</div>
-                                                <div className="text-xs text-gray-500 mt-1">
-                                                    {video.videoUrl}
-                                                </div>
-                                            </div>
-
-                                            <div className="space-y-2">
-                                                <div className="text-sm font-semibold text-gray-600">📱 Platform Captions:</div>
-                                                
-                                                <div className="bg-pink-50 p-3 rounded-lg">
-                                                    <div className="text-xs font-semibold text-pink-700 mb-1">📺 TikTok:</div>
-                                                    <div className="text-xs text-gray-700">{video.captions.tiktok}</div>
-                                                </div>
-                                                
-                                                <div className="bg-purple-50 p-3 rounded-lg">
-                                                    <div className="text-xs font-semibold text-purple-700 mb-1">📸 Instagram:</div>
-                                                    <div className="text-xs text-gray-700">{video.captions.instagram}</div>
-                                                </div>
-                                                
-                                                <div className="bg-red-50 p-3 rounded-lg">
-                                                    <div className="text-xs font-semibold text-red-700 mb-1">▶️ YouTube:</div>
-                                                    <div className="text-xs text-gray-700">{video.captions.youtube}</div>
-                                                </div>
-                                            </div>
-
-                                            <div className="flex gap-3 pt-4">
-                                                <button 
-                                                    onClick={() => handleApprove(video.id)} 
-                                                    className="viral-button flex-1 text-white py-3 px-4 rounded-lg font-semibold text-sm"
-                                                >
-                                                    ✅ Approve & Post
-                                                </button>
-                                                <button 
-                                                    onClick={() => handleReject(video.id)} 
-                                                    className="reject-button flex-1 text-white py-3 px-4 rounded-lg font-semibold text-sm"
-                                                >
-                                                    ❌ Reject
-                                                </button>
-                                            </div>
-                                        </div>
-                                    </div>
-                                ))}
-                            </div>
-                        )}
-                    </div>
-                </div>
-            );
-        }
-
-        ReactDOM.render(<Dashboard />, document.getElementById('dashboard-root'));
-    </script>
 </body>
 </html>
 """
 
-# In-memory storage for Vercel (resets on each function call, but works for demo)
+# Rendered once per instance: asset URLs only change with a new deployment
+DASHBOARD_PAGE = DASHBOARD_HTML.format(
+    css_url=asset_url('dashboard.css'),
+    js_url=asset_url('dashboard.js')
+)
+
+# Seed videos for a fresh store
 SAMPLE_DATA = {
     'videos': [
         {
@@ -332,44 +82,73 @@ SAMPLE_DATA = {
     ]
 }
 
-# Simple data store (resets with each serverless function call)
-current_data = SAMPLE_DATA.copy()
+# Simulated posting targets
+POSTED_PLATFORMS = ['tiktok', 'instagram', 'youtube_shorts']
+
+# Hosted Postgres by default (DATABASE_URL or POSTGRES_URL): /tmp is wiped
+# on every cold start, so sqlite/jsonl files there are refused, and
+# STORAGE_BACKEND=memory has to be chosen by name for a throwaway demo
+store = get_store(os.getenv('STORAGE_BACKEND', 'postgres'), allow_ephemeral=False)
+if store.version() == 0:
+    for video in SAMPLE_DATA['videos']:
+        store.add(video)
 
 # API Routes
 @app.route('/')
 def dashboard():
     """Serve the main dashboard page."""
-    return render_template_string(DASHBOARD_HTML)
+    return Response(DASHBOARD_PAGE, mimetype='text/html', headers={'Cache-Control': 'no-cache'})
 
 @app.route('/api/videos', methods=['GET'])
 def get_videos():
-    """Get all videos."""
+    """Get one page of videos with a status (default pending), newest first (archived=1 for archived ones)."""
     try:
         status = request.args.get('status', 'pending')
+        limit = request.args.get('limit', 20, type=int)
+        fields = parse_fields(request.args.get('fields'))
         
-        # Filter videos by status
-        filtered_videos = [v for v in current_data['videos'] if v['status'] == status]
-        
-        return jsonify(filtered_videos)
+        list_page = store.list_archived if request.args.get('archived') in ('1', 'true') else store.list
+        video_list, next_cursor = list_page(status, limit, request.args.get('cursor'), fields)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    response = jsonify(video_list)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@app.route('/api/videos/search', methods=['GET'])
+def search_videos():
+    """Full-text search over trends, scripts and captions, best match first, with <mark>ed snippets."""
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        results = store.search(
+            request.args.get('q', ''),
+            request.args.get('status') or None,
+            request.args.get('limit', 20, type=int),
+            fields
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+    
+    return jsonify(results)
 
 @app.route('/api/videos/<video_id>/approve', methods=['POST'])
 def approve_video(video_id):
     """Approve a video."""
     try:
-        # Find and update video
-        for video in current_data['videos']:
-            if video['id'] == video_id:
-                video['status'] = 'approved'
-                video['approved_at'] = datetime.now().isoformat()
-                video['posted_platforms'] = ['tiktok', 'instagram', 'youtube_shorts']
-                break
+        found, = store.review([(video_id, 'approve')], {'posted_platforms': POSTED_PLATFORMS})
+        if not found:
+            return jsonify({'success': False, 'message': 'Video not found'}), 404
         
         return jsonify({
             'success': True,
             'message': 'Video approved and posted to all platforms',
-            'platforms': ['tiktok', 'instagram', 'youtube_shorts']
+            'platforms': POSTED_PLATFORMS
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -378,16 +157,39 @@ def approve_video(video_id):
 def reject_video(video_id):
     """Reject a video."""
     try:
-        # Find and update video
-        for video in current_data['videos']:
-            if video['id'] == video_id:
-                video['status'] = 'rejected'
-                break
+        found, = store.review([(video_id, 'reject')])
+        if not found:
+            return jsonify({'success': False, 'message': 'Video not found'}), 404
         
         return jsonify({'success': True, 'message': 'Video rejected'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/videos/bulk', methods=['POST'])
+def bulk_review_videos():
+    """Approve and/or reject many videos at once, with a result per id."""
+    try:
+        items = parse_bulk_actions(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        found = store.review(items, {'posted_platforms': POSTED_PLATFORMS})
+        results = []
+
+        for (video_id, action), success in zip(items, found):
+            result = {'id': video_id, 'action': action, 'success': success}
+            if not success:
+                result['message'] = 'Video not found'
+            results.append(result)
+
+        updated = sum(1 for result in results if result['success'])
+        if not updated:
+            return jsonify({'success': False, 'message': 'Videos not found', 'updated': 0, 'results': results}), 404
+        return jsonify({'success': updated == len(results), 'updated': updated, 'results': results})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/videos/generate', methods=['POST'])
 def generate_video():
     """Generate a new video."""
@@ -421,7 +223,7 @@ def generate_video():
         scenario = random.choice(mock_scenarios)
         
         new_video = {
-            'id': f'generated-{int(time.time())}',
+            'id': f'generated-{uuid.uuid4().hex[:12]}',
             'trend': scenario['trend'],
             'script': scenario['script'],
             'videoUrl': f'https://example.com/videos/baby_tax_video_{int(time.time())}.mp4',
@@ -434,31 +236,22 @@ def generate_video():
             'created_at': datetime.now().isoformat()
         }
         
-        current_data['videos'].append(new_video)
+        store.add(new_video)
         
         return jsonify({'success': True, 'message': 'New baby video generated successfully!'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """No live stream on serverless; 204 tells EventSource to stop and the dashboard to poll."""
+    return '', 204
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get dashboard statistics."""
     try:
-        pending = len([v for v in current_data['videos'] if v['status'] == 'pending'])
-        approved = len([v for v in current_data['videos'] if v['status'] == 'approved'])
-        rejected = len([v for v in current_data['videos'] if v['status'] == 'rejected'])
-        
-        # Recent videos (last 7 days)
-        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
-        recent = len([v for v in current_data['videos'] if v.get('created_at', '2025-01-13T12:00:00') > week_ago])
-        
-        return jsonify({
-            'pending': pending,
-            'approved': approved,
-            'rejected': rejected,
-            'recent_videos': recent,
-            'total_videos': len(current_data['videos'])
-        })
+        return jsonify(store.stats())
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+McLan Tax Baby Video Creator - Archival
+Moves old rejected and posted videos into an archive database and compacts the live one
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+from config import Config
+import db
+from queries import VIDEO_COLUMNS
+
+# Same table name as the live database, so the shared queries read both
+ARCHIVE_SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS videos (
+        id TEXT PRIMARY KEY,
+        trend TEXT NOT NULL,
+        script TEXT NOT NULL,
+        video_url TEXT,
+        captions TEXT,
+        status TEXT,
+        created_at TIMESTAMP,
+        approved_at TIMESTAMP,
+        rejected_at TIMESTAMP,
+        posted_platforms TEXT,
+        change_seq INTEGER,
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS videos_status_created_at ON videos (status, created_at, id)'
+)
+
+# Outbox states that still need the live row (posting, or awaiting a human)
+OPEN_POST_STATES = ('queued', 'sending', 'unconfirmed')
+
+def archive_path(db_path: Optional[str] = None) -> str:
+    """The archive database for a live one (ARCHIVE_DATABASE_PATH, else <database>_archive.db)."""
+    if Config.ARCHIVE_DATABASE_PATH:
+        return Config.ARCHIVE_DATABASE_PATH
+    root, ext = os.path.splitext(db_path or Config.DATABASE_PATH)
+    return f"{root}_archive{ext or '.db'}"
+
+def init_archive(path: str):
+    """Create the archive database (incremental auto-vacuum from the start)."""
+    # auto_vacuum only takes effect on an empty file, so it is set before
+    # db.connect() switches the journal to WAL
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('PRAGMA journal_mode = WAL')
+        for statement in ARCHIVE_SCHEMA:
+            conn.execute(statement)
+        # Archives created before rejections had their own timestamp
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(videos)')]
+        if 'rejected_at' not in columns:
+            conn.execute('ALTER TABLE videos ADD COLUMN rejected_at TIMESTAMP')
+        conn.commit()
+    finally:
+        conn.close()
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM main.sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone() is not None
+
+def archivable_ids(conn: sqlite3.Connection, rejected_days: int, approved_days: int, limit: int) -> List[str]:
+    """
+    Ids of live videos past their retention window, oldest first.
+
+    Each status ages from its own review timestamp: rejected videos from
+    rejected_at, approved ones from approved_at, and only once none of
+    their outbox posts is still open. Videos reviewed before those were
+    recorded age from created_at. Pending videos are never archived.
+    Timestamps are UTC, like julianday('now').
+    """
+    open_posts = ''
+    if _table_exists(conn, 'post_outbox'):
+        open_posts = f'''
+            AND NOT EXISTS (
+                SELECT 1 FROM main.post_outbox AS o
+                WHERE o.video_id = v.id AND o.status IN ({', '.join('?' * len(OPEN_POST_STATES))})
+            )
+        '''
+
+    rows = conn.execute(f'''
+        SELECT id FROM (
+            SELECT id, julianday(COALESCE(rejected_at, created_at)) AS aged_at FROM main.videos
+            WHERE status = 'rejected'
+              AND julianday(COALESCE(rejected_at, created_at)) < julianday('now', ?)
+            UNION ALL
+            SELECT v.id, julianday(COALESCE(v.approved_at, v.created_at)) AS aged_at FROM main.videos AS v
+            WHERE v.status = 'approved'
+              AND julianday(COALESCE(v.approved_at, v.created_at)) < julianday('now', ?)
+              {open_posts}
+        )
+        ORDER BY aged_at LIMIT ?
+    ''', (f'-{rejected_days} days', f'-{approved_days} days', *(OPEN_POST_STATES if open_posts else ()), limit))
+    return [row[0] for row in rows]
+
+def _move_batch(conn: sqlite3.Connection, ids: List[str]) -> int:
+    """Copy videos to the archive, then delete them from the live database."""
+    marks = ', '.join('?' * len(ids))
+    columns = ', '.join(VIDEO_COLUMNS.values())
+
+    # 1. Copy. Committed on its own, so a crash before step 2 leaves a
+    #    duplicate that the next run overwrites, never a lost video
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute(f'''
+            INSERT OR REPLACE INTO archive.videos ({columns}, change_seq)
+            SELECT {columns}, change_seq FROM main.videos WHERE id IN ({marks})
+        ''', ids)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+    # 2. Delete only rows unchanged since the copy; triggers take care of
+    #    status counters, the search index and tombstones
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        deleted = conn.execute(f'''
+            DELETE FROM main.videos
+            WHERE id IN ({marks})
+              AND (id, change_seq) IN (SELECT id, change_seq FROM archive.videos WHERE id IN ({marks}))
+        ''', ids + ids).rowcount
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return deleted
+
+def incremental_vacuum(conn: sqlite3.Connection, schema: str = 'main', enable: bool = False) -> int:
+    """
+    Hand a database's free pages back to the filesystem.
+
+    auto_vacuum can only be switched on by a full VACUUM, which rewrites
+    the whole file under an exclusive lock, so a database created before
+    it was enabled is only rebuilt when `enable` is set (--enable-auto-vacuum).
+    Until then its free pages stay in the file for SQLite to reuse. After
+    that each run just truncates the free pages. Returns the number of
+    pages freed.
+    """
+    if conn.execute(f'PRAGMA {schema}.auto_vacuum').fetchone()[0] != 2:
+        if not enable:
+            return 0
+        print(f"🧹 Enabling incremental auto-vacuum on {schema} (one-time full VACUUM)...")
+        free_pages = conn.execute(f'PRAGMA {schema}.freelist_count').fetchone()[0]
+        conn.execute(f'PRAGMA {schema}.auto_vacuum = INCREMENTAL')
+        conn.execute(f'VACUUM {schema}')
+        return free_pages
+
+    free_pages = conn.execute(f'PRAGMA {schema}.freelist_count').fetchone()[0]
+    if free_pages:
+        # execute() steps this pragma once (one page); executescript() runs it to the end
+        conn.executescript(f'PRAGMA {schema}.incremental_vacuum')
+    # Move the shrunken pages out of the WAL into the database file
+    conn.execute(f'PRAGMA {schema}.wal_checkpoint(TRUNCATE)').fetchall()
+    return free_pages
+
+def archive_videos(db_path: Optional[str] = None, archive_db_path: Optional[str] = None,
+                   rejected_days: Optional[int] = None, approved_days: Optional[int] = None,
+                   batch_size: int = 500, dry_run: bool = False, vacuum: bool = True,
+                   enable_auto_vacuum: bool = False) -> Dict[str, Any]:
+    """
+    Move videos past the retention window into the archive database.
+
+    Batches are short transactions, so the dashboard and workers keep
+    writing while the job runs. Archived videos leave the live lists,
+    stats and search (delta-sync clients see them as deleted) and stay
+    readable through /api/videos?archived=1.
+
+    Args:
+        db_path (str): Live database (default: DATABASE_PATH)
+        archive_db_path (str): Archive database (default: archive_path())
+        rejected_days (int): Keep rejected videos this long (default: ARCHIVE_REJECTED_DAYS)
+        approved_days (int): Keep approved videos this long after approval (default: ARCHIVE_APPROVED_DAYS)
+        batch_size (int): Videos moved per transaction
+        dry_run (bool): Only count what would be archived
+        vacuum (bool): Run an incremental vacuum afterwards
+        enable_auto_vacuum (bool): Rebuild a live database without
+            auto_vacuum with one full VACUUM (see incremental_vacuum())
+
+    Returns:
+        Dict[str, Any]: archived, candidates, pages_freed and seconds
+    """
+    db_path = db_path or Config.DATABASE_PATH
+    archive_db_path = archive_db_path or archive_path(db_path)
+    rejected_days = Config.ARCHIVE_REJECTED_DAYS if rejected_days is None else rejected_days
+    approved_days = Config.ARCHIVE_APPROVED_DAYS if approved_days is None else approved_days
+    started = time.perf_counter()
+
+    conn = db.connect(db_path, isolation_level=None)
+    try:
+        if dry_run:
+            candidates = len(archivable_ids(conn, rejected_days, approved_days, -1))
+            return {'archived': 0, 'candidates': candidates, 'pages_freed': 0,
+                    'seconds': round(time.perf_counter() - started, 3)}
+
+        init_archive(archive_db_path)
+        conn.execute('ATTACH DATABASE ? AS archive', (archive_db_path,))
+
+        archived = candidates = 0
+        while True:
+            ids = archivable_ids(conn, rejected_days, approved_days, batch_size)
+            if not ids:
+                break
+            candidates += len(ids)
+            moved = _move_batch(conn, ids)
+            archived += moved
+            # Every row in the batch changed under us; leave them for the next run
+            if moved == 0:
+                break
+
+        conn.execute('DETACH DATABASE archive')
+        pages_freed = 0
+        if enable_auto_vacuum or (vacuum and archived):
+            pages_freed = incremental_vacuum(conn, enable=enable_auto_vacuum)
+    finally:
+        conn.close()
+
+    return {'archived': archived, 'candidates': candidates, 'pages_freed': pages_freed,
+            'seconds': round(time.perf_counter() - started, 3)}
+
+def main():
+    parser = argparse.ArgumentParser(description='Archive old rejected and posted videos')
+    parser.add_argument('--rejected-days', type=int, default=None,
+                        help=f'Keep rejected videos this many days (default {Config.ARCHIVE_REJECTED_DAYS})')
+    parser.add_argument('--approved-days', type=int, default=None,
+                        help=f'Keep approved videos this many days after approval (default {Config.ARCHIVE_APPROVED_DAYS})')
+    parser.add_argument('--batch', type=int, default=500, help='Videos moved per transaction')
+    parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+    parser.add_argument('--no-vacuum', action='store_true', help='Skip the incremental vacuum')
+    parser.add_argument('--enable-auto-vacuum', action='store_true',
+                        help='One-time full VACUUM that turns on incremental vacuum for an older live database '
+                             '(locks it while the file is rewritten)')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    args = parser.parse_args()
+
+    result = archive_videos(rejected_days=args.rejected_days, approved_days=args.approved_days,
+                            batch_size=args.batch, dry_run=args.dry_run, vacuum=not args.no_vacuum,
+                            enable_auto_vacuum=args.enable_auto_vacuum)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    elif args.dry_run:
+        print(f"🔎 {result['candidates']} videos would be archived")
+    else:
+        print(f"📦 Archived {result['archived']} videos to {archive_path()} in {result['seconds']}s")
+        print(f"🧹 Freed {result['pages_freed']} pages")
+
+if __name__ == "__main__":
+    main()
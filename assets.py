@@ -0,0 +1,78 @@
+"""
+McLan Tax Baby Video Creator - Static Assets
+Content-hashed, precompressed dashboard assets and how they are served
+"""
+
+import json
+import mimetypes
+import os
+from typing import Dict
+from flask import Response, request, send_from_directory
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+SOURCE_DIR = os.path.join(STATIC_DIR, 'src')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_PATH = os.path.join(DIST_DIR, 'manifest.json')
+
+# Hashed file names change with their content, so they never need revalidating
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Precompressed variants written by build_assets.py, best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_manifest: Dict[str, str] = {}
+_manifest_mtime = None
+
+def load_manifest() -> Dict[str, str]:
+    """Source name -> hashed file name from the last build ({} if never built)."""
+    global _manifest, _manifest_mtime
+
+    try:
+        mtime = os.stat(MANIFEST_PATH).st_mtime
+    except OSError:
+        return {}
+
+    # Re-read after a rebuild without restarting the server
+    if mtime != _manifest_mtime:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            _manifest = json.load(f)
+        _manifest_mtime = mtime
+    return _manifest
+
+def asset_url(name: str) -> str:
+    """
+    URL of a dashboard asset, e.g. asset_url('dashboard.js').
+
+    Points at the hashed build when there is one, else at the source
+    file so the dashboard still loads before build_assets.py has run
+    (without the Tailwind utilities, which only the build compiles).
+    """
+    built = load_manifest().get(name)
+    return f'/static/dist/{built}' if built else f'/static/src/{name}'
+
+def send_static(filename: str) -> Response:
+    """
+    Serve a file under static/.
+
+    Hashed builds go out precompressed when the client accepts it and
+    are cached for a year; anything else is revalidated on every use.
+    """
+    if not filename.startswith('dist/'):
+        response = send_from_directory(STATIC_DIR, filename)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    response = None
+    for encoding, suffix in ENCODINGS:
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(STATIC_DIR, filename + suffix)):
+            response = send_from_directory(
+                STATIC_DIR, filename + suffix, mimetype=mimetypes.guess_type(filename)[0]
+            )
+            response.headers['Content-Encoding'] = encoding
+            break
+
+    if response is None:
+        response = send_from_directory(STATIC_DIR, filename)
+    response.headers['Cache-Control'] = IMMUTABLE
+    response.vary.add('Accept-Encoding')
+    return response
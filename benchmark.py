@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+McLan Tax Baby Video Creator - Benchmarks
+Micro-benchmarks for the storage layer and script similarity
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from typing import Any, Callable, Dict, List
+from db import ConnectionPool
+from migrations import migrate
+from queries import VIDEO_FIELDS, _rows_to_videos, _select, search_videos
+from script_similarity import _MASK64, _PERMUTATIONS, ScriptSimilarityIndex, minhash, shingles
+
+try:
+    import orjson
+except ImportError:  # Optional: the serialize benchmark skips orjson without it
+    orjson = None
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS videos (
+        id TEXT PRIMARY KEY,
+        trend TEXT NOT NULL,
+        script TEXT NOT NULL,
+        video_url TEXT,
+        captions TEXT,
+        status TEXT DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        approved_at TIMESTAMP,
+        posted_platforms TEXT
+    )
+'''
+
+CAPTIONS = json.dumps({
+    'tiktok': 'When this baby knows more about taxes than you do 😂👶 #BabyTax #TaxSeason #McLanTax #FYP',
+    'instagram': 'POV: A baby gives better tax advice than your accountant 💀 @mclantax #reels #viral #tax',
+    'youtube': 'Baby Gives SAVAGE Tax Advice (You Won\'t Believe What Happens Next!) #shorts #tax #baby'
+})
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples (0 for an empty list)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def latency_summary(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Throughput and latency percentiles (ms) for one kind of operation."""
+    return {
+        'ops': len(samples),
+        'ops_per_sec': round(len(samples) / elapsed, 1),
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3) if samples else 0.0,
+        'mean_ms': round(statistics.fmean(samples) * 1000, 3) if samples else 0.0
+    }
+
+def seed_videos(conn: sqlite3.Connection, count: int):
+    statuses = ('pending', 'approved', 'rejected')
+    conn.executemany(
+        'INSERT INTO videos (id, trend, script, video_url, captions, status) VALUES (?, ?, ?, ?, ?, ?)',
+        [(str(uuid.uuid4()), f'Trend {i}', f'Baby script number {i} about taxes 👶💰',
+          f'https://example.com/videos/{i}.mp4', CAPTIONS, statuses[i % 3]) for i in range(count)]
+    )
+    conn.commit()
+
+def read_dashboard(conn: sqlite3.Connection):
+    """What one dashboard refresh does: the review list plus the stat counters."""
+    conn.execute(
+        'SELECT * FROM videos WHERE status = ? ORDER BY created_at DESC LIMIT 20', ('pending',)
+    ).fetchall()
+    for status in ('pending', 'approved', 'rejected'):
+        conn.execute('SELECT COUNT(*) FROM videos WHERE status = ?', (status,)).fetchone()
+
+def write_video(conn: sqlite3.Connection):
+    """What generation plus a review does: insert a video, then approve it."""
+    video_id = str(uuid.uuid4())
+    conn.execute(
+        'INSERT INTO videos (id, trend, script, video_url, captions, status) VALUES (?, ?, ?, ?, ?, ?)',
+        (video_id, 'Benchmark trend', 'Benchmark script 👶', 'https://example.com/v.mp4', CAPTIONS, 'pending')
+    )
+    conn.commit()
+    conn.execute("UPDATE videos SET status = 'approved' WHERE id = ?", (video_id,))
+    conn.commit()
+
+def run_mixed(borrow: Callable, give_back: Callable, readers: int, writers: int, seconds: float) -> Dict[str, Any]:
+    """
+    Run readers and writers concurrently and time every operation.
+
+    Args:
+        borrow (Callable): Returns a connection for one operation
+        give_back (Callable): Disposes of a connection after the operation
+        readers (int): Reader threads
+        writers (int): Writer threads
+        seconds (float): How long to run
+
+    Returns:
+        Dict[str, Any]: Read/write summaries and error count
+    """
+    timings = {'read': [], 'write': []}
+    errors = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(kind: str, operation: Callable):
+        local = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            conn = borrow()
+            try:
+                operation(conn)
+                local.append(time.perf_counter() - started)
+            except sqlite3.OperationalError as e:
+                errors.append(str(e))
+            finally:
+                give_back(conn)
+        with lock:
+            timings[kind].extend(local)
+
+    threads = [threading.Thread(target=worker, args=('read', read_dashboard)) for _ in range(readers)]
+    threads += [threading.Thread(target=worker, args=('write', write_video)) for _ in range(writers)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'read': latency_summary(timings['read'], elapsed),
+        'write': latency_summary(timings['write'], elapsed),
+        'errors': len(errors)
+    }
+
+def benchmark_db(readers: int, writers: int, seconds: float, rows: int) -> Dict[str, Any]:
+    """
+    Compare per-request connections on the rollback journal (the old
+    get_db_connection) with the WAL connection pool from db.py.
+    """
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='mclantax-bench-')
+
+    # Old behaviour: fresh connection per operation, default journal
+    legacy_path = os.path.join(workdir, 'legacy.db')
+    conn = sqlite3.connect(legacy_path)
+    conn.execute(SCHEMA)
+    seed_videos(conn, rows)
+    conn.close()
+
+    def legacy_borrow():
+        conn = sqlite3.connect(legacy_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    results['per_request_rollback'] = run_mixed(legacy_borrow, lambda conn: conn.close(), readers, writers, seconds)
+
+    # New behaviour: pooled, WAL, tuned pragmas
+    pool = ConnectionPool(os.path.join(workdir, 'pooled.db'), size=readers + writers)
+    with pool.connection() as conn:
+        conn.execute(SCHEMA)
+        seed_videos(conn, rows)
+
+    results['pooled_wal'] = run_mixed(pool.acquire, pool.release, readers, writers, seconds)
+    pool.close_all()
+
+    return results
+
+def legacy_rows_to_videos(rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+    """The old row mapping: a sqlite3.Row per row, a lookup and a json.loads per JSON column."""
+    videos = []
+    for row in rows:
+        video = {}
+        for name, column in (('id', 'id'), ('trend', 'trend'), ('script', 'script'), ('videoUrl', 'video_url'),
+                             ('captions', 'captions'), ('status', 'status'), ('created_at', 'created_at'),
+                             ('approved_at', 'approved_at'), ('posted_platforms', 'posted_platforms')):
+            value = row[column]
+            if name == 'captions':
+                value = json.loads(value) if value else {}
+            elif name == 'posted_platforms':
+                value = json.loads(value) if value else None
+            video[name] = value
+        videos.append(video)
+    return videos
+
+def time_serialize(fetch: Callable[[], List[Dict[str, Any]]], encode: Callable[[Any], bytes],
+                   repeat: int) -> Dict[str, Any]:
+    """Median time to fetch a page and to encode it, over `repeat` runs."""
+    fetch_times, encode_times = [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        page = fetch()
+        fetched = time.perf_counter()
+        body = encode(page)
+        fetch_times.append(fetched - started)
+        encode_times.append(time.perf_counter() - fetched)
+
+    fetch_ms = statistics.median(fetch_times) * 1000
+    encode_ms = statistics.median(encode_times) * 1000
+    return {
+        'rows': len(page),
+        'bytes': len(body),
+        'fetch_ms': round(fetch_ms, 3),
+        'encode_ms': round(encode_ms, 3),
+        'total_ms': round(fetch_ms + encode_ms, 3)
+    }
+
+def benchmark_serialize(rows: int, repeat: int) -> Dict[str, Any]:
+    """
+    Time reading `rows` videos and encoding them as a JSON response body.
+
+    The legacy setup is the old row mapping (a sqlite3.Row per row, every
+    column looked up by name); the others read the same migrated
+    database as tuples through queries.py, encoded with the standard
+    library (as Flask's default provider does) and with orjson when it
+    is installed.
+    """
+    results = {}
+    path = os.path.join(tempfile.mkdtemp(prefix='mclantax-bench-'), 'serialize.db')
+
+    conn = sqlite3.connect(path)
+    conn.execute(SCHEMA)
+    seed_videos(conn, rows)
+    conn.execute(
+        "UPDATE videos SET approved_at = CURRENT_TIMESTAMP, posted_platforms = ? WHERE status = 'approved'",
+        (json.dumps(['tiktok', 'instagram', 'youtube']),)
+    )
+    conn.commit()
+    migrate(conn)
+
+    sql_tail = 'ORDER BY created_at DESC, id DESC LIMIT ?'
+    stdlib = lambda page: json.dumps(page, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    conn.row_factory = sqlite3.Row
+    results['legacy_row_mapping'] = time_serialize(
+        lambda: legacy_rows_to_videos(conn.execute(f'SELECT * FROM videos {sql_tail}', (rows,)).fetchall()),
+        stdlib, repeat
+    )
+
+    fetch = lambda: _rows_to_videos(_select(conn, VIDEO_FIELDS, sql_tail, (rows,)), VIDEO_FIELDS)
+    results['tuples'] = time_serialize(fetch, stdlib, repeat)
+    if orjson is not None:
+        results['tuples_orjson'] = time_serialize(
+            fetch, lambda page: orjson.dumps(page, option=orjson.OPT_SORT_KEYS), repeat
+        )
+    conn.close()
+
+    return results
+
+TAX_WORDS = (
+    'tax refund deduction irs audit filing deadline crypto hustle bracket credit dependent mortgage interest '
+    'student loan freelance invoice receipts budget savings retirement ira inflation stimulus payroll llc '
+    'business expense office mileage charity estate'
+).split()
+
+SEARCH_QUERIES = ('mortgage', 'tax', 'crypto hustle', 'free', 'freelance invoice llc', 'nothingmatches')
+
+def benchmark_search(rows: int, repeat: int) -> Dict[str, Any]:
+    """
+    Time /api/videos/search queries against `rows` synthetic videos.
+
+    Scripts mix tax words (each in roughly a fifth of all videos) with
+    filler from a larger vocabulary; every query is timed for any status
+    and for pending only.
+    """
+    rng = random.Random(42)
+    filler = [f'word{i}' for i in range(5000)]
+    statuses = ('pending', 'approved', 'rejected')
+    path = os.path.join(tempfile.mkdtemp(prefix='mclantax-bench-'), 'search.db')
+
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    videos = []
+    for i in range(rows):
+        video_id = str(uuid.uuid4())
+        words = rng.sample(TAX_WORDS, 6) + rng.sample(filler, 24)
+        rng.shuffle(words)
+        captions = {platform: f'Baby explains {rng.choice(TAX_WORDS)} 👶 #BabyTax #{platform}'
+                    for platform in ('tiktok', 'instagram', 'youtube')}
+        videos.append((video_id, ' '.join(rng.sample(TAX_WORDS, 3)).title(), ' '.join(words), json.dumps(captions),
+                       statuses[i % 3]))
+    with conn:
+        conn.executemany('INSERT INTO videos (id, trend, script, captions, status) VALUES (?, ?, ?, ?, ?)', videos)
+
+    results = {}
+    for query in SEARCH_QUERIES:
+        for status in (None, 'pending'):
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                search_videos(conn, query, status)
+                samples.append(time.perf_counter() - started)
+            results[f"{query} ({status or 'any status'})"] = latency_summary(samples, sum(samples))
+    conn.close()
+
+    return results
+
+def legacy_minhash(script: str):
+    """MinHash as first written: one Python multiply per shingle per permutation."""
+    hashes = list(shingles(script))
+    return tuple(min([((a * h + b) & _MASK64) >> 32 for h in hashes]) for a, b in _PERMUTATIONS)
+
+def benchmark_similarity(scripts: int, words: int, repeat: int) -> Dict[str, Any]:
+    """
+    Time what HeldraAPITool does per script: sign it, then look it up
+    in an index of `scripts` stored signatures.
+
+    Signing is timed with the cache bypassed; lookups are against a mix
+    of fresh scripts and light edits of stored ones, so some find matches.
+    """
+    rng = random.Random(7)
+    vocabulary = TAX_WORDS + [f'word{i}' for i in range(2000)]
+    path = os.path.join(tempfile.mkdtemp(prefix='mclantax-bench-'), 'similarity.db')
+
+    stored = [' '.join(rng.choice(vocabulary) for _ in range(words)) for _ in range(scripts)]
+    index = ScriptSimilarityIndex(path)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany(
+            'INSERT INTO script_signatures (ref, signature) VALUES (?, ?)',
+            [(f'script:{i}', array('I', minhash(script)).tobytes()) for i, script in enumerate(stored)]
+        )
+    conn.close()
+    index.refresh()
+
+    probes = []
+    for i in range(repeat):
+        if i % 2:
+            probe = stored[rng.randrange(scripts)].split()
+            probe[rng.randrange(words)] = 'edited'
+            probes.append(' '.join(probe))
+        else:
+            probes.append(' '.join(rng.choice(vocabulary) for _ in range(words)))
+
+    results = {}
+    for name, sign in (('legacy_sign', legacy_minhash), ('sign', minhash.__wrapped__)):
+        samples = []
+        for probe in probes:
+            started = time.perf_counter()
+            sign(probe)
+            samples.append(time.perf_counter() - started)
+        results[name] = latency_summary(samples, sum(samples))
+
+    samples, matched = [], 0
+    for probe in probes:
+        started = time.perf_counter()
+        matched += bool(index.find_similar(signature=minhash.__wrapped__(probe)))
+        samples.append(time.perf_counter() - started)
+    results['sign_and_lookup'] = {**latency_summary(samples, sum(samples)), 'matched': matched}
+
+    return results
+
+def print_search_report(title: str, results: Dict[str, Any]):
+    print(f"\n📊 {title}")
+    for name, s in results.items():
+        print(f"   {name:<40} p50 {s['p50_ms']:>8} ms   p95 {s['p95_ms']:>8} ms   p99 {s['p99_ms']:>8} ms")
+
+def print_similarity_report(title: str, results: Dict[str, Any]):
+    print(f"\n📊 {title}")
+    for name, s in results.items():
+        matched = f"   matched {s['matched']}" if 'matched' in s else ''
+        print(f"   {name:<16} p50 {s['p50_ms']:>8} ms   p95 {s['p95_ms']:>8} ms   p99 {s['p99_ms']:>8} ms{matched}")
+
+def print_serialize_report(title: str, results: Dict[str, Any]):
+    print(f"\n📊 {title}")
+    baseline = results['legacy_row_mapping']['total_ms']
+    for setup, s in results.items():
+        print(f"   {setup:<22} fetch {s['fetch_ms']:>8} ms   encode {s['encode_ms']:>8} ms   "
+              f"total {s['total_ms']:>8} ms   {baseline / s['total_ms']:>5.2f}x   {s['bytes']:,} B")
+    if orjson is None:
+        print("   (install orjson to include it)")
+
+def print_report(title: str, results: Dict[str, Any]):
+    print(f"\n📊 {title}")
+    for setup, result in results.items():
+        print(f"\n   {setup}  (errors: {result['errors']})")
+        for kind in ('read', 'write'):
+            s = result[kind]
+            print(f"     {kind:<5} {s['ops_per_sec']:>9} ops/s   p50 {s['p50_ms']:>8} ms   "
+                  f"p95 {s['p95_ms']:>8} ms   p99 {s['p99_ms']:>8} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='McLan Tax Baby Video Creator benchmarks')
+    parser.add_argument('--json', action='store_true', help='Print raw results as JSON')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    db_parser = subparsers.add_parser('db', help='Concurrent dashboard reads vs. generation writes')
+    db_parser.add_argument('--readers', type=int, default=4, help='Reader threads')
+    db_parser.add_argument('--writers', type=int, default=1, help='Writer threads')
+    db_parser.add_argument('--seconds', type=float, default=5, help='Duration per setup')
+    db_parser.add_argument('--rows', type=int, default=2000, help='Videos seeded before the run')
+
+    serialize_parser = subparsers.add_parser('serialize', help='Read and JSON-encode a page of videos')
+    serialize_parser.add_argument('--rows', type=int, default=1000, help='Videos read and encoded per run')
+    serialize_parser.add_argument('--repeat', type=int, default=50, help='Runs per setup (the median is reported)')
+
+    search_parser = subparsers.add_parser('search', help='Full-text search latency')
+    search_parser.add_argument('--rows', type=int, default=100000, help='Videos indexed before the run')
+    search_parser.add_argument('--repeat', type=int, default=20, help='Runs per query')
+
+    similarity_parser = subparsers.add_parser('similarity', help='Script signing + near-duplicate lookup')
+    similarity_parser.add_argument('--scripts', type=int, default=10000, help='Signatures indexed before the run')
+    similarity_parser.add_argument('--words', type=int, default=80, help='Words per script')
+    similarity_parser.add_argument('--repeat', type=int, default=200, help='Scripts signed and looked up')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'db':
+        results = benchmark_db(args.readers, args.writers, args.seconds, args.rows)
+        title = f"SQLite connections: {args.readers} readers, {args.writers} writers, {args.seconds:g}s each"
+        report = print_report
+    elif args.benchmark == 'serialize':
+        results = benchmark_serialize(args.rows, args.repeat)
+        title = f"Serializing {args.rows:,} videos (median of {args.repeat} runs)"
+        report = print_serialize_report
+    elif args.benchmark == 'search':
+        results = benchmark_search(args.rows, args.repeat)
+        title = f"Full-text search over {args.rows:,} videos ({args.repeat} runs per query)"
+        report = print_search_report
+    elif args.benchmark == 'similarity':
+        results = benchmark_similarity(args.scripts, args.words, args.repeat)
+        title = f"Signing {args.words}-word scripts + lookup among {args.scripts:,} ({args.repeat} scripts)"
+        report = print_similarity_report
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        report(title, results)
+
+if __name__ == '__main__':
+    main()
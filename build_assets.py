@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+McLan Tax Baby Video Creator - Asset Build
+Minifies, content-hashes and precompresses the dashboard's static assets
+"""
+
+import argparse
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from typing import Dict, Optional
+from assets import DIST_DIR, MANIFEST_PATH, SOURCE_DIR
+
+try:
+    import brotli
+except ImportError:  # Required to build: pip install brotli (the served site doesn't need it)
+    brotli = None
+
+# Sources under static/src that make up the dashboard
+ASSETS = ('dashboard.js', 'dashboard.css')
+
+# Tailwind is compiled ahead of time into the front of the dashboard.css
+# bundle, so the page loads no render-blocking runtime from a CDN. The
+# standalone CLI comes from pip install tailwindcss-bin
+TAILWIND_INPUT = 'tailwind.css'
+TAILWIND_BUNDLE = 'dashboard.css'
+TAILWIND_CLI = os.getenv('TAILWIND_CLI', 'tailwindcss')
+
+class BuildError(RuntimeError):
+    """A build tool is missing or failed."""
+
+def minify_js(source: str) -> str:
+    """
+    Conservative JS minification: indentation, blank lines and whole-line
+    comments only. Line breaks stay, so automatic semicolon insertion and
+    strings containing '//' are untouched; gzip/brotli do the rest.
+    """
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//')) + '\n'
+
+def minify_css(source: str) -> str:
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};:,>])\s*', r'\1', source)
+    return source.replace(';}', '}').strip() + '\n'
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+def compile_tailwind(minify: bool = True) -> str:
+    """
+    Compile static/src/tailwind.css with the Tailwind CLI.
+
+    The CLI scans dashboard.js (see @source there) and emits only the
+    utilities it uses.
+
+    Raises:
+        BuildError: If the CLI isn't installed or fails
+    """
+    cli = shutil.which(TAILWIND_CLI)
+    if cli is None:
+        raise BuildError(f"Tailwind CLI '{TAILWIND_CLI}' not found: pip install tailwindcss-bin (or set TAILWIND_CLI)")
+
+    command = [cli, '--input', TAILWIND_INPUT] + (['--minify'] if minify else [])
+    result = subprocess.run(command, cwd=SOURCE_DIR, capture_output=True, text=True)
+    if result.returncode != 0 or not result.stdout.strip():
+        raise BuildError(f"Tailwind build failed: {result.stderr.strip()}")
+    return result.stdout.rstrip('\n') + '\n'
+
+def hashed_name(name: str, content: bytes) -> str:
+    """dashboard.js -> dashboard.<10 hex digits of sha256>.js"""
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}{ext}"
+
+def write_variants(path: str, content: bytes) -> Dict[str, int]:
+    """Write a file plus its .gz and .br variants; returns their sizes."""
+    with open(path, 'wb') as f:
+        f.write(content)
+    sizes = {'raw': len(content)}
+
+    # mtime=0 keeps the .gz byte-identical across rebuilds of the same content
+    compressed = gzip.compress(content, compresslevel=9, mtime=0)
+    with open(path + '.gz', 'wb') as f:
+        f.write(compressed)
+    sizes['gzip'] = len(compressed)
+
+    compressed = brotli.compress(content, quality=11)
+    with open(path + '.br', 'wb') as f:
+        f.write(compressed)
+    sizes['br'] = len(compressed)
+
+    return sizes
+
+def build(minify: bool = True, out_dir: Optional[str] = None) -> Dict[str, Dict]:
+    """
+    Build every asset into static/dist and write the manifest.
+
+    Earlier builds of an asset are removed once the new one is written,
+    so dist only ever holds what the manifest points at.
+
+    Returns:
+        Dict[str, Dict]: Per source name, the hashed file and its sizes
+
+    Raises:
+        BuildError: If brotli or the Tailwind CLI is missing, before anything is written
+    """
+    if brotli is None:
+        raise BuildError("brotli is required for the .br variants: pip install brotli")
+    # Compiled first, so a missing CLI fails the build before dist changes
+    tailwind = compile_tailwind(minify)
+
+    out_dir = out_dir or DIST_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    manifest: Dict[str, str] = {}
+    report: Dict[str, Dict] = {}
+
+    for name in ASSETS:
+        with open(os.path.join(SOURCE_DIR, name), encoding='utf-8') as f:
+            source = f.read()
+
+        minifier = MINIFIERS.get(os.path.splitext(name)[1])
+        text = minifier(source) if minify and minifier else source
+        if name == TAILWIND_BUNDLE:
+            # Utilities first, so the dashboard's own rules win ties
+            text = tailwind + text
+        content = text.encode('utf-8')
+
+        built = hashed_name(name, content)
+        sizes = write_variants(os.path.join(out_dir, built), content)
+        manifest[name] = built
+        report[name] = {'file': built, 'source': len(source.encode('utf-8')), **sizes}
+
+        stem, ext = os.path.splitext(name)
+        for stale in glob.glob(os.path.join(out_dir, f"{stem}.*{ext}*")):
+            if not os.path.basename(stale).startswith(built):
+                os.remove(stale)
+
+    manifest_path = MANIFEST_PATH if out_dir == DIST_DIR else os.path.join(out_dir, 'manifest.json')
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the dashboard assets into static/dist')
+    parser.add_argument('--no-minify', action='store_true', help='Hash and compress the sources as-is')
+    parser.add_argument('--json', action='store_true', help='Print the build report as JSON')
+    args = parser.parse_args()
+
+    try:
+        report = build(minify=not args.no_minify)
+    except BuildError as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print("📦 Built dashboard assets:")
+    for name, info in report.items():
+        variants = '  '.join(f"{kind} {info[kind]:,} B" for kind in ('gzip', 'br') if kind in info)
+        print(f"   {name:<15} -> {info['file']:<28} {info['source']:,} B source, {info['raw']:,} B  {variants}")
+
+if __name__ == '__main__':
+    main()
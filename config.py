@@ -19,13 +19,65 @@ class Config:
     BRAND_HANDLE = os.getenv("BRAND_HANDLE", "@mclantax")
     POSTS_PER_DAY = int(os.getenv("POSTS_PER_DAY", "3"))
     
+    # Storage Configuration
+    DATABASE_PATH = os.getenv("DATABASE_PATH", "baby_videos.db")
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+    STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", "5"))  # seconds
+    
+    # Live Updates Configuration (/api/events)
+    # Open streams per process; each holds a thread on threaded workers, so keep it under --threads
+    SSE_MAX_CLIENTS = int(os.getenv("SSE_MAX_CLIENTS", "4"))
+    
+    # Archive Configuration (see archive.py)
+    ARCHIVE_DATABASE_PATH = os.getenv("ARCHIVE_DATABASE_PATH")  # Default: <database>_archive.db
+    ARCHIVE_REJECTED_DAYS = int(os.getenv("ARCHIVE_REJECTED_DAYS", "30"))
+    ARCHIVE_APPROVED_DAYS = int(os.getenv("ARCHIVE_APPROVED_DAYS", "90"))
+    
+    # Scheduling Configuration (local hours)
+    POSTING_WINDOW_START = int(os.getenv("POSTING_WINDOW_START", "9"))
+    POSTING_WINDOW_END = int(os.getenv("POSTING_WINDOW_END", "21"))
+    
+    # Posting Outbox Configuration
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+    OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "30"))
+    
+    # Worker Configuration (see worker.py)
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", "30"))
+    SEED_SAMPLE_VIDEOS = os.getenv("SEED_SAMPLE_VIDEOS", "true").lower() in ("1", "true", "yes")
+    
+    # Search Cache Configuration
+    SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+    SEARCH_CACHE_MAX_STALE = float(os.getenv("SEARCH_CACHE_MAX_STALE", "86400"))
+    SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "5"))
+    
+    # Engagement Metrics Configuration
+    METRICS_MIN_POLL_SECONDS = float(os.getenv("METRICS_MIN_POLL_SECONDS", "900"))
+    METRICS_MAX_POLL_SECONDS = float(os.getenv("METRICS_MAX_POLL_SECONDS", "86400"))
+    
     # Video Configuration
     VIDEO_DURATION_MIN = 3
     VIDEO_DURATION_MAX = 45
     
+    # Scripts at or above this estimated similarity to a past script are not rendered
+    SCRIPT_SIMILARITY_THRESHOLD = float(os.getenv("SCRIPT_SIMILARITY_THRESHOLD", "0.6"))
+    
+    # Upload Configuration
+    UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))  # Multiple of 256 KiB for YouTube
+    UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", "5"))
+    UPLOAD_POOL_SIZE = int(os.getenv("UPLOAD_POOL_SIZE", "10"))
+    UPLOAD_CACHE_DIR = os.getenv("UPLOAD_CACHE_DIR", "outputs/uploads")  # Downloaded copies of videos stored by URL
+    
     # Social Media Platforms
     PLATFORMS = ["tiktok", "instagram", "youtube_shorts"]
     
+    # Key each platform's copy is stored under in a video's captions JSON
+    CAPTION_KEYS = {
+        "tiktok": "tiktok",
+        "instagram": "instagram",
+        "youtube_shorts": "youtube"
+    }
+    
     # Content Topics
     CONTENT_TOPICS = [
         "finance",
@@ -0,0 +1,176 @@
+"""
+McLan Tax Baby Video Creator - Content Index
+Topic lookups over past videos and an FTS5 index of search results
+"""
+
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional
+from config import Config
+import db
+from migrations import migrate
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how i in is it its of on or so that the this to was
+were what when why will with you your about into over just more most new now than then they
+""".split())
+
+def significant_words(text: str) -> List[str]:
+    """Lowercased words worth matching on (no stopwords, no 1-2 letter noise)."""
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    return list(dict.fromkeys(w for w in words if len(w) > 2 and w not in STOPWORDS))
+
+def init_content_index(conn: sqlite3.Connection):
+    """
+    Create the FTS5 index of search results.
+
+    Past videos aren't copied in here: lookups over them go to the
+    video_search index (migrations.py), which triggers keep current on
+    every insert, update and delete of the videos table.
+    """
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS content_index USING fts5(
+            kind UNINDEXED,
+            ref UNINDEXED,
+            title,
+            body,
+            indexed_at UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+    ''')
+    # One document per (query, URL), so fetching a query again refreshes
+    # its results instead of adding them a second time
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS content_index_docs (
+            docid INTEGER PRIMARY KEY,
+            query TEXT NOT NULL,
+            url TEXT NOT NULL,
+            UNIQUE (query, url)
+        )
+    ''')
+
+def _coverage(topic: set, text: str) -> float:
+    """Share of the topic's significant words that appear in the text."""
+    return round(len(topic & set(significant_words(text))) / len(topic), 2)
+
+class ContentIndex:
+    """Full-text memory of what the crew has already researched and produced."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+
+        conn = self.connect()
+        migrate(conn)
+        init_content_index(conn)
+        conn.commit()
+        conn.close()
+
+    def connect(self):
+        return db.connect(self.db_path)
+
+    def add_search_results(self, query: str, results: List[Dict[str, Any]]):
+        """Index organic search results under the query that found them (upserted by URL)."""
+        conn = self.connect()
+        now = int(time.time())
+        with conn:
+            for result in results:
+                title = result.get('title') or ''
+                url = result.get('link') or title
+                conn.execute(
+                    'INSERT OR IGNORE INTO content_index_docs (query, url) VALUES (?, ?)', (query, url)
+                )
+                conn.execute('''
+                    INSERT OR REPLACE INTO content_index (rowid, kind, ref, title, body, indexed_at)
+                    VALUES ((SELECT docid FROM content_index_docs WHERE query = ? AND url = ?), 'search', ?, ?, ?, ?)
+                ''', (query, url, query, title, result.get('snippet') or '', now))
+        conn.close()
+
+    def lookup(self, text: str, kinds: tuple = ('video',), within_days: Optional[float] = None,
+               limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Find past videos ('video') or search results ('search') that match a topic, best match first.
+
+        Each hit carries 'coverage': the share of the topic's significant
+        words that appear in the document.
+        """
+        words = significant_words(text)
+        if not words:
+            return []
+
+        match = " OR ".join(f'"{w}"' for w in words)
+        since = int(time.time() - within_days * 86400) if within_days is not None else None
+        topic = set(words)
+
+        conn = self.connect()
+        ranked = []
+        if 'video' in kinds:
+            # Trend and script only: captions repeat the script in pieces
+            sql = '''
+                SELECT docs.video_id, videos.trend, videos.script,
+                       CAST(strftime('%s', videos.created_at) AS INTEGER) AS created, video_search.rank
+                FROM video_search
+                JOIN video_search_docs AS docs ON docs.docid = video_search.rowid
+                JOIN videos ON videos.id = docs.video_id
+                WHERE video_search MATCH ?
+            '''
+            params = [f"{{trend script}} : ({match})"]
+            if since is not None:
+                sql += " AND CAST(strftime('%s', videos.created_at) AS INTEGER) >= ?"
+                params.append(since)
+            sql += ' ORDER BY video_search.rank LIMIT ?'
+            params.append(limit)
+
+            for video_id, trend, script, created, rank in conn.execute(sql, params):
+                ranked.append((rank, {
+                    'kind': 'video',
+                    'ref': video_id,
+                    'title': trend,
+                    'coverage': _coverage(topic, f"{trend} {script}"),
+                    'indexed_at': created
+                }))
+
+        if 'search' in kinds:
+            sql = '''
+                SELECT ref, title, body, indexed_at, bm25(content_index) AS rank
+                FROM content_index WHERE content_index MATCH ?
+            '''
+            params = [match]
+            if since is not None:
+                sql += ' AND indexed_at >= ?'
+                params.append(since)
+            sql += ' ORDER BY rank LIMIT ?'
+            params.append(limit)
+
+            for ref, title, body, indexed_at, rank in conn.execute(sql, params):
+                ranked.append((rank, {
+                    'kind': 'search',
+                    'ref': ref,
+                    'title': title,
+                    'coverage': _coverage(topic, f"{title} {body}"),
+                    'indexed_at': indexed_at
+                }))
+        conn.close()
+
+        ranked.sort(key=lambda pair: pair[0])
+        return [hit for _, hit in ranked[:limit]]
+
+    def already_covered(self, topic: str, threshold: float = 0.6, within_days: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Past videos that cover at least `threshold` of the topic's words."""
+        return [hit for hit in self.lookup(topic, within_days=within_days) if hit['coverage'] >= threshold]
+
+    def recent_titles(self, kind: str = 'trend', limit: int = 20) -> List[str]:
+        """Most recent video trends ('trend') or search result titles ('search'), newest first."""
+        conn = self.connect()
+        if kind == 'trend':
+            rows = conn.execute(
+                'SELECT trend FROM videos GROUP BY trend ORDER BY MAX(created_at) DESC LIMIT ?', (limit,)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                'SELECT title FROM content_index WHERE kind = ? GROUP BY title '
+                'ORDER BY MAX(indexed_at) DESC, MAX(rowid) DESC LIMIT ?',
+                (kind, limit)
+            ).fetchall()
+        conn.close()
+        return [row[0] for row in rows]
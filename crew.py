@@ -2,6 +2,7 @@ from crewai import Crew, Process
 from agents import BabyTaxVideoAgents
 from tasks import BabyTaxVideoTasks
 from config import Config
+from content_index import ContentIndex
 
 class BabyTaxVideoCrew:
     """Main crew for creating viral baby tax videos."""
@@ -22,7 +23,10 @@ class BabyTaxVideoCrew:
         scheduler = self.agents.scheduler()
         
         # Create tasks
-        research_task = self.tasks.research_trending_topic(trend_researcher)
+        research_task = self.tasks.research_trending_topic(
+            trend_researcher,
+            covered_topics=ContentIndex().recent_titles('trend')
+        )
         script_task = self.tasks.write_baby_script(baby_scriptwriter)
         video_task = self.tasks.generate_video(heldra_operator)
         caption_task = self.tasks.add_viral_captions(text_animator)
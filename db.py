@@ -0,0 +1,131 @@
+"""
+McLan Tax Baby Video Creator - Database Connections
+Pooled SQLite connections with WAL journaling and tuned pragmas
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+from config import Config
+
+try:
+    import fcntl
+except ImportError:  # Windows: file_lock() only serializes threads of one process
+    fcntl = None
+
+# Applied to every connection; journal_mode=WAL is persistent in the file
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",      # Safe with WAL, one fsync per checkpoint
+    "PRAGMA cache_size = -20000",       # ~20 MB page cache per connection
+    "PRAGMA mmap_size = 268435456",     # Read pages through a 256 MB memory map
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000"
+)
+
+def connect(db_path: Optional[str] = None, **kwargs) -> sqlite3.Connection:
+    """
+    Open a tuned connection.
+
+    WAL lets readers keep going while a writer commits, so background
+    generation and posting no longer block dashboard reads.
+    """
+    kwargs.setdefault("timeout", 30)
+    conn = sqlite3.connect(db_path or Config.DATABASE_PATH, **kwargs)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+_file_locks: Dict[str, threading.Lock] = {}
+_file_locks_lock = threading.Lock()
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a sidecar file for the duration of a with-block.
+
+    For one-time work that every process of a multi-worker server would
+    otherwise race on (schema setup, seeding): the first process does it,
+    the rest wait and then find it done.
+    """
+    with _file_locks_lock:
+        thread_lock = _file_locks.setdefault(path, threading.Lock())
+
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def setup_lock(db_path: Optional[str] = None):
+    """The lock schema setup and seeding for a database run under."""
+    return file_lock((db_path or Config.DATABASE_PATH) + '.setup.lock')
+
+class ConnectionPool:
+    """
+    A small pool of reusable connections to one database file.
+
+    Connections are shared across threads (one thread at a time), so a
+    request borrows an already-open, already-tuned connection instead of
+    paying for connect + pragmas + schema parsing on every call.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, size: Optional[int] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.size = size or Config.DB_POOL_SIZE
+        self._idle = queue.LifoQueue(maxsize=self.size)
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            conn = connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            return conn
+
+    def release(self, conn: sqlite3.Connection):
+        # Never hand the next borrower a half-finished transaction
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: Optional[str] = None) -> ConnectionPool:
+    """Get the process-wide pool for a database file."""
+    db_path = db_path or Config.DATABASE_PATH
+
+    with _pools_lock:
+        if db_path not in _pools:
+            _pools[db_path] = ConnectionPool(db_path)
+        return _pools[db_path]
+
+def pooled_connection(db_path: Optional[str] = None):
+    """Borrow a pooled connection for the duration of a with-block."""
+    return get_pool(db_path).connection()
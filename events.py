@@ -0,0 +1,204 @@
+"""
+McLan Tax Baby Video Creator - Live Events
+In-process publish/subscribe broker behind the dashboard's SSE stream
+"""
+
+import json
+import queue
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Deltas read per store query while catching up
+FEED_BATCH = 100
+
+def format_sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    """Encode one Server-Sent Events message."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in json.dumps(data).splitlines())
+    return "\n".join(lines) + "\n\n"
+
+class EventBroker:
+    """
+    Fans out dashboard events to every connected SSE client.
+
+    Each subscriber gets its own bounded queue, so one slow tab can't
+    hold up publishers; a subscriber that falls that far behind is told
+    to resync instead. The last few hundred events are kept so a client
+    that reconnects with Last-Event-ID only receives what it missed.
+    """
+
+    def __init__(self, history: int = 256, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._history: deque = deque(maxlen=history)
+        self._subscribers: List[queue.Queue] = []
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, data: Dict[str, Any]) -> int:
+        """
+        Send an event to every subscriber.
+
+        Args:
+            event (str): Event name, e.g. 'video-created'
+            data (Dict[str, Any]): JSON-serializable payload
+
+        Returns:
+            int: The event's id
+        """
+        with self._lock:
+            event_id = self._next_id
+            self._next_id += 1
+            message = (event_id, event, data)
+            self._history.append(message)
+
+            for subscriber in self._subscribers:
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # Drop its backlog; the client refetches everything
+                    with subscriber.mutex:
+                        subscriber.queue.clear()
+                    subscriber.put_nowait((None, 'resync', {}))
+
+        return event_id
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Tuple[queue.Queue, List[tuple]]:
+        """
+        Register a subscriber.
+
+        Returns:
+            Tuple[queue.Queue, List[tuple]]: The live queue and the missed
+            events to replay first (a single resync if too much was missed)
+        """
+        subscriber = queue.Queue(maxsize=self.queue_size)
+
+        with self._lock:
+            self._subscribers.append(subscriber)
+
+            if last_event_id is None:
+                return subscriber, []
+
+            oldest = self._history[0][0] if self._history else self._next_id
+            if last_event_id + 1 < oldest or last_event_id >= self._next_id:
+                # Too far behind, or an id from before a server restart
+                return subscriber, [(None, 'resync', {})]
+            return subscriber, [message for message in self._history if message[0] > last_event_id]
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def stream(self, last_event_id: Optional[str] = None, heartbeat: float = 15) -> Iterator[str]:
+        """
+        SSE body for one client, ending when the client disconnects.
+
+        Args:
+            last_event_id (str): The Last-Event-ID header, if reconnecting
+            heartbeat (float): Seconds between keep-alive comments
+        """
+        try:
+            last_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_id = None
+
+        subscriber, backlog = self.subscribe(last_id)
+        try:
+            # Reconnect delay for the browser, then anything missed
+            yield "retry: 3000\n\n"
+            for event_id, event, data in backlog:
+                yield format_sse(event, data, event_id)
+
+            while True:
+                try:
+                    event_id, event, data = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    # Keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(event, data, event_id)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+class ChangeFeed(threading.Thread):
+    """
+    Publishes what changed in a video store, whichever process wrote it.
+
+    Polls the store's change sequence and turns each delta into the
+    dashboard's events: new pending videos as video-created, anything
+    else (reviews, deletes, archiving) as status-changed, then the new
+    stats. Web workers, job workers and scripts all write to the same
+    database, so this is how every SSE client hears about every write.
+    """
+
+    def __init__(self, store, broker: Optional[EventBroker] = None, interval: float = 1.0):
+        super().__init__(name="change-feed", daemon=True)
+        self.store = store
+        self.broker = broker or get_broker()
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        cursor = self.store.version()
+        while not self._stopped.wait(self.interval):
+            try:
+                cursor = self.publish_since(cursor)
+            except Exception as e:
+                print(f"⚠️ Change feed error: {e}")
+
+    def publish_since(self, cursor: int) -> int:
+        """Publish everything after a change sequence. Returns the new cursor."""
+        if self.store.version() <= cursor:
+            return cursor
+
+        while True:
+            delta = self.store.changes_since(cursor, FEED_BATCH)
+            for video in delta['changes']:
+                if video['status'] == 'pending':
+                    self.broker.publish('video-created', video)
+                else:
+                    self.broker.publish('status-changed', {'id': video['id'], 'status': video['status']})
+            for video_id in delta['deleted']:
+                self.broker.publish('status-changed', {'id': video_id, 'status': 'deleted'})
+
+            cursor = int(delta['cursor'])
+            if not delta['has_more']:
+                break
+
+        self.broker.publish('stats-changed', self.store.stats())
+        return cursor
+
+_broker = None
+_broker_lock = threading.Lock()
+_feed = None
+
+def get_broker() -> EventBroker:
+    """Get the process-wide event broker."""
+    global _broker
+
+    with _broker_lock:
+        if _broker is None:
+            _broker = EventBroker()
+        return _broker
+
+def start_change_feed(store) -> ChangeFeed:
+    """Start (once per process) the feed that publishes a store's changes to the broker."""
+    global _feed
+
+    broker = get_broker()
+    with _broker_lock:
+        if _feed is None:
+            _feed = ChangeFeed(store, broker)
+            _feed.start()
+        return _feed
@@ -0,0 +1,52 @@
+"""
+McLan Tax Baby Video Creator - HTTP Caching
+ETag and Cache-Control helpers for the dashboards' JSON API
+"""
+
+import hashlib
+from typing import Iterable, Optional, Tuple
+from flask import Response, current_app, request
+
+# Always revalidate, but let the browser keep the body for a 304
+CACHE_CONTROL = 'private, no-cache'
+
+def change_etag(change_seq: int, *parts: object) -> str:
+    """
+    Strong ETag for a response determined by the change sequence.
+
+    Every committed insert, update and delete bumps the sequence, so
+    (sequence, request parameters) identifies the exact representation.
+    """
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:12]
+    return f"{change_seq}-{digest}"
+
+def request_params() -> Tuple[Tuple[str, str], ...]:
+    """The query string in a canonical order, for use as ETag parts."""
+    return tuple(sorted(request.args.items(multi=True)))
+
+def not_modified(etag: str, headers: Optional[Iterable[Tuple[str, str]]] = None) -> Optional[Response]:
+    """
+    A 304 response if the client's If-None-Match already has this ETag.
+
+    Check this before loading rows: a match costs one counter lookup.
+
+    Args:
+        etag (str): The current ETag (unquoted)
+        headers: Extra headers the 304 must carry (e.g. sync cursors)
+
+    Returns:
+        Optional[Response]: The 304 response, or None to build the full one
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+
+    response = current_app.response_class(status=304)
+    return with_validators(response, etag, headers)
+
+def with_validators(response: Response, etag: str, headers: Optional[Iterable[Tuple[str, str]]] = None) -> Response:
+    """Attach the ETag, Cache-Control and any extra headers to a response."""
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    for name, value in headers or ():
+        response.headers[name] = value
+    return response
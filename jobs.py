@@ -0,0 +1,196 @@
+"""
+McLan Tax Baby Video Creator - Background Jobs
+SQLite job queue that hands slow work from the web app to worker processes
+"""
+
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+from config import Config
+import db
+
+def init_jobs(conn: sqlite3.Connection):
+    """Create the jobs table if needed."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}',
+            status TEXT DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            run_after REAL DEFAULT 0,
+            lease_until REAL,
+            last_error TEXT,
+            result TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at REAL
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after
+        ON jobs (status, run_after)
+    ''')
+
+def enqueue_job(conn: sqlite3.Connection, kind: str, payload: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Queue a job using the caller's connection (nothing is committed here).
+
+    Returns:
+        int: The job's id
+    """
+    cursor = conn.execute(
+        'INSERT INTO jobs (kind, payload) VALUES (?, ?)', (kind, json.dumps(payload or {}))
+    )
+    return cursor.lastrowid
+
+def get_job(conn: sqlite3.Connection, job_id: int) -> Optional[Dict[str, Any]]:
+    """A job's status and outcome, or None if it doesn't exist."""
+    row = conn.execute('''
+        SELECT id, kind, status, attempts, last_error, result, created_at, finished_at
+        FROM jobs WHERE id = ?
+    ''', (job_id,)).fetchone()
+    if row is None:
+        return None
+    job = dict(zip(('id', 'kind', 'status', 'attempts', 'last_error', 'result', 'created_at', 'finished_at'), row))
+    job['result'] = json.loads(job['result']) if job['result'] else None
+    return job
+
+class JobRunner(threading.Thread):
+    """
+    Background thread that runs queued jobs.
+
+    Jobs are claimed one at a time under a lease, so any number of
+    runners (threads or processes) can share the queue without running
+    a job twice at once. The lease is renewed while the handler runs, so
+    it only runs out when the runner dies. A failed job is retried with
+    jittered backoff up to JOB_MAX_ATTEMPTS; a job whose runner died
+    mid-run is picked up again once its lease runs out.
+
+    Kinds in `at_most_once` have side effects that must not repeat (a
+    paid render): once one has started, a failure or a lost lease parks
+    it as 'unconfirmed' for a human to check instead of retrying it.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[Dict[str, Any]], Any]], db_path: Optional[str] = None,
+                 poll_interval: float = 1.0, lease_seconds: float = 1800.0, at_most_once: Sequence[str] = ()):
+        super().__init__(name="job-runner", daemon=True)
+        self.handlers = handlers
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.at_most_once = tuple(at_most_once)
+        self._stopped = threading.Event()
+
+        conn = self.connect()
+        init_jobs(conn)
+        conn.close()
+
+    def connect(self):
+        conn = db.connect(self.db_path, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            if not self.run_next():
+                self._stopped.wait(self.poll_interval)
+
+    def run_next(self) -> bool:
+        """Claim and run one due job. Returns False when nothing was due."""
+        conn = self.connect()
+        try:
+            row = self._claim(conn)
+            if row is None:
+                return False
+
+            done = threading.Event()
+            heartbeat = threading.Thread(target=self._renew_lease, args=(row['id'], done),
+                                         name=f"job-{row['id']}-lease", daemon=True)
+            heartbeat.start()
+            try:
+                result = self.handlers[row['kind']](json.loads(row['payload']))
+            except Exception as e:
+                if row['kind'] in self.at_most_once:
+                    self._finish(conn, row['id'], 'unconfirmed', error=str(e))
+                elif row['attempts'] >= Config.JOB_MAX_ATTEMPTS:
+                    self._finish(conn, row['id'], 'failed', error=str(e))
+                else:
+                    self._retry_later(conn, row, str(e))
+                return True
+            finally:
+                done.set()
+                heartbeat.join()
+
+            self._finish(conn, row['id'], 'done', result=json.dumps(result))
+            return True
+        finally:
+            conn.close()
+
+    def _renew_lease(self, job_id: int, done: threading.Event):
+        """Push a running job's lease forward every third of a lease until `done` is set."""
+        conn = None
+        try:
+            while not done.wait(self.lease_seconds / 3):
+                conn = conn or self.connect()
+                conn.execute('''
+                    UPDATE jobs SET lease_until = ? WHERE id = ? AND status = 'running'
+                ''', (time.time() + self.lease_seconds, job_id))
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def _claim(self, conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+        now = time.time()
+        kinds = list(self.handlers)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # A lease that ran out means a runner died mid-job: run it again
+            # unless that was its last attempt or the job must not run twice
+            conn.execute(f'''
+                UPDATE jobs SET status = CASE
+                                    WHEN kind IN ({', '.join('?' * len(self.at_most_once))}) THEN 'unconfirmed'
+                                    WHEN attempts >= ? THEN 'failed' ELSE 'queued'
+                                END,
+                                lease_until = NULL, last_error = ?
+                WHERE status = 'running' AND lease_until < ?
+            ''', (*self.at_most_once, Config.JOB_MAX_ATTEMPTS, 'Worker stopped while running', now))
+
+            row = conn.execute(f'''
+                SELECT * FROM jobs
+                WHERE status = 'queued' AND run_after <= ? AND kind IN ({', '.join('?' * len(kinds))})
+                ORDER BY run_after, id LIMIT 1
+            ''', (now, *kinds)).fetchone()
+
+            if row is not None:
+                conn.execute('''
+                    UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_until = ?
+                    WHERE id = ?
+                ''', (now + self.lease_seconds, row['id']))
+                row = conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],)).fetchone()
+
+            conn.execute('COMMIT')
+            return row
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _retry_later(self, conn: sqlite3.Connection, row: sqlite3.Row, error: str):
+        delay = min(Config.JOB_BACKOFF_SECONDS * (2 ** (row['attempts'] - 1)), 3600)
+        delay *= random.uniform(0.8, 1.2)
+        conn.execute('''
+            UPDATE jobs SET status = 'queued', last_error = ?, lease_until = NULL, run_after = ?
+            WHERE id = ?
+        ''', (error, time.time() + delay, row['id']))
+
+    def _finish(self, conn: sqlite3.Connection, job_id: int, status: str,
+                error: Optional[str] = None, result: Optional[str] = None):
+        conn.execute('''
+            UPDATE jobs SET status = ?, last_error = ?, result = ?, lease_until = NULL, finished_at = ?
+            WHERE id = ?
+        ''', (status, error, result, time.time(), job_id))
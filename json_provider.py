@@ -0,0 +1,59 @@
+"""
+McLan Tax Baby Video Creator - JSON Provider
+Optional orjson-backed JSON encoding for the Flask apps
+"""
+
+from typing import Any
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson for faster JSON responses
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that encodes and decodes with orjson.
+
+    Responses keep the default provider's shape: keys sorted, dates as
+    HTTP dates and anything else unusual (Decimal, dataclasses, __html__)
+    through the same default() hook. Calls with extra json.dumps/loads
+    options fall back to the standard library.
+    """
+
+    def __init__(self, app: Flask):
+        super().__init__(app)
+        self.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            self.options |= orjson.OPT_SORT_KEYS
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.options
+        if self.compact is False or (self.compact is None and self._app.debug):
+            options |= orjson.OPT_INDENT_2
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=options),
+                                        mimetype=self.mimetype)
+
+def init_json(app: Flask) -> bool:
+    """
+    Switch an app's JSON to orjson when it's installed.
+
+    Returns:
+        bool: True if orjson is in use
+    """
+    if orjson is None:
+        return False
+    app.json = OrjsonProvider(app)
+    return True
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+McLan Tax Baby Video Creator - Load Test
+HTTP load generator for the dashboard APIs with per-endpoint latency reports
+"""
+
+import argparse
+import http.client
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+APPS = ('web_app', 'simple_web_app', 'vercel')
+OPERATIONS = ('list', 'stats', 'approve', 'generate', 'search')
+# generate is opt-in: it adds videos (or, on web_app, queues jobs) during the run
+DEFAULT_MIX = 'list=70,stats=20,approve=10'
+SEARCH_WORDS = ('tax', 'refund', 'crypto', 'inflation', 'deductions', 'baby')
+
+SEED_CAPTIONS = {
+    'tiktok': 'When this baby knows more about taxes than you do 😂👶 #BabyTax #TaxSeason #McLanTax #FYP',
+    'instagram': 'POV: A baby gives better tax advice than your accountant 💀 @mclantax #reels #viral #tax',
+    'youtube': 'Baby Gives SAVAGE Tax Advice (You Won\'t Believe What Happens Next!) #shorts #tax #baby'
+}
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    """
+    Parse a traffic mix like "list=70,stats=20,approve=10" into weights.
+
+    Raises:
+        ValueError: If an operation is unknown or a weight isn't a positive integer
+    """
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r} (expected one of: {', '.join(OPERATIONS)})")
+        if not weight.isdigit() or int(weight) == 0:
+            raise ValueError(f'Weight for {name} must be a positive integer')
+        weights[name] = int(weight)
+    return weights
+
+def load_app(name: str, backend: Optional[str], rows: int):
+    """
+    Import a dashboard app on a fresh temporary store seeded with `rows` videos.
+
+    The store location is set through the environment before the import,
+    the same way a deployment configures it.
+    """
+    workdir = tempfile.mkdtemp(prefix='mclantax-load-')
+    backend = backend or ('jsonl' if name == 'vercel' else 'sqlite')
+    path = os.path.join(workdir, 'videos.jsonl' if backend == 'jsonl' else 'videos.db')
+    os.environ.update({'DATABASE_PATH': path, 'STORAGE_BACKEND': backend, 'STORAGE_PATH': path})
+
+    from config import Config
+    Config.DATABASE_PATH = path
+
+    if name == 'vercel':
+        spec = importlib.util.spec_from_file_location(
+            'vercel_api', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api', 'index.py')
+        )
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        app = module.app
+    else:
+        module = importlib.import_module(name)
+        if hasattr(module, 'create_app'):
+            app = module.create_app(seed=False)
+        else:
+            module.init_db()
+            app = module.app
+
+    seed_store(module.store, rows)
+    return app, f'{name} ({backend}, {path})'
+
+def seed_store(store, rows: int):
+    """Add synthetic videos through the store: half pending, the rest approved or rejected."""
+    statuses = ('pending', 'pending', 'approved', 'rejected')
+    started = time.perf_counter()
+    for i in range(rows):
+        store.add({
+            'id': f'load-{uuid.uuid4().hex[:12]}',
+            'trend': f'Trend {i}: {random.choice(SEARCH_WORDS).title()} season',
+            'script': f'Baby script number {i} about {random.choice(SEARCH_WORDS)} and taxes 👶💰',
+            'videoUrl': f'https://example.com/videos/{i}.mp4',
+            'captions': SEED_CAPTIONS,
+            'status': statuses[i % len(statuses)]
+        })
+    print(f"🌱 Seeded {rows:,} videos in {time.perf_counter() - started:.1f}s")
+
+def serve(app) -> Tuple[Any, str]:
+    """Serve a WSGI app on a free local port in a background thread."""
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+class Client:
+    """One keep-alive HTTP connection, reopened after errors."""
+
+    def __init__(self, base_url: str, timeout: float = 30):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.conn = None
+
+    def request(self, method: str, path: str) -> Tuple[int, bytes, Dict[str, str]]:
+        if self.conn is None:
+            self.conn = self.connection_class(self.netloc, timeout=self.timeout)
+        try:
+            headers = {'Content-Type': 'application/json'} if method == 'POST' else {}
+            self.conn.request(method, self.prefix + path, body=b'{}' if method == 'POST' else None, headers=headers)
+            response = self.conn.getresponse()
+            return response.status, response.read(), dict(response.getheaders())
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+def pending_ids(base_url: str, limit: int) -> List[str]:
+    """Ids of up to `limit` pending videos, paged through the API (approve targets)."""
+    client = Client(base_url)
+    ids, cursor = [], None
+    try:
+        while len(ids) < limit:
+            path = '/api/videos?status=pending&limit=100&fields=id' + (f'&cursor={cursor}' if cursor else '')
+            status, body, headers = client.request('GET', path)
+            if status != 200:
+                break
+            ids += [video['id'] for video in json.loads(body)]
+            cursor = headers.get('X-Next-Cursor')
+            if not cursor:
+                break
+    finally:
+        client.close()
+    return ids[:limit]
+
+def run_load(base_url: str, weights: Dict[str, int], concurrency: int, seconds: float,
+             approve_ids: List[str]) -> Dict[str, Any]:
+    """
+    Drive a weighted mix of API calls from `concurrency` keep-alive clients.
+
+    Each approve uses a different pending video; once they run out,
+    approves are skipped (and counted) rather than hitting 404s.
+
+    Returns:
+        Dict[str, Any]: Per-operation summaries (plus errors and skipped) and a total
+    """
+    from benchmark import latency_summary
+
+    targets = list(approve_ids)
+    targets_lock = threading.Lock()
+    timings = {name: [] for name in weights}
+    errors = {name: 0 for name in weights}
+    skipped = {name: 0 for name in weights}
+    sample_errors: List[str] = []
+    lock = threading.Lock()
+    names, cumulative = list(weights), []
+    for weight in weights.values():
+        cumulative.append((cumulative[-1] if cumulative else 0) + weight)
+
+    def next_request(rng: random.Random, name: str) -> Optional[Tuple[str, str]]:
+        if name == 'list':
+            return 'GET', f"/api/videos?status={rng.choice(('pending', 'pending', 'approved'))}&limit=20"
+        if name == 'stats':
+            return 'GET', '/api/stats'
+        if name == 'search':
+            return 'GET', f'/api/videos/search?q={rng.choice(SEARCH_WORDS)}&limit=20'
+        if name == 'generate':
+            return 'POST', '/api/videos/generate'
+        with targets_lock:
+            if not targets:
+                return None
+            return 'POST', f'/api/videos/{targets.pop()}/approve'
+
+    def worker(seed: int, deadline: float):
+        rng = random.Random(seed)
+        client = Client(base_url)
+        local = {name: [] for name in weights}
+        local_errors = {name: 0 for name in weights}
+        local_skipped = {name: 0 for name in weights}
+        try:
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, cum_weights=cumulative)[0]
+                request = next_request(rng, name)
+                if request is None:
+                    local_skipped[name] += 1
+                    continue
+
+                started = time.perf_counter()
+                try:
+                    status, _, _ = client.request(*request)
+                    if status >= 400:
+                        raise RuntimeError(f'{request[0]} {request[1]} -> {status}')
+                    local[name].append(time.perf_counter() - started)
+                except Exception as e:
+                    local_errors[name] += 1
+                    if len(sample_errors) < 5:
+                        sample_errors.append(str(e))
+        finally:
+            client.close()
+            with lock:
+                for name in weights:
+                    timings[name].extend(local[name])
+                    errors[name] += local_errors[name]
+                    skipped[name] += local_skipped[name]
+
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=worker, args=(seed, deadline)) for seed in range(concurrency)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for name in weights:
+        endpoints[name] = {**latency_summary(timings[name], elapsed), 'errors': errors[name], 'skipped': skipped[name]}
+    total = latency_summary([sample for samples in timings.values() for sample in samples], elapsed)
+    total['errors'] = sum(errors.values())
+
+    return {'endpoints': endpoints, 'total': total, 'sample_errors': sample_errors}
+
+def git_commit() -> Optional[str]:
+    """The checked-out commit, so saved results say what they measured."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_load_report(result: Dict[str, Any]):
+    meta = result['meta']
+    print(f"\n📊 {meta['target']}: {meta['concurrency']} clients, {meta['seconds']:g}s, mix {meta['mix']}")
+    rows = list(result['endpoints'].items()) + [('total', result['total'])]
+    for name, s in rows:
+        extra = f"   skipped {s['skipped']}" if s.get('skipped') else ''
+        print(f"   {name:<9} {s['ops_per_sec']:>9} req/s   p50 {s['p50_ms']:>8} ms   p95 {s['p95_ms']:>8} ms   "
+              f"p99 {s['p99_ms']:>8} ms   errors {s['errors']}{extra}")
+    for error in result['sample_errors']:
+        print(f"   ⚠️ {error}")
+
+def print_comparison(result: Dict[str, Any], baseline: Dict[str, Any]):
+    """Throughput and latency change per endpoint against an earlier run's JSON."""
+    print(f"\n📈 Compared with {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('timestamp')})")
+    rows = list(result['endpoints'].items()) + [('total', result['total'])]
+    for name, s in rows:
+        before = baseline['total'] if name == 'total' else baseline['endpoints'].get(name)
+        if not before:
+            continue
+        changes = []
+        for key in ('ops_per_sec', 'p50_ms', 'p95_ms', 'p99_ms'):
+            change = (s[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            changes.append(f"{key.replace('_ms', '').replace('ops_per_sec', 'req/s')} {change:+6.1f}%")
+        print(f"   {name:<9} " + '   '.join(changes))
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the dashboard API over HTTP')
+    parser.add_argument('--app', choices=APPS, default='simple_web_app',
+                        help='App to serve in-process on a temporary seeded store')
+    parser.add_argument('--url', help='Test a running server instead (no seeding; e.g. http://localhost:5000)')
+    parser.add_argument('--backend', choices=('sqlite', 'jsonl', 'memory'),
+                        help='Store for simple_web_app / vercel (default: sqlite / jsonl)')
+    parser.add_argument('--rows', type=int, default=10000, help='Videos seeded before the run')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent keep-alive clients')
+    parser.add_argument('--seconds', type=float, default=10, help='Duration of the run')
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f"Weighted operations from {', '.join(OPERATIONS)} (default {DEFAULT_MIX})")
+    parser.add_argument('--output', help='Save the results as JSON to this file')
+    parser.add_argument('--compare', help='Results JSON from an earlier run to compare against')
+    parser.add_argument('--json', action='store_true', help='Print raw results as JSON')
+    args = parser.parse_args()
+
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = None
+    if args.url:
+        base_url, target = args.url.rstrip('/'), args.url
+    else:
+        app, target = load_app(args.app, args.backend, args.rows)
+        server, base_url = serve(app)
+
+    try:
+        approve_ids = pending_ids(base_url, 100000) if 'approve' in weights else []
+        result = run_load(base_url, weights, args.concurrency, args.seconds, approve_ids)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    result['meta'] = {
+        'target': target,
+        'rows': None if args.url else args.rows,
+        'concurrency': args.concurrency,
+        'seconds': args.seconds,
+        'mix': args.mix,
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'timestamp': datetime.now().isoformat(timespec='seconds')
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_load_report(result)
+        if args.output:
+            print(f"💾 Saved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print_comparison(result, json.load(f))
+
+    sys.exit(1 if result['total']['errors'] else 0)
+
+if __name__ == '__main__':
+    main()
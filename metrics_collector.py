@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+McLan Tax Baby Video Creator - Engagement Metrics Collector
+Incrementally ingests post performance into compact time-series and rollups
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from config import Config
+import db
+
+METRIC_FIELDS = ("views", "likes", "comments", "shares")
+# Post IDs as they appear in the posting tool's result strings
+POST_ID_PATTERN = re.compile(r"(?:Video|Media|Publish|Post) ID: (\S+)")
+
+ROLLUP_BUCKETS = {"hour": 3600, "day": 86400}
+
+def init_metrics(conn: sqlite3.Connection):
+    """Create the metrics tables if needed."""
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS metric_posts (
+            post_key TEXT PRIMARY KEY,
+            platform TEXT NOT NULL,
+            external_id TEXT NOT NULL,
+            video_id TEXT,
+            views INTEGER DEFAULT 0,
+            likes INTEGER DEFAULT 0,
+            comments INTEGER DEFAULT 0,
+            shares INTEGER DEFAULT 0,
+            poll_interval REAL NOT NULL,
+            next_poll_at REAL NOT NULL,
+            changed_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_metric_posts_due
+        ON metric_posts (platform, next_poll_at);
+
+        CREATE TABLE IF NOT EXISTS metric_samples (
+            post_key TEXT NOT NULL,
+            ts INTEGER NOT NULL,
+            views INTEGER NOT NULL,
+            likes INTEGER NOT NULL,
+            comments INTEGER NOT NULL,
+            shares INTEGER NOT NULL,
+            PRIMARY KEY (post_key, ts)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS metric_rollups (
+            bucket TEXT NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            platform TEXT NOT NULL,
+            views INTEGER DEFAULT 0,
+            likes INTEGER DEFAULT 0,
+            comments INTEGER DEFAULT 0,
+            shares INTEGER DEFAULT 0,
+            PRIMARY KEY (bucket, bucket_start, platform)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS metric_sync_cursors (
+            name TEXT PRIMARY KEY,
+            value TEXT,
+            synced_at REAL
+        );
+    ''')
+
+def query_rollups(conn: sqlite3.Connection, bucket: str = "hour", since: Optional[float] = None,
+                  platform: Optional[str] = None) -> List[Dict[str, int]]:
+    """Read engagement gained per hour or day, oldest bucket first."""
+    if bucket not in ROLLUP_BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+
+    sql = 'SELECT * FROM metric_rollups WHERE bucket = ? AND bucket_start >= ?'
+    params = [bucket, int(since or 0)]
+    if platform:
+        sql += ' AND platform = ?'
+        params.append(platform)
+    sql += ' ORDER BY bucket_start, platform'
+
+    return [
+        {"bucket_start": row[1], "platform": row[2], **dict(zip(METRIC_FIELDS, row[3:7]))}
+        for row in conn.execute(sql, params)
+    ]
+
+class PlatformStatsClient:
+    """Batch stats lookups against each platform's API."""
+
+    BATCH_SIZES = {"tiktok": 20, "instagram": 50, "youtube_shorts": 50}
+
+    def __init__(self):
+        from tools.chunked_upload import get_upload_session
+        self.session = get_upload_session()
+
+    def fetch(self, platform: str, external_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Fetch current counters for a batch of posts on one platform.
+
+        Returns:
+            Dict[str, Dict[str, int]]: external_id -> counters, for posts the platform returned
+        """
+        if self._is_mock(platform, external_ids):
+            return self._mock_stats(external_ids)
+        if platform == "tiktok":
+            return self._fetch_tiktok(external_ids)
+        if platform == "instagram":
+            return self._fetch_instagram(external_ids)
+        if platform == "youtube_shorts":
+            return self._fetch_youtube(external_ids)
+        return {}
+
+    def _is_mock(self, platform: str, external_ids: List[str]) -> bool:
+        tokens = {
+            "tiktok": Config.TIKTOK_ACCESS_TOKEN,
+            "instagram": Config.INSTAGRAM_ACCESS_TOKEN,
+            "youtube_shorts": Config.YOUTUBE_API_KEY
+        }
+        token = tokens.get(platform, "")
+        return token.startswith("your_") or all(i.startswith(f"{platform}_") for i in external_ids)
+
+    def _fetch_tiktok(self, external_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        response = self.session.post(
+            "https://open.tiktokapis.com/v2/video/query/",
+            params={"fields": "id,view_count,like_count,comment_count,share_count"},
+            headers={"Authorization": f"Bearer {Config.TIKTOK_ACCESS_TOKEN}"},
+            json={"filters": {"video_ids": external_ids}},
+            timeout=30
+        )
+        response.raise_for_status()
+        return {
+            video["id"]: {
+                "views": video.get("view_count", 0),
+                "likes": video.get("like_count", 0),
+                "comments": video.get("comment_count", 0),
+                "shares": video.get("share_count", 0)
+            }
+            for video in response.json().get("data", {}).get("videos", [])
+        }
+
+    def _fetch_instagram(self, external_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        response = self.session.get(
+            "https://graph.instagram.com/v17.0/",
+            params={
+                "ids": ",".join(external_ids),
+                "fields": "like_count,comments_count,insights.metric(plays,shares)",
+                "access_token": Config.INSTAGRAM_ACCESS_TOKEN
+            },
+            timeout=30
+        )
+        response.raise_for_status()
+
+        stats = {}
+        for media_id, media in response.json().items():
+            insights = {
+                item["name"]: item["values"][0]["value"]
+                for item in media.get("insights", {}).get("data", [])
+            }
+            stats[media_id] = {
+                "views": insights.get("plays", 0),
+                "likes": media.get("like_count", 0),
+                "comments": media.get("comments_count", 0),
+                "shares": insights.get("shares", 0)
+            }
+        return stats
+
+    def _fetch_youtube(self, external_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        response = self.session.get(
+            "https://www.googleapis.com/youtube/v3/videos",
+            params={"part": "statistics", "id": ",".join(external_ids)},
+            headers={"Authorization": f"Bearer {Config.YOUTUBE_API_KEY}"},
+            timeout=30
+        )
+        response.raise_for_status()
+        return {
+            item["id"]: {
+                "views": int(item["statistics"].get("viewCount", 0)),
+                "likes": int(item["statistics"].get("likeCount", 0)),
+                "comments": int(item["statistics"].get("commentCount", 0)),
+                "shares": 0
+            }
+            for item in response.json().get("items", [])
+        }
+
+    def _mock_stats(self, external_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """Mock counters that grow with post age for testing purposes."""
+        stats = {}
+        now = time.time()
+        for external_id in external_ids:
+            match = re.search(r"(\d+)$", external_id)
+            posted_at = int(match.group(1)) if match else now
+            age_hours = max(now - posted_at, 0) / 3600
+            views = int(12500 * min(age_hours, 48) / 48)
+            stats[external_id] = {
+                "views": views,
+                "likes": views // 14,
+                "comments": views // 280,
+                "shares": views // 500
+            }
+        return stats
+
+class MetricsCollector(threading.Thread):
+    """
+    Background collector for post engagement.
+
+    New posts are discovered from the posting outbox as soon as they
+    are sent; a sync cursor marks the outbox rows already settled (sent,
+    failed or unconfirmed), so only newer rows are read. Each post
+    carries its own poll interval: a batch fetch that shows no change
+    doubles it, a change resets it, so quiet posts drop out of the
+    batches and each poll mostly fetches posts that are still moving. A
+    platform whose fetch fails is backed off the same way, and the other
+    platforms are still polled. Only changed
+    counters are written as samples, and the deltas are added to hourly
+    and daily rollups so the dashboard reads a handful of rows.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, client: Optional[PlatformStatsClient] = None,
+                 interval: float = 60.0):
+        super().__init__(name="metrics-collector", daemon=True)
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.client = client or PlatformStatsClient()
+        self.interval = interval
+        self._stopped = threading.Event()
+
+        conn = self.connect()
+        init_metrics(conn)
+        conn.commit()
+        conn.close()
+
+    def connect(self):
+        return db.connect(self.db_path)
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self.collect_once()
+            except Exception as e:
+                print(f"❌ Metrics collection error: {str(e)}")
+            self._stopped.wait(self.interval)
+
+    def collect_once(self) -> int:
+        """Run one discovery + polling pass. Returns the number of changed posts."""
+        conn = self.connect()
+        try:
+            self._discover_posts(conn)
+            changed = 0
+            for platform in Config.PLATFORMS:
+                changed += self._poll_platform(conn, platform)
+            return changed
+        finally:
+            conn.close()
+
+    def _discover_posts(self, conn: sqlite3.Connection):
+        has_outbox = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'post_outbox'"
+        ).fetchone()
+        if not has_outbox:
+            return
+
+        # Both reads in one snapshot, so no row can settle in between unseen
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Every outbox row up to the cursor is settled and ingested
+            cursor_row = conn.execute(
+                "SELECT value FROM metric_sync_cursors WHERE name = 'outbox'"
+            ).fetchone()
+            last_id = int(cursor_row[0]) if cursor_row else 0
+
+            unsettled = conn.execute('''
+                SELECT MIN(id) FROM post_outbox WHERE status NOT IN ('sent', 'failed', 'unconfirmed') AND id > ?
+            ''', (last_id,)).fetchone()[0]
+            rows = conn.execute('''
+                SELECT id, video_id, platform, result FROM post_outbox
+                WHERE status = 'sent' AND id > ? ORDER BY id
+            ''', (last_id,)).fetchall()
+
+            # Sent rows are ingested as soon as they're seen; the ones past a
+            # row still queued or retrying are read again (and ignored) on
+            # later passes until the cursor can move past it
+            now = time.time()
+            for row_id, video_id, platform, result in rows:
+                match = POST_ID_PATTERN.search(result or "")
+                if match:
+                    conn.execute('''
+                        INSERT OR IGNORE INTO metric_posts
+                            (post_key, platform, external_id, video_id, poll_interval, next_poll_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (f"{platform}:{match.group(1)}", platform, match.group(1), video_id,
+                          Config.METRICS_MIN_POLL_SECONDS, now))
+
+            if unsettled is not None:
+                last_id = unsettled - 1
+            elif rows:
+                last_id = rows[-1][0]
+
+            conn.execute('''
+                INSERT INTO metric_sync_cursors (name, value, synced_at) VALUES ('outbox', ?, ?)
+                ON CONFLICT(name) DO UPDATE SET value = excluded.value, synced_at = excluded.synced_at
+            ''', (str(last_id), now))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _poll_platform(self, conn: sqlite3.Connection, platform: str) -> int:
+        now = time.time()
+        batch_size = PlatformStatsClient.BATCH_SIZES.get(platform, 20)
+        due = conn.execute('''
+            SELECT post_key, external_id, views, likes, comments, shares, poll_interval
+            FROM metric_posts WHERE platform = ? AND next_poll_at <= ?
+            ORDER BY next_poll_at LIMIT ?
+        ''', (platform, now, batch_size)).fetchall()
+
+        if not due:
+            return 0
+
+        try:
+            stats = self.client.fetch(platform, [row[1] for row in due])
+        except Exception as e:
+            # One platform's outage must not hold up the others: its batch
+            # is rescheduled with backoff, like posts that didn't change
+            print(f"❌ {platform} metrics fetch failed: {str(e)}")
+            stats = {}
+        ts = int(now)
+        changed = 0
+
+        with conn:
+            for post_key, external_id, *previous, poll_interval in due:
+                current = stats.get(external_id)
+
+                if current is None or [current[f] for f in METRIC_FIELDS] == previous:
+                    poll_interval = min(poll_interval * 2, Config.METRICS_MAX_POLL_SECONDS)
+                    conn.execute(
+                        'UPDATE metric_posts SET poll_interval = ?, next_poll_at = ? WHERE post_key = ?',
+                        (poll_interval, now + poll_interval, post_key)
+                    )
+                    continue
+
+                values = [current[f] for f in METRIC_FIELDS]
+                deltas = [new - old for new, old in zip(values, previous)]
+                changed += 1
+
+                conn.execute('''
+                    UPDATE metric_posts SET views = ?, likes = ?, comments = ?, shares = ?,
+                        poll_interval = ?, next_poll_at = ?, changed_at = ?
+                    WHERE post_key = ?
+                ''', (*values, Config.METRICS_MIN_POLL_SECONDS, now + Config.METRICS_MIN_POLL_SECONDS, now, post_key))
+
+                conn.execute('''
+                    INSERT OR REPLACE INTO metric_samples (post_key, ts, views, likes, comments, shares)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (post_key, ts, *values))
+
+                for bucket, seconds in ROLLUP_BUCKETS.items():
+                    conn.execute('''
+                        INSERT INTO metric_rollups (bucket, bucket_start, platform, views, likes, comments, shares)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(bucket, bucket_start, platform) DO UPDATE SET
+                            views = views + excluded.views,
+                            likes = likes + excluded.likes,
+                            comments = comments + excluded.comments,
+                            shares = shares + excluded.shares
+                    ''', (bucket, ts - ts % seconds, platform, *deltas))
+
+        return changed
+
+if __name__ == "__main__":
+    collector = MetricsCollector(interval=Config.METRICS_MIN_POLL_SECONDS)
+    collector.start()
+
+    print("📈 McLan Tax engagement metrics collector running...")
+
+    try:
+        while collector.is_alive():
+            collector.join(timeout=1)
+    except KeyboardInterrupt:
+        print("\n🛑 Metrics collector stopped")
+        collector.stop()
@@ -0,0 +1,392 @@
+"""
+McLan Tax Baby Video Creator - Schema Migrations
+Versioned schema changes tracked with PRAGMA user_version
+"""
+
+import sqlite3
+from typing import Callable, List, Tuple
+
+def _create_videos(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS videos (
+            id TEXT PRIMARY KEY,
+            trend TEXT NOT NULL,
+            script TEXT NOT NULL,
+            video_url TEXT,
+            captions TEXT,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            approved_at TIMESTAMP,
+            posted_platforms TEXT
+        )
+    ''')
+
+def _index_status_created_at(conn: sqlite3.Connection):
+    # Serves the review list (status filter, newest first) and its keyset
+    # cursor straight from the index; id breaks created_at ties
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS videos_status_created_at ON videos (status, created_at, id)'
+    )
+
+def _status_counters(conn: sqlite3.Connection):
+    # One row per status, kept exact by triggers on every write path
+    # (web apps, workers, ad-hoc scripts), so stats never scan videos
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS video_status_counts (
+            status TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('DELETE FROM video_status_counts')
+    conn.execute('''
+        INSERT INTO video_status_counts (status, count)
+        SELECT status, COUNT(*) FROM videos WHERE status IS NOT NULL GROUP BY status
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS videos_status_count_insert
+        AFTER INSERT ON videos WHEN new.status IS NOT NULL BEGIN
+            INSERT INTO video_status_counts (status, count) VALUES (new.status, 1)
+            ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS videos_status_count_delete
+        AFTER DELETE ON videos WHEN old.status IS NOT NULL BEGIN
+            UPDATE video_status_counts SET count = count - 1 WHERE status = old.status;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS videos_status_count_update
+        AFTER UPDATE OF status ON videos WHEN old.status IS NOT new.status BEGIN
+            UPDATE video_status_counts SET count = count - 1 WHERE status = old.status;
+            INSERT INTO video_status_counts (status, count)
+            SELECT new.status, 1 WHERE new.status IS NOT NULL
+            ON CONFLICT (status) DO UPDATE SET count = count + 1;
+        END
+    ''')
+
+def _change_sequence(conn: sqlite3.Connection):
+    # change_seq is a rowversion: every insert/update takes the next value
+    # of a single counter, and deletes leave a tombstone with theirs, so
+    # "everything since N" is a range scan on two small indexes
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(videos)')]
+    if 'change_seq' not in columns:
+        conn.execute('ALTER TABLE videos ADD COLUMN change_seq INTEGER')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS video_change_seq (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seq INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS video_tombstones (
+            id TEXT PRIMARY KEY,
+            change_seq INTEGER NOT NULL,
+            deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Existing rows get sequence numbers in creation order
+    conn.execute('''
+        UPDATE videos SET change_seq = (
+            SELECT n FROM (
+                SELECT id, ROW_NUMBER() OVER (ORDER BY created_at, id) AS n FROM videos
+            ) AS numbered WHERE numbered.id = videos.id
+        )
+    ''')
+    conn.execute('''
+        INSERT OR REPLACE INTO video_change_seq (id, seq)
+        SELECT 1, COALESCE(MAX(change_seq), 0) FROM videos
+    ''')
+
+    conn.execute('CREATE INDEX IF NOT EXISTS videos_change_seq ON videos (change_seq)')
+    conn.execute('CREATE INDEX IF NOT EXISTS video_tombstones_change_seq ON video_tombstones (change_seq)')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS videos_change_seq_insert AFTER INSERT ON videos BEGIN
+            UPDATE video_change_seq SET seq = seq + 1;
+            UPDATE videos SET change_seq = (SELECT seq FROM video_change_seq) WHERE id = new.id;
+            DELETE FROM video_tombstones WHERE id = new.id;
+        END
+    ''')
+    # The WHEN guard skips the trigger's own change_seq writes
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS videos_change_seq_update
+        AFTER UPDATE ON videos WHEN new.change_seq IS old.change_seq BEGIN
+            UPDATE video_change_seq SET seq = seq + 1;
+            UPDATE videos SET change_seq = (SELECT seq FROM video_change_seq) WHERE id = new.id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS videos_change_seq_delete AFTER DELETE ON videos BEGIN
+            UPDATE video_change_seq SET seq = seq + 1;
+            INSERT OR REPLACE INTO video_tombstones (id, change_seq)
+            SELECT old.id, seq FROM video_change_seq;
+        END
+    ''')
+
+def _json_or_null(value: str, json_type: str) -> str:
+    """SQL for `value` if it is valid JSON of `json_type`, else NULL (which json_each reads as empty)."""
+    return f"CASE WHEN json_valid({value}) AND json_type({value}) = '{json_type}' THEN {value} END"
+
+def _caption_text(value: str) -> str:
+    """SQL for the captions in a captions JSON object, space-separated, for the search index."""
+    return f"COALESCE((SELECT group_concat(value, ' ') FROM json_each({_json_or_null(value, 'object')})), '')"
+
+def _video_search(conn: sqlite3.Connection):
+    # Full-text index of each video's trend, script and captions. FTS rows
+    # are keyed by a docid from video_search_docs rather than the videos
+    # rowid, which VACUUM is free to renumber
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS video_search_docs (
+            docid INTEGER PRIMARY KEY,
+            video_id TEXT NOT NULL UNIQUE
+        )
+    ''')
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS video_search USING fts5(
+            trend,
+            script,
+            captions,
+            tokenize = 'porter unicode61 remove_diacritics 2',
+            prefix = '2 3'
+        )
+    ''')
+    # rank is bm25 with trend matches weighted over caption and script ones
+    conn.execute("INSERT INTO video_search (video_search, rank) VALUES ('rank', 'bm25(10.0, 1.0, 2.0)')")
+
+    conn.execute('''
+        INSERT OR IGNORE INTO video_search_docs (video_id) SELECT id FROM videos ORDER BY created_at, id
+    ''')
+    conn.execute(f'''
+        INSERT OR REPLACE INTO video_search (rowid, trend, script, captions)
+        SELECT docs.docid, videos.trend, videos.script, {_caption_text('videos.captions')}
+        FROM video_search_docs AS docs JOIN videos ON videos.id = docs.video_id
+    ''')
+
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS videos_search_insert AFTER INSERT ON videos BEGIN
+            INSERT OR IGNORE INTO video_search_docs (video_id) VALUES (new.id);
+            INSERT OR REPLACE INTO video_search (rowid, trend, script, captions)
+            VALUES ((SELECT docid FROM video_search_docs WHERE video_id = new.id), new.trend, new.script,
+                    {_caption_text('new.captions')});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS videos_search_update AFTER UPDATE OF trend, script, captions ON videos BEGIN
+            UPDATE video_search SET trend = new.trend, script = new.script, captions = {_caption_text('new.captions')}
+            WHERE rowid = (SELECT docid FROM video_search_docs WHERE video_id = new.id);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS videos_search_delete AFTER DELETE ON videos BEGIN
+            DELETE FROM video_search WHERE rowid = (SELECT docid FROM video_search_docs WHERE video_id = old.id);
+            DELETE FROM video_search_docs WHERE video_id = old.id;
+        END
+    ''')
+
+# Hour and day buckets as rows, for triggers to join against
+_ROLLUP_BUCKETS = "(SELECT 'hour' AS name, 3600 AS seconds UNION ALL SELECT 'day', 86400)"
+
+def _epoch(value: str) -> str:
+    """SQL for a timestamp as unix seconds (NULL if it doesn't parse)."""
+    return f"CAST(strftime('%s', {value}) AS INTEGER)"
+
+def _rollup_upsert(ts: str, platform: str, when: str = '1', source: str = '', **counts: str) -> str:
+    """
+    SQL adding `counts` to the hour and day rollups holding unix time `ts`
+    (once per row of `source`, a table expression such as json_each(...)).
+    """
+    return f'''
+        INSERT INTO video_rollups (bucket, bucket_start, platform, {', '.join(counts)})
+        SELECT b.name, t.ts - t.ts % b.seconds, {platform}, {', '.join(counts.values())}
+        FROM {_ROLLUP_BUCKETS} AS b, (SELECT {ts} AS ts) AS t{f', {source}' if source else ''}
+        WHERE t.ts IS NOT NULL AND {when}
+        ON CONFLICT (bucket, bucket_start, platform) DO UPDATE SET
+            {', '.join(f'{name} = {name} + excluded.{name}' for name in counts)};
+    '''
+
+def _video_rollups(conn: sqlite3.Connection):
+    # Videos created, approved and rejected (platform '') and posts per
+    # platform, counted into hour and day buckets as they happen. Rows are
+    # events, so later deletes and archiving leave the history alone
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS video_rollups (
+            bucket TEXT NOT NULL,
+            bucket_start INTEGER NOT NULL,
+            platform TEXT NOT NULL DEFAULT '',
+            created INTEGER NOT NULL DEFAULT 0,
+            approved INTEGER NOT NULL DEFAULT 0,
+            rejected INTEGER NOT NULL DEFAULT 0,
+            posted INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, bucket_start, platform)
+        ) WITHOUT ROWID
+    ''')
+
+    # Backfill from the rows we have. Rejections have no timestamp of
+    # their own, so existing ones count at creation, and posts count at
+    # approval (posting follows it)
+    conn.execute('DELETE FROM video_rollups')
+    conn.execute(f'''
+        INSERT INTO video_rollups (bucket, bucket_start, platform, created, approved, rejected, posted)
+        SELECT b.name, e.ts - e.ts % b.seconds, e.platform,
+               SUM(e.kind = 'created'), SUM(e.kind = 'approved'), SUM(e.kind = 'rejected'), SUM(e.kind = 'posted')
+        FROM (
+            SELECT 'created' AS kind, '' AS platform, {_epoch('created_at')} AS ts FROM videos
+            UNION ALL
+            SELECT status, '', COALESCE({_epoch('approved_at')}, {_epoch('created_at')})
+            FROM videos WHERE status = 'approved'
+            UNION ALL
+            SELECT status, '', {_epoch('created_at')} FROM videos WHERE status = 'rejected'
+            UNION ALL
+            SELECT 'posted', p.value, COALESCE({_epoch('approved_at')}, {_epoch('created_at')})
+            FROM videos, json_each({_json_or_null('videos.posted_platforms', 'array')}) AS p
+            WHERE p.type = 'text'
+        ) AS e, {_ROLLUP_BUCKETS} AS b
+        WHERE e.ts IS NOT NULL
+        GROUP BY 1, 2, 3
+    ''')
+
+    now = _epoch("'now'")
+    created = f"COALESCE({_epoch('new.created_at')}, {now})"
+    # Rows inserted already reviewed (imports, seeds) count like the backfill
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS videos_rollup_insert AFTER INSERT ON videos BEGIN
+            {_rollup_upsert(created, "''", created='1')}
+            {_rollup_upsert(f"COALESCE({_epoch('new.approved_at')}, {created})", "''",
+                            when="new.status IN ('approved', 'rejected')",
+                            approved="new.status = 'approved'", rejected="new.status = 'rejected'")}
+        END
+    ''')
+    # Reviews count when they happen
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS videos_rollup_review AFTER UPDATE OF status ON videos
+        WHEN new.status IN ('approved', 'rejected') AND old.status IS NOT new.status BEGIN
+            {_rollup_upsert(now, "''", approved="new.status = 'approved'", rejected="new.status = 'rejected'")}
+        END
+    ''')
+    # Posts count per platform when one joins a video's posted_platforms
+    new_platforms = f"json_each({_json_or_null('new.posted_platforms', 'array')}) AS p"
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS videos_posted_rollup_insert AFTER INSERT ON videos
+        WHEN new.posted_platforms IS NOT NULL BEGIN
+            {_rollup_upsert(now, 'p.value', when="p.type = 'text'", source=new_platforms, posted='1')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS videos_posted_rollup_update AFTER UPDATE OF posted_platforms ON videos
+        WHEN new.posted_platforms IS NOT old.posted_platforms BEGIN
+            {_rollup_upsert(now, 'p.value', source=new_platforms, posted='1',
+                            when=f"""p.type = 'text' AND p.value NOT IN (
+                                SELECT value FROM json_each({_json_or_null('old.posted_platforms', 'array')})
+                            )""")}
+        END
+    ''')
+
+def _content_index_research_only(conn: sqlite3.Connection):
+    # Videos are searched through video_search alone, which triggers keep
+    # current on insert, update and delete; content_index (content_index.py)
+    # keeps only search results, one row per (query, URL)
+    conn.execute('DROP TRIGGER IF EXISTS videos_content_index_insert')
+    conn.execute('DROP TRIGGER IF EXISTS videos_content_index_delete')
+
+    has_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'content_index'"
+    ).fetchone()
+    if not has_index:
+        return
+
+    conn.execute("DELETE FROM content_index WHERE kind != 'search'")
+    # Every fetch of a query used to add its results again; keep the newest copy
+    conn.execute('''
+        DELETE FROM content_index WHERE rowid NOT IN (
+            SELECT MAX(rowid) FROM content_index GROUP BY ref, title
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS content_index_docs (
+            docid INTEGER PRIMARY KEY,
+            query TEXT NOT NULL,
+            url TEXT NOT NULL,
+            UNIQUE (query, url)
+        )
+    ''')
+    # Old rows didn't keep the result URL; their title stands in for it
+    conn.execute('''
+        INSERT OR IGNORE INTO content_index_docs (docid, query, url)
+        SELECT rowid, ref, title FROM content_index
+    ''')
+
+def _rejected_at(conn: sqlite3.Connection):
+    # Rejections get their own timestamp so archival ages them from the
+    # review, like approvals; ones from before this stay NULL and age
+    # from created_at
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(videos)')]
+    if 'rejected_at' not in columns:
+        conn.execute('ALTER TABLE videos ADD COLUMN rejected_at TIMESTAMP')
+
+# (version, description, apply) - append only, never renumber
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = [
+    (1, "videos table", _create_videos),
+    (2, "videos (status, created_at) index", _index_status_created_at),
+    (3, "status counters maintained by triggers", _status_counters),
+    (4, "change sequence and tombstones for delta sync", _change_sequence),
+    (5, "full-text search over videos", _video_search),
+    (6, "hourly and daily video rollups", _video_rollups),
+    (7, "content index keeps search results only, one per query and URL", _content_index_research_only),
+    (8, "rejected_at on videos", _rejected_at),
+]
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply every migration newer than the database's user_version.
+
+    Each migration runs in its own transaction together with the version
+    bump, so a failure leaves the database at the last good version.
+    Databases created before versioning start at 0 and replay from 1,
+    which is why every migration is written to be idempotent.
+
+    Returns:
+        int: The schema version after migrating
+    """
+    if conn.in_transaction:
+        conn.commit()
+
+    applied = False
+    for target, description, apply in MIGRATIONS:
+        if target <= schema_version(conn):
+            continue
+
+        # sqlite3 doesn't open transactions for DDL on its own; BEGIN
+        # IMMEDIATE also makes a concurrent migrator wait for this one
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if schema_version(conn) < target:
+                apply(conn)
+                # PRAGMA can't take parameters; target is a trusted int
+                conn.execute(f'PRAGMA user_version = {int(target)}')
+                print(f"🗄️ Migrated database to v{target}: {description}")
+                applied = True
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    if applied:
+        # After ALTER TABLE ADD COLUMN, SQLite (seen on 3.40) can fail this
+        # connection's next write to videos with "no such table" once
+        # another connection changes the schema; re-reading it here avoids that
+        conn.execute('PRAGMA writable_schema = RESET')
+
+    return schema_version(conn)
+
+if __name__ == "__main__":
+    import db
+    conn = db.connect()
+    print(f"✅ Schema at v{migrate(conn)}")
+    conn.close()
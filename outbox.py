@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+McLan Tax Baby Video Creator - Posting Outbox
+Transactional outbox that makes social posting exactly-once from our side
+"""
+
+import hashlib
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, List, Optional
+from config import Config
+import db
+
+SUCCESS_PREFIX = "Posted successfully"
+# Error text that means the platform may have accepted the post anyway
+AMBIGUOUS_MARKERS = ("timed out", "timeout", "connection aborted", "remote end closed")
+
+def idempotency_key(video_id: str, platform: str) -> str:
+    """Stable dedup key for one video on one platform."""
+    return hashlib.sha256(f"{video_id}:{platform}".encode("utf-8")).hexdigest()[:32]
+
+def init_outbox(conn: sqlite3.Connection):
+    """Create the post_outbox table if needed."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS post_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            video_id TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            idempotency_key TEXT NOT NULL UNIQUE,
+            video_path TEXT NOT NULL,
+            caption TEXT NOT NULL,
+            status TEXT DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            next_attempt_at REAL DEFAULT 0,
+            lease_until REAL,
+            last_error TEXT,
+            result TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at REAL,
+            UNIQUE (video_id, platform)
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_post_outbox_status_next
+        ON post_outbox (status, next_attempt_at)
+    ''')
+
+def enqueue_post(conn: sqlite3.Connection, video_id: str, platform: str, video_path: str, caption: str) -> bool:
+    """
+    Add a post to the outbox using the caller's connection.
+
+    Nothing is committed here, so the row lands atomically with whatever
+    else the caller writes in the same transaction. Enqueueing the same
+    (video, platform) twice is a no-op. video_path may be the video's URL;
+    the uploaders that need the file download it when the row is sent.
+
+    Returns:
+        bool: True if a new row was queued
+    """
+    cursor = conn.execute('''
+        INSERT OR IGNORE INTO post_outbox (video_id, platform, idempotency_key, video_path, caption)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (video_id, platform, idempotency_key(video_id, platform), video_path, caption))
+    return cursor.rowcount == 1
+
+class OutboxSender(threading.Thread):
+    """
+    Background thread that drains the outbox.
+
+    Rows are claimed one at a time under a lease, so concurrent senders
+    never post the same row. Explicit failures are retried with jittered
+    exponential backoff. Failures where the platform may already have
+    accepted the post (timeouts, a sender that died mid-call) are parked
+    as 'unconfirmed' instead of being retried, because resending is what
+    would double-post.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, post_fn: Optional[Callable[[str, str, str], str]] = None,
+                 poll_interval: float = 1.0, lease_seconds: float = 600.0):
+        super().__init__(name="outbox-sender", daemon=True)
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.post_fn = post_fn or self._default_post_fn
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._stopped = threading.Event()
+
+        conn = self.connect()
+        init_outbox(conn)
+        conn.commit()
+        conn.close()
+
+    def _default_post_fn(self, video_path: str, caption: str, platform: str) -> str:
+        from tools.social_media_tool import PostToSocialTool
+        return PostToSocialTool()._post_immediately(video_path, caption, platform)
+
+    def connect(self):
+        conn = db.connect(self.db_path, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            if not self.send_next():
+                self._stopped.wait(self.poll_interval)
+
+    def send_next(self) -> bool:
+        """Claim and send one due row. Returns False when nothing was due."""
+        conn = self.connect()
+        try:
+            row = self._claim(conn)
+            if row is None:
+                return False
+
+            try:
+                result = (self.post_fn(row['video_path'], row['caption'], row['platform']) or "").strip()
+                error = None if result.startswith(SUCCESS_PREFIX) else result
+            except Exception as e:
+                result, error = None, str(e)
+
+            if error is None:
+                self._mark_sent(conn, row, result)
+            elif any(marker in error.lower() for marker in AMBIGUOUS_MARKERS):
+                self._finish(conn, row['id'], 'unconfirmed', error)
+            elif row['attempts'] >= Config.OUTBOX_MAX_ATTEMPTS:
+                self._finish(conn, row['id'], 'failed', error)
+            else:
+                self._retry_later(conn, row, error)
+
+            return True
+        finally:
+            conn.close()
+
+    def _claim(self, conn: sqlite3.Connection) -> Optional[sqlite3.Row]:
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # A lease that ran out means a sender died mid-post: outcome unknown
+            conn.execute('''
+                UPDATE post_outbox SET status = 'unconfirmed', last_error = ?
+                WHERE status = 'sending' AND lease_until < ?
+            ''', ('Sender stopped while posting', now))
+
+            row = conn.execute('''
+                SELECT * FROM post_outbox
+                WHERE status = 'queued' AND next_attempt_at <= ?
+                ORDER BY next_attempt_at, id LIMIT 1
+            ''', (now,)).fetchone()
+
+            if row is not None:
+                conn.execute('''
+                    UPDATE post_outbox SET status = 'sending', attempts = attempts + 1, lease_until = ?
+                    WHERE id = ?
+                ''', (now + self.lease_seconds, row['id']))
+                row = conn.execute('SELECT * FROM post_outbox WHERE id = ?', (row['id'],)).fetchone()
+
+            conn.execute('COMMIT')
+            return row
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _mark_sent(self, conn: sqlite3.Connection, row: sqlite3.Row, result: str):
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('''
+            UPDATE post_outbox SET status = 'sent', result = ?, last_error = NULL, lease_until = NULL, sent_at = ?
+            WHERE id = ?
+        ''', (result, time.time(), row['id']))
+        # Keep the dashboard's posted_platforms list in step with the outbox
+        has_videos = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'videos'"
+        ).fetchone()
+        if has_videos:
+            conn.execute('''
+                UPDATE videos SET posted_platforms = json_insert(
+                    CASE WHEN json_valid(posted_platforms) THEN posted_platforms ELSE '[]' END, '$[#]', ?
+                )
+                WHERE id = ? AND ? NOT IN (
+                    SELECT value FROM json_each(CASE WHEN json_valid(posted_platforms) THEN posted_platforms END)
+                )
+            ''', (row['platform'], row['video_id'], row['platform']))
+        conn.execute('COMMIT')
+
+    def _retry_later(self, conn: sqlite3.Connection, row: sqlite3.Row, error: str):
+        delay = min(Config.OUTBOX_BACKOFF_SECONDS * (2 ** (row['attempts'] - 1)), 3600)
+        delay *= random.uniform(0.8, 1.2)
+        conn.execute('''
+            UPDATE post_outbox SET status = 'queued', last_error = ?, lease_until = NULL, next_attempt_at = ?
+            WHERE id = ?
+        ''', (error, time.time() + delay, row['id']))
+
+    def _finish(self, conn: sqlite3.Connection, post_id: int, status: str, error: str):
+        conn.execute('''
+            UPDATE post_outbox SET status = ?, last_error = ?, lease_until = NULL
+            WHERE id = ?
+        ''', (status, error, post_id))
+
+def cancel_posts(conn: sqlite3.Connection, video_id: str) -> int:
+    """
+    Drop a video's posts that haven't gone out yet, using the caller's connection.
+
+    Rows still queued (including ones waiting to retry) are deleted, so a
+    later approval queues them afresh; rows being sent or already settled
+    are left alone. Nothing is committed here.
+
+    Returns:
+        int: The number of posts dropped
+    """
+    return conn.execute(
+        "DELETE FROM post_outbox WHERE video_id = ? AND status = 'queued'", (video_id,)
+    ).rowcount
+
+def outbox_rows(conn: sqlite3.Connection, video_id: str) -> List[sqlite3.Row]:
+    """All outbox rows for a video, one per platform."""
+    return conn.execute(
+        'SELECT * FROM post_outbox WHERE video_id = ? ORDER BY platform', (video_id,)
+    ).fetchall()
+
+if __name__ == "__main__":
+    sender = OutboxSender()
+    sender.start()
+
+    print("📤 McLan Tax posting outbox sender running...")
+
+    try:
+        while sender.is_alive():
+            sender.join(timeout=1)
+    except KeyboardInterrupt:
+        print("\n🛑 Outbox sender stopped")
+        sender.stop()
@@ -0,0 +1,448 @@
+"""
+McLan Tax Baby Video Creator - Video Queries
+Shared queries and request parsing behind the dashboards' video APIs
+"""
+
+import base64
+import html
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+MAX_PAGE_SIZE = 100
+MAX_BULK_ITEMS = 200
+BULK_ACTIONS = ('approve', 'reject')
+MAX_SEARCH_TERMS = 8
+# Rollup bucket -> seconds (see the video_rollups migration)
+TIMESERIES_BUCKETS = {'hour': 3600, 'day': 86400}
+MAX_TIMESERIES_POINTS = 1000
+
+# API field name -> videos column
+VIDEO_COLUMNS = {
+    'id': 'id',
+    'trend': 'trend',
+    'script': 'script',
+    'videoUrl': 'video_url',
+    'captions': 'captions',
+    'status': 'status',
+    'created_at': 'created_at',
+    'approved_at': 'approved_at',
+    'rejected_at': 'rejected_at',
+    'posted_platforms': 'posted_platforms'
+}
+
+# Fields stored as JSON text on the videos row
+JSON_FIELDS = ('captions', 'posted_platforms')
+
+# Every API field, in response order
+VIDEO_FIELDS = tuple(VIDEO_COLUMNS)
+
+def encode_cursor(created_at: str, video_id: str) -> str:
+    """Opaque cursor pointing just past the given row."""
+    raw = json.dumps([created_at, video_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, video_id = json.loads(raw)
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(created_at, str) or not isinstance(video_id, str):
+        raise ValueError('Invalid cursor')
+    return created_at, video_id
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Parse a fields=a,b,c projection (None means every field).
+
+    Raises:
+        ValueError: If a field name is unknown
+    """
+    if not fields:
+        return None
+    names = list(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    unknown = [name for name in names if name not in VIDEO_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+def _select(conn: sqlite3.Connection, names: Sequence[str], clause: str, params: Sequence[Any],
+            extra: Sequence[str] = ()) -> List[tuple]:
+    """
+    Plain tuple rows of the videos columns behind `names`, followed by id
+    and any `extra` columns.
+    """
+    columns = [VIDEO_COLUMNS[name] for name in names if name in VIDEO_COLUMNS] + ['id', *extra]
+    cursor = conn.cursor()
+    cursor.row_factory = None  # Tuples: no sqlite3.Row per row
+    return cursor.execute(f"SELECT {', '.join(columns)} FROM videos {clause}", params).fetchall()
+
+def _rows_to_videos(rows: Sequence[tuple], names: Sequence[str]) -> List[Dict[str, Any]]:
+    """
+    API-shaped videos for rows from _select.
+
+    Row fields are zipped straight into each dict; only captions and
+    posted_platforms, when asked for, are parsed from JSON.
+    """
+    scalars = [name for name in names if name in VIDEO_COLUMNS]
+    # zip stops at the scalar names, leaving id and the extra columns out
+    videos = [dict(zip(scalars, row)) for row in rows]
+
+    if 'captions' in scalars:
+        for video in videos:
+            captions = video['captions']
+            video['captions'] = json.loads(captions) if captions else {}
+    if 'posted_platforms' in scalars:
+        for video in videos:
+            platforms = video['posted_platforms']
+            video['posted_platforms'] = json.loads(platforms) if platforms else None
+
+    return videos
+
+def get_video(conn: sqlite3.Connection, video_id: str,
+              fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+    """One video in API shape, or None if it doesn't exist."""
+    names = list(fields) if fields else list(VIDEO_FIELDS)
+    rows = _select(conn, names, 'WHERE id = ?', (video_id,))
+    return _rows_to_videos(rows, names)[0] if rows else None
+
+def parse_bulk_actions(payload: Any) -> List[Tuple[str, str]]:
+    """
+    Parse a bulk review request into (video id, action) pairs.
+
+    Accepts {"ids": [...], "action": "approve"} for one action on many
+    videos, or {"actions": [{"id": ..., "action": ...}, ...]} for mixed
+    ones. A repeated id keeps its last action.
+
+    Raises:
+        ValueError: If the payload is malformed or too large
+    """
+    if not isinstance(payload, dict):
+        raise ValueError('Expected a JSON object')
+
+    if 'actions' in payload:
+        entries = payload['actions']
+        if not isinstance(entries, list) or not all(isinstance(e, dict) for e in entries):
+            raise ValueError('actions must be a list of {id, action} objects')
+        pairs = [(entry.get('id'), entry.get('action')) for entry in entries]
+    else:
+        ids = payload.get('ids')
+        if not isinstance(ids, list):
+            raise ValueError('Provide ids and action, or actions')
+        pairs = [(video_id, payload.get('action')) for video_id in ids]
+
+    if not pairs:
+        raise ValueError('Nothing to do')
+    if len(pairs) > MAX_BULK_ITEMS:
+        raise ValueError(f'At most {MAX_BULK_ITEMS} videos per request')
+    for video_id, action in pairs:
+        if not isinstance(video_id, str) or not video_id:
+            raise ValueError('Every video id must be a non-empty string')
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"action must be one of: {', '.join(BULK_ACTIONS)}")
+
+    return list(dict(pairs).items())
+
+def list_videos(conn: sqlite3.Connection, status: str, limit: int = 20, cursor: Optional[str] = None,
+                fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of videos with a given status, newest first.
+
+    Pages are keyed on (created_at, id) rather than OFFSET, so every page
+    is a range scan of the (status, created_at, id) index no matter how
+    deep it is, and rows inserted meanwhile don't shift later pages.
+
+    Args:
+        conn (sqlite3.Connection): Database connection
+        status (str): Status to list
+        limit (int): Page size (clamped to 1..MAX_PAGE_SIZE)
+        cursor (str): next_cursor from the previous page, if any
+        fields (Sequence[str]): API fields to return (None for all)
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[str]]: The page and the cursor
+        for the next one (None on the last page)
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    names = list(fields) if fields else list(VIDEO_FIELDS)
+
+    clause = 'WHERE status = ?'
+    params: List[Any] = [status]
+    if cursor:
+        created_at, video_id = decode_cursor(cursor)
+        clause += ' AND (created_at, id) < (?, ?)'
+        params += [created_at, video_id]
+    clause += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+    params.append(limit + 1)
+
+    # The cursor needs created_at and id even when they aren't returned
+    rows = _select(conn, names, clause, params, extra=('created_at',))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    page = _rows_to_videos(rows, names)
+
+    next_cursor = encode_cursor(rows[-1][-1], rows[-1][-2]) if has_more else None
+    return page, next_cursor
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """
+    Lowercased words of a free-text search.
+
+    Raises:
+        ValueError: If the query has no words
+    """
+    words = list(dict.fromkeys(re.findall(r'\w+', (query or '').lower())))[:MAX_SEARCH_TERMS]
+    if not words:
+        raise ValueError('Search needs at least one word')
+    return words
+
+def fts_match(terms: Sequence[str]) -> str:
+    """
+    FTS5 query requiring every term. The last is matched as a prefix,
+    since it's the word still being typed (unless it's a single letter);
+    the others are whole words, which FTS5 looks up far more cheaply.
+    """
+    phrases = [f'"{term}"' for term in terms]
+    if len(terms[-1]) > 1:
+        phrases[-1] += '*'
+    return ' '.join(phrases)
+
+def highlight(snippet: str, start: str = '\x02', end: str = '\x03') -> str:
+    """HTML-escape a snippet and turn its match markers into <mark> tags."""
+    return html.escape(snippet).replace(start, '<mark>').replace(end, '</mark>')
+
+def search_videos(conn: sqlite3.Connection, query: str, status: Optional[str] = None, limit: int = 20,
+                  fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Videos whose trend, script or captions match a free-text search, best first.
+
+    Every word must match after Porter stemming ("taxes" finds "tax"),
+    the last one as a word prefix ("mort" finds "mortgage"). Every match
+    is ranked inside FTS5 by bm25, with trend matches weighted highest
+    and ties going to the newest video.
+
+    Args:
+        conn (sqlite3.Connection): Database connection
+        query (str): Free text from the search box
+        status (str): Only videos with this status (None for any)
+        limit (int): Results to return (clamped to 1..MAX_PAGE_SIZE)
+        fields (Sequence[str]): API fields to return (None for all)
+
+    Returns:
+        List[Dict[str, Any]]: Videos, each with an HTML `snippet` of the
+        best-matching text with matches in <mark> tags
+
+    Raises:
+        ValueError: If the query has no words
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    names = list(fields) if fields else list(VIDEO_FIELDS)
+    match = fts_match(search_terms(query))
+
+    # FTS5 scores every match and keeps only the best `limit`; docids grow
+    # with insertion, so rowid breaks ties newest first
+    sql = '''
+        SELECT video_search.rowid, docs.video_id
+        FROM video_search JOIN video_search_docs AS docs ON docs.docid = video_search.rowid
+    '''
+    params: List[Any] = [match]
+    if status:
+        sql += ' JOIN videos ON videos.id = docs.video_id WHERE video_search MATCH ? AND videos.status = ?'
+        params.append(status)
+    else:
+        sql += ' WHERE video_search MATCH ?'
+    sql += ' ORDER BY video_search.rank, video_search.rowid DESC LIMIT ?'
+    params.append(limit)
+
+    best = conn.execute(sql, params).fetchall()
+    if not best:
+        return []
+
+    # Snippets for just the results: a rowid range the FTS query can seek
+    # to, with the exact rowids checked (+ keeps that check out of the
+    # index) so snippet() runs once per result
+    docids = [row[0] for row in best]
+    snippets = dict(conn.execute(
+        f"""
+            SELECT rowid, snippet(video_search, -1, char(2), char(3), '…', 16) FROM video_search
+            WHERE video_search MATCH ? AND rowid BETWEEN ? AND ?
+              AND +rowid IN ({', '.join('?' * len(docids))})
+        """,
+        (match, min(docids), max(docids), *docids)
+    ).fetchall())
+
+    ids = [row[1] for row in best]
+    rows = _select(conn, names, f"WHERE id IN ({', '.join('?' * len(ids))})", ids)
+    position = {video_id: number for number, video_id in enumerate(ids)}
+    rows.sort(key=lambda row: position[row[-1]])
+
+    videos = _rows_to_videos(rows, names)
+    docid_of = {row[1]: row[0] for row in best}
+    for row, video in zip(rows, videos):
+        video['snippet'] = highlight(snippets.get(docid_of[row[-1]], ''))
+    return videos
+
+STATS_SQL = '''
+    SELECT
+        COALESCE((SELECT count FROM video_status_counts WHERE status = 'pending'), 0) AS pending,
+        COALESCE((SELECT count FROM video_status_counts WHERE status = 'approved'), 0) AS approved,
+        COALESCE((SELECT count FROM video_status_counts WHERE status = 'rejected'), 0) AS rejected,
+        (SELECT COALESCE(SUM(created), 0) FROM video_rollups
+         WHERE bucket = 'hour' AND platform = ''
+           AND bucket_start > CAST(strftime('%s', 'now', '-7 days') AS INTEGER) - 3600) AS recent_videos
+'''
+
+def video_stats(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Dashboard statistics in one statement.
+
+    Status totals are point lookups in the trigger-maintained
+    video_status_counts table. The 7-day count sums at most 169 hourly
+    rollups (the oldest hour may be partly outside the window) instead
+    of scanning videos.created_at.
+    """
+    row = conn.execute(STATS_SQL).fetchone()
+    stats = {key: row[key] for key in ('pending', 'approved', 'rejected', 'recent_videos')}
+    stats['total_videos'] = stats['pending'] + stats['approved'] + stats['rejected']
+    return stats
+
+def video_timeseries(conn: sqlite3.Connection, bucket: str = 'hour', days: int = 7,
+                     now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Videos created, approved and rejected, and posts per platform, per
+    hour or day, for charts.
+
+    Reads the trigger-maintained video_rollups: one primary-key range
+    scan of a few rows per bucket. Buckets with no activity are filled
+    with zeros so every series has one point per bucket.
+
+    Args:
+        conn (sqlite3.Connection): Database connection
+        bucket (str): 'hour' or 'day'
+        days (int): How far back to go, up to MAX_TIMESERIES_POINTS buckets
+        now (float): Unix time the window ends at (default: now)
+
+    Returns:
+        Dict[str, Any]: bucket, start and end (unix seconds, UTC bucket
+        boundaries) and points, oldest first: bucket_start, created,
+        approved, rejected, posted and posted_by_platform
+
+    Raises:
+        ValueError: If the bucket is unknown or days is not positive
+    """
+    if bucket not in TIMESERIES_BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(TIMESERIES_BUCKETS)}")
+    if days < 1:
+        raise ValueError('days must be at least 1')
+
+    seconds = TIMESERIES_BUCKETS[bucket]
+    now = int(time.time() if now is None else now)
+    last = now - now % seconds
+    count = max(1, min(days * 86400 // seconds, MAX_TIMESERIES_POINTS))
+    first = last - (count - 1) * seconds
+
+    points = {
+        start: {'bucket_start': start, 'created': 0, 'approved': 0, 'rejected': 0, 'posted': 0,
+                'posted_by_platform': {}}
+        for start in range(first, last + 1, seconds)
+    }
+    rows = conn.execute('''
+        SELECT bucket_start, platform, created, approved, rejected, posted FROM video_rollups
+        WHERE bucket = ? AND bucket_start BETWEEN ? AND ?
+    ''', (bucket, first, last))
+    for start, platform, created, approved, rejected, posted in rows:
+        point = points[start]
+        if platform:
+            point['posted_by_platform'][platform] = posted
+            point['posted'] += posted
+        else:
+            point['created'], point['approved'], point['rejected'] = created, approved, rejected
+
+    return {'bucket': bucket, 'start': first, 'end': last + seconds, 'points': list(points.values())}
+
+class StatsCache:
+    """
+    Serves /api/stats from memory for a few seconds at a time.
+
+    Every open dashboard polls stats, so within the TTL they all share
+    one query. Callers pass the current change sequence as the version:
+    a write from any process changes it and forces a fresh read, and
+    writers in this process can also call invalidate() directly.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._stats: Optional[Dict[str, int]] = None
+        self._version: Optional[int] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, conn: sqlite3.Connection, version: Optional[int] = None) -> Dict[str, int]:
+        with self._lock:
+            if (self._stats is not None and version == self._version
+                    and time.monotonic() < self._expires_at):
+                return self._stats
+
+            self._stats = video_stats(conn)
+            self._version = version
+            self._expires_at = time.monotonic() + self.ttl
+            return self._stats
+
+    def invalidate(self):
+        with self._lock:
+            self._stats = None
+
+def current_change_seq(conn: sqlite3.Connection) -> int:
+    """The latest change sequence number (0 for an empty database)."""
+    row = conn.execute('SELECT seq FROM video_change_seq WHERE id = 1').fetchone()
+    return row[0] if row else 0
+
+def video_changes(conn: sqlite3.Connection, since: int, limit: int = MAX_PAGE_SIZE,
+                  fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Videos created or changed, and ids deleted, after a change sequence.
+
+    Changes come in sequence order and span every status, so a client
+    watching the pending list also sees the rows that left it. Pass the
+    returned cursor as the next `since`; has_more means call again.
+
+    Args:
+        conn (sqlite3.Connection): Database connection
+        since (int): Last change sequence the client has applied
+        limit (int): Maximum changes plus deletions to return
+        fields (Sequence[str]): API fields for changed videos (id and status always included)
+
+    Returns:
+        Dict[str, Any]: changes, deleted, cursor and has_more
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    names = list(dict.fromkeys(['id', 'status', *(fields or VIDEO_FIELDS)]))
+
+    rows = _select(conn, names, 'WHERE change_seq > ? ORDER BY change_seq LIMIT ?', (since, limit + 1),
+                   extra=('change_seq',))
+    tombstones = conn.execute(
+        'SELECT id, change_seq FROM video_tombstones WHERE change_seq > ? ORDER BY change_seq LIMIT ?',
+        (since, limit + 1)
+    ).fetchall()
+
+    # Merge both streams by sequence and keep the first `limit`
+    merged = sorted(
+        [(row[-1], 'change', row) for row in rows] +
+        [(row['change_seq'], 'delete', row) for row in tombstones],
+        key=lambda item: item[0]
+    )
+    has_more = len(merged) > limit
+    merged = merged[:limit]
+
+    return {
+        'changes': _rows_to_videos([row for _, kind, row in merged if kind == 'change'], names),
+        'deleted': [row['id'] for _, kind, row in merged if kind == 'delete'],
+        'cursor': str(merged[-1][0] if merged else since),
+        'has_more': has_more
+    }
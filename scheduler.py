@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+McLan Tax Baby Video Creator - Post Scheduler
+Persistent schedule store and dispatcher daemon for social media posts
+"""
+
+import heapq
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+from config import Config
+import db
+from outbox import OutboxSender, enqueue_post, idempotency_key, init_outbox
+
+def slot_minute(timestamp: float) -> int:
+    """A scheduled time as whole minutes since the epoch, so slots compare exactly."""
+    return int(round(timestamp / 60))
+
+class PostSchedule:
+    """SQLite-backed store of scheduled posts."""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.init_schema()
+
+    def connect(self):
+        conn = db.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def init_schema(self):
+        """Create the scheduled_posts table if needed."""
+        conn = self.connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scheduled_posts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                video_id TEXT,
+                video_path TEXT NOT NULL,
+                caption TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                scheduled_at REAL NOT NULL,
+                status TEXT DEFAULT 'pending',
+                result TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                dispatched_at REAL
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status_time
+            ON scheduled_posts (status, scheduled_at)
+        ''')
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(scheduled_posts)')]
+        if 'video_id' not in columns:
+            conn.execute('ALTER TABLE scheduled_posts ADD COLUMN video_id TEXT')
+        conn.commit()
+        conn.close()
+
+    def add(self, video_path: str, caption: str, platform: str, scheduled_at: float,
+            video_id: Optional[str] = None) -> int:
+        """
+        Store a post and return its id.
+
+        Args:
+            video_id (str): The dashboard video being posted, if any; posts
+                without one are keyed by their schedule id in the outbox
+        """
+        conn = self.connect()
+        cursor = conn.execute('''
+            INSERT INTO scheduled_posts (video_id, video_path, caption, platform, scheduled_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (video_id, video_path, caption, platform, scheduled_at))
+        conn.commit()
+        post_id = cursor.lastrowid
+        conn.close()
+        return post_id
+
+    def pending(self, after_id: int = 0) -> List[sqlite3.Row]:
+        """Pending posts (including overdue ones) with an id greater than after_id."""
+        conn = self.connect()
+        rows = conn.execute(
+            'SELECT * FROM scheduled_posts WHERE status = ? AND id > ? ORDER BY id',
+            ('pending', after_id)
+        ).fetchall()
+        conn.close()
+        return rows
+
+    def get(self, post_id: int) -> Optional[sqlite3.Row]:
+        conn = self.connect()
+        row = conn.execute('SELECT * FROM scheduled_posts WHERE id = ?', (post_id,)).fetchone()
+        conn.close()
+        return row
+
+    def claim(self, post_id: int) -> Optional[sqlite3.Row]:
+        """
+        Take a pending post for dispatch, or None if it isn't pending.
+
+        One conditional UPDATE, so when dispatchers in several processes
+        load the same row only one of them gets to send it.
+        """
+        conn = self.connect()
+        try:
+            claimed = conn.execute('''
+                UPDATE scheduled_posts SET status = 'dispatching', dispatched_at = ?
+                WHERE id = ? AND status = 'pending'
+            ''', (time.time(), post_id)).rowcount == 1
+            conn.commit()
+            if not claimed:
+                return None
+            return conn.execute('SELECT * FROM scheduled_posts WHERE id = ?', (post_id,)).fetchone()
+        finally:
+            conn.close()
+
+    def release_stale(self, older_than: float) -> int:
+        """
+        Put posts stuck in 'dispatching' for more than older_than seconds
+        back to pending, and return how many there were.
+
+        A claim that is never marked means the dispatcher died between
+        the two. Sending again is safe: the outbox dedups by video and
+        platform, so a post that did reach it is not queued twice.
+        """
+        conn = self.connect()
+        try:
+            released = conn.execute('''
+                UPDATE scheduled_posts SET status = 'pending'
+                WHERE status = 'dispatching' AND dispatched_at < ?
+            ''', (time.time() - older_than,)).rowcount
+            conn.commit()
+            return released
+        finally:
+            conn.close()
+
+    def mark(self, post_id: int, status: str, result: str = None):
+        """Record the outcome of a dispatched post."""
+        conn = self.connect()
+        conn.execute(
+            'UPDATE scheduled_posts SET status = ?, result = ?, dispatched_at = ? WHERE id = ?',
+            (status, result, time.time(), post_id)
+        )
+        conn.commit()
+        conn.close()
+
+    def taken_slots(self, platform: str, start: float, end: float) -> set:
+        """Minutes (see slot_minute) already used by a platform inside a window."""
+        conn = self.connect()
+        # Half a minute of slack either side, matching slot_minute's rounding
+        rows = conn.execute('''
+            SELECT scheduled_at FROM scheduled_posts
+            WHERE platform = ? AND status != ? AND scheduled_at >= ? AND scheduled_at < ?
+        ''', (platform, 'failed', start - 30, end + 30)).fetchall()
+        conn.close()
+        return {slot_minute(row[0]) for row in rows}
+
+    def next_slot(self, platform: str, after: Optional[datetime] = None) -> datetime:
+        """
+        Find the next free daily slot for a platform.
+
+        Config.POSTS_PER_DAY slots are spaced evenly across the posting
+        window, and each platform is offset by a fraction of the gap so the
+        platforms take turns instead of all posting in the same minute.
+        """
+        after = after or datetime.now()
+        window_start = Config.POSTING_WINDOW_START
+        window_hours = max(Config.POSTING_WINDOW_END - window_start, 1)
+        per_day = max(Config.POSTS_PER_DAY, 1)
+        gap = timedelta(hours=window_hours) / per_day
+
+        platforms = Config.PLATFORMS
+        platform_index = platforms.index(platform) if platform in platforms else 0
+        offset = gap * platform_index / len(platforms)
+
+        day = after.replace(hour=0, minute=0, second=0, microsecond=0)
+
+        for _ in range(365):
+            first = day + timedelta(hours=window_start) + offset
+            slots = [first + gap * i for i in range(per_day)]
+            taken = self.taken_slots(
+                platform,
+                slots[0].timestamp(),
+                (slots[-1] + timedelta(seconds=1)).timestamp()
+            )
+
+            for slot in slots:
+                if slot > after and slot_minute(slot.timestamp()) not in taken:
+                    return slot
+
+            day += timedelta(days=1)
+
+        raise RuntimeError(f"No free posting slot found for {platform}")
+
+class PostDispatcher(threading.Thread):
+    """
+    Daemon that fires scheduled posts on time.
+
+    Pending posts sit in a min-heap keyed by scheduled time. The thread
+    sleeps until the head of the heap is due (or a new post arrives) and
+    polls the store once a second for posts added by other processes.
+    On start it loads every pending row, so slots missed while the
+    dispatcher was down are fired immediately. Claims left unmarked for
+    stale_seconds (a dispatcher died mid-dispatch) are released back to
+    pending on start and then every stale_seconds.
+
+    Firing a post hands it to the posting outbox (see outbox.py); the
+    outbox sender does the actual upload with retries and dedup.
+    """
+
+    def __init__(self, schedule: Optional[PostSchedule] = None,
+                 post_fn: Optional[Callable[[str, str, str, str], str]] = None, poll_interval: float = 1.0,
+                 stale_seconds: float = 300.0):
+        super().__init__(name="post-dispatcher", daemon=True)
+        self.schedule = schedule or PostSchedule()
+        self.post_fn = post_fn or self._default_post_fn
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self._heap = []
+        self._queued = set()
+        self._last_seen_id = 0
+        self._wakeup = threading.Condition()
+        self._stopped = threading.Event()
+
+    def _default_post_fn(self, video_id: str, video_path: str, caption: str, platform: str) -> str:
+        """Hand the post to the outbox, which owns retries and dedup."""
+        conn = self.schedule.connect()
+        init_outbox(conn)
+        queued = enqueue_post(conn, video_id, platform, video_path, caption)
+        conn.commit()
+        conn.close()
+        key = idempotency_key(video_id, platform)
+        return f"Queued in outbox (key {key})" if queued else f"Already in outbox (key {key})"
+
+    def enqueue(self, post_id: int, scheduled_at: float):
+        """Add a post to the in-memory heap and wake the dispatcher."""
+        with self._wakeup:
+            if post_id not in self._queued:
+                self._queued.add(post_id)
+                heapq.heappush(self._heap, (scheduled_at, post_id))
+            self._wakeup.notify()
+
+    def _load_pending(self, rescan: bool = False):
+        # Released rows keep their old ids, below the cursor, so a rescan
+        # reads from the start
+        for row in self.schedule.pending(0 if rescan else self._last_seen_id):
+            self._last_seen_id = max(self._last_seen_id, row['id'])
+            self.enqueue(row['id'], row['scheduled_at'])
+
+    def stop(self):
+        self._stopped.set()
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def _release_stale(self):
+        if self.schedule.release_stale(self.stale_seconds):
+            self._load_pending(rescan=True)
+
+    def run(self):
+        self.schedule.release_stale(self.stale_seconds)
+        self._load_pending(rescan=True)
+        last_poll = last_release = time.time()
+
+        while not self._stopped.is_set():
+            now = time.time()
+
+            if now - last_poll >= self.poll_interval:
+                self._load_pending()
+                last_poll = now
+
+            if now - last_release >= self.stale_seconds:
+                self._release_stale()
+                last_release = now
+
+            due = []
+            with self._wakeup:
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap)[1])
+
+                if not due:
+                    next_due = self._heap[0][0] - now if self._heap else self.poll_interval
+                    self._wakeup.wait(timeout=max(0.0, min(next_due, self.poll_interval)))
+                    continue
+
+            for post_id in due:
+                self._dispatch(post_id)
+
+    def _dispatch(self, post_id: int):
+        with self._wakeup:
+            self._queued.discard(post_id)
+
+        row = self.schedule.claim(post_id)
+        if row is None:
+            return
+
+        # Outbox dedup is per (video, platform): a post with no dashboard
+        # video is its own video, so the same file can be scheduled again
+        video_id = row['video_id'] or f"scheduled:{row['id']}"
+        try:
+            result = self.post_fn(video_id, row['video_path'], row['caption'], row['platform'])
+            self.schedule.mark(post_id, 'dispatched', result)
+        except Exception as e:
+            self.schedule.mark(post_id, 'failed', str(e))
+
+if __name__ == "__main__":
+    dispatcher = PostDispatcher()
+    dispatcher.start()
+    sender = OutboxSender()
+    sender.start()
+
+    print("📅 McLan Tax post dispatcher running...")
+    print(f"📱 Platforms: {', '.join(Config.PLATFORMS)}")
+    print(f"📊 Daily Posts: {Config.POSTS_PER_DAY} per platform")
+
+    try:
+        while dispatcher.is_alive():
+            dispatcher.join(timeout=1)
+    except KeyboardInterrupt:
+        print("\n🛑 Dispatcher stopped")
+        dispatcher.stop()
+        sender.stop()
@@ -0,0 +1,200 @@
+"""
+McLan Tax Baby Video Creator - Script Similarity
+MinHash/LSH index that catches near-duplicate scripts before rendering
+"""
+
+import random
+import re
+import sqlite3
+import sys
+import threading
+import zlib
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+from config import Config
+import db
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+
+# Multiply-shift hash family: top 32 bits of (a * h + b) mod 2^64, a odd
+_MASK64 = (1 << 64) - 1
+_rng = random.Random(20240113)
+_PERMUTATIONS = [(_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM)]
+
+# Every permutation at once: a and b sit in 128-bit lanes of one big int,
+# so a single multiply-add gives a * h + b for all of them (a product
+# needs 97 bits, so nothing carries into the next lane) and the low 64
+# bits of each lane are the permuted hash mod 2^64
+_LANE_BITS = 128
+_PACKED_A = sum(a << (_LANE_BITS * i) for i, (a, _) in enumerate(_PERMUTATIONS))
+_PACKED_B = sum(b << (_LANE_BITS * i) for i, (_, b) in enumerate(_PERMUTATIONS))
+_PACKED_BYTES = _LANE_BITS // 8 * NUM_PERM
+_LANE_WORDS = _LANE_BITS // 64
+
+def shingles(script: str) -> Set[int]:
+    """Hashed word 3-grams of a script, ignoring case, punctuation and emoji."""
+    words = re.findall(r"[a-z0-9']+", script.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words + [""] * (SHINGLE_SIZE - len(words))
+    return {
+        zlib.crc32(" ".join(words[i:i + SHINGLE_SIZE]).encode("utf-8"))
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+@lru_cache(maxsize=1024)
+def minhash(script: str) -> Tuple[int, ...]:
+    """
+    MinHash signature: for each permutation, the top 32 bits of the
+    smallest permuted shingle hash.
+
+    Equal to taking min(((a * h + b) & _MASK64) >> 32) per permutation,
+    but computed one shingle at a time across all permutations, with the
+    minimums taken over 64-bit words in C. Recent scripts are cached, as
+    a script is usually checked and then added.
+    """
+    words = array('Q', b"".join([
+        (_PACKED_A * h + _PACKED_B).to_bytes(_PACKED_BYTES, 'little') for h in shingles(script)
+    ]))
+    if sys.byteorder == 'big':
+        words.byteswap()
+
+    # Word 2i of each shingle's block is permutation i's low 64 bits
+    stride = _LANE_WORDS * NUM_PERM
+    return tuple(min(words[i:len(words):stride]) >> 32 for i in range(0, stride, _LANE_WORDS))
+
+def estimated_similarity(a: Tuple[int, ...], b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / NUM_PERM
+
+def _band_keys(signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+    return [signature[i * ROWS:(i + 1) * ROWS] for i in range(BANDS)]
+
+class ScriptSimilarityIndex:
+    """
+    Near-duplicate detector over every stored script.
+
+    Signatures persist in the script_signatures table and live in memory
+    as LSH buckets (16 bands of 4 rows), so a lookup only compares
+    against the few scripts that share a band with the new one instead
+    of scanning them all. With 16x4 banding, pairs above ~0.5 Jaccard
+    similarity almost always collide; the final verdict uses the
+    estimated similarity against Config.SCRIPT_SIMILARITY_THRESHOLD.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, threshold: Optional[float] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.threshold = Config.SCRIPT_SIMILARITY_THRESHOLD if threshold is None else threshold
+        self._signatures: Dict[str, Tuple[int, ...]] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[str]]] = [{} for _ in range(BANDS)]
+        self._last_row_id = 0
+        self._lock = threading.Lock()
+
+        conn = self.connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS script_signatures (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ref TEXT NOT NULL UNIQUE,
+                signature BLOB NOT NULL
+            )
+        ''')
+        self._backfill_videos(conn)
+        conn.commit()
+        conn.close()
+
+        self.refresh()
+
+    def connect(self):
+        return db.connect(self.db_path)
+
+    def _backfill_videos(self, conn: sqlite3.Connection):
+        """Sign stored video scripts that have no signature yet."""
+        has_videos = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'videos'"
+        ).fetchone()
+        if not has_videos:
+            return
+
+        rows = conn.execute('''
+            SELECT id, script FROM videos
+            WHERE id NOT IN (SELECT ref FROM script_signatures)
+        ''').fetchall()
+        conn.executemany(
+            'INSERT OR IGNORE INTO script_signatures (ref, signature) VALUES (?, ?)',
+            [(ref, array('I', minhash(script)).tobytes()) for ref, script in rows]
+        )
+
+    def refresh(self):
+        """Load signatures added since the last refresh (including by other processes)."""
+        conn = self.connect()
+        rows = conn.execute(
+            'SELECT id, ref, signature FROM script_signatures WHERE id > ? ORDER BY id',
+            (self._last_row_id,)
+        ).fetchall()
+        conn.close()
+
+        with self._lock:
+            for row_id, ref, blob in rows:
+                self._index(ref, tuple(array('I', blob)))
+                self._last_row_id = row_id
+
+    def _index(self, ref: str, signature: Tuple[int, ...]):
+        self._signatures[ref] = signature
+        for band, key in enumerate(_band_keys(signature)):
+            self._buckets[band].setdefault(key, []).append(ref)
+
+    def find_similar(self, script: str = None, signature: Tuple[int, ...] = None) -> List[Tuple[str, float]]:
+        """
+        Stored scripts at or above the similarity threshold, most similar first.
+
+        Args:
+            script (str): Script text (signed on the fly)
+            signature (Tuple[int, ...]): Precomputed signature, if already known
+
+        Returns:
+            List[Tuple[str, float]]: (ref, estimated similarity) pairs
+        """
+        signature = signature or minhash(script)
+
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(_band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+
+            matches = [
+                (ref, estimated_similarity(signature, self._signatures[ref]))
+                for ref in candidates
+            ]
+
+        matches = [(ref, score) for ref, score in matches if score >= self.threshold]
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def add(self, ref: str, script: str = None, signature: Tuple[int, ...] = None):
+        """Store a script's signature so later lookups see it."""
+        signature = signature or minhash(script)
+
+        conn = self.connect()
+        cursor = conn.execute(
+            'INSERT OR IGNORE INTO script_signatures (ref, signature) VALUES (?, ?)',
+            (ref, array('I', signature).tobytes())
+        )
+        conn.commit()
+        conn.close()
+
+        if cursor.rowcount:
+            self.refresh()
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_script_index() -> ScriptSimilarityIndex:
+    """Get the process-wide script similarity index."""
+    global _index
+
+    with _index_lock:
+        if _index is None:
+            _index = ScriptSimilarityIndex()
+        return _index
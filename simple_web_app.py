@@ -4,122 +4,193 @@ McLan Tax Baby Video Creator - Simple Web Dashboard
 Standalone Flask backend for visual dashboard (no CrewAI dependencies)
 """
 
-from flask import Flask, jsonify, request, render_template, send_from_directory
+from flask import Flask, Response, jsonify, request, render_template
 from flask_cors import CORS
 import json
 import os
-import sqlite3
-from datetime import datetime, timedelta
+from datetime import datetime
 import uuid
 import time
+from queries import parse_bulk_actions, parse_fields
+from storage import get_store
+from assets import asset_url, send_static
+from json_provider import init_json
+from events import get_broker
+from http_cache import change_etag, not_modified, request_params, with_validators
 
-app = Flask(__name__)
-CORS(app)
+# static/ is served by static_files() below, with hashed builds cached long-term
+app = Flask(__name__, static_folder=None)
+app.add_template_global(asset_url)
+init_json(app)
+CORS(app, expose_headers=['X-Next-Cursor', 'X-Sync-Cursor'])
 
-# Database setup
+broker = get_broker()
+
+# Simulated posting targets
+POSTED_PLATFORMS = ['tiktok', 'instagram', 'youtube_shorts']
+
+# Video storage, opened by init_db()
+store = None
+
+# Storage setup
 def init_db():
-    """Initialize the SQLite database."""
-    conn = sqlite3.connect('baby_videos.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS videos (
-            id TEXT PRIMARY KEY,
-            trend TEXT NOT NULL,
-            script TEXT NOT NULL,
-            video_url TEXT,
-            captions TEXT,
-            status TEXT DEFAULT 'pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            approved_at TIMESTAMP,
-            posted_platforms TEXT
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    """Open the video store chosen by STORAGE_BACKEND (sqlite, jsonl, postgres or memory)."""
+    global store
+    store = get_store()
 
-def get_db_connection():
-    """Get database connection."""
-    conn = sqlite3.connect('baby_videos.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+def publish_video_events(event, video_ids):
+    """
+    Push video changes, then the resulting stats, to live dashboards.
+    
+    Call after the changes are committed so the stats include them.
+    """
+    fields = None if event == 'video-created' else ('id', 'status')
+    for video_id in video_ids:
+        video = store.get(video_id, fields)
+        if video:
+            broker.publish(event, video)
+    broker.publish('stats-changed', store.stats())
 
 # API Routes
 @app.route('/api/videos', methods=['GET'])
 def get_videos():
-    """Get all pending videos for review."""
-    conn = get_db_connection()
+    """
+    Get one page of videos for review, newest first.
     
+    Query params: status (default pending), limit (max 100), cursor (from
+    the previous page's X-Next-Cursor header) and fields (comma-separated
+    projection, e.g. fields=id,trend,status for list views). archived=1
+    pages through videos archive.py has moved out of the live database.
+    
+    With since=<X-Sync-Cursor> it instead returns only what changed after
+    that point: {changes, deleted, cursor, has_more}.
+    
+    Responses carry an ETag; a matching If-None-Match gets a 304 without
+    any row being read.
+    """
     # Get filter parameters
     status = request.args.get('status', 'pending')
     limit = request.args.get('limit', 20, type=int)
+    since = request.args.get('since')
     
-    videos = conn.execute(
-        'SELECT * FROM videos WHERE status = ? ORDER BY created_at DESC LIMIT ?',
-        (status, limit)
-    ).fetchall()
-    
-    conn.close()
-    
-    # Convert to JSON format
-    video_list = []
-    for video in videos:
-        captions = json.loads(video['captions']) if video['captions'] else {}
-        video_data = {
-            'id': video['id'],
-            'trend': video['trend'],
-            'script': video['script'],
-            'videoUrl': video['video_url'],
-            'captions': captions,
-            'status': video['status'],
-            'created_at': video['created_at'],
-            'approved_at': video['approved_at'],
-            'posted_platforms': video['posted_platforms']
-        }
-        video_list.append(video_data)
+    # Read before listing: anything committed in between shows up (at
+    # worst twice) in the next delta, and only makes the ETag stale
+    sync_cursor = store.version()
+    etag = change_etag(sync_cursor, 'videos', request_params())
+    sync_header = [('X-Sync-Cursor', str(sync_cursor))]
     
-    return jsonify(video_list)
+    cached = not_modified(etag, sync_header)
+    if cached:
+        return cached
+    
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        
+        if since is not None:
+            if not since.isdigit():
+                raise ValueError('Invalid since cursor')
+            return with_validators(jsonify(store.changes_since(int(since), limit, fields)), etag)
+        
+        list_page = store.list_archived if request.args.get('archived') in ('1', 'true') else store.list
+        video_list, next_cursor = list_page(status, limit, request.args.get('cursor'), fields)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    # The body stays a plain list; paging and sync cursors travel in headers
+    response = with_validators(jsonify(video_list), etag, sync_header)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@app.route('/api/videos/search', methods=['GET'])
+def search_videos():
+    """
+    Full-text search over trends, scripts and captions, best match first.
+    
+    Query params: q (every word must match, the last as a prefix),
+    status (optional), limit (max 100) and fields. Each result also has a
+    `snippet`: HTML-escaped text with the matches in <mark> tags.
+    """
+    etag = change_etag(store.version(), 'search', request_params())
+    cached = not_modified(etag)
+    if cached:
+        return cached
+    
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        results = store.search(
+            request.args.get('q', ''),
+            request.args.get('status') or None,
+            request.args.get('limit', 20, type=int),
+            fields
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return with_validators(jsonify(results), etag)
 
 @app.route('/api/videos/<video_id>/approve', methods=['POST'])
 def approve_video(video_id):
     """Approve a video and post it to social media."""
-    conn = get_db_connection()
+    # Update status and posted platforms in one write
+    found, = store.review([(video_id, 'approve')], {'posted_platforms': POSTED_PLATFORMS})
     
-    # Update video status
-    conn.execute(
-        'UPDATE videos SET status = ?, approved_at = ? WHERE id = ?',
-        ('approved', datetime.now().isoformat(), video_id)
-    )
-    conn.commit()
+    if not found:
+        return jsonify({'success': False, 'message': 'Video not found'}), 404
     
-    # Simulate posting to platforms
-    posted_platforms = ['tiktok', 'instagram', 'youtube_shorts']
-    
-    conn.execute(
-        'UPDATE videos SET posted_platforms = ? WHERE id = ?',
-        (json.dumps(posted_platforms), video_id)
-    )
-    conn.commit()
-    conn.close()
+    publish_video_events('status-changed', [video_id])
     
     return jsonify({
         'success': True, 
         'message': 'Video approved and posted to all platforms',
-        'platforms': posted_platforms
+        'platforms': POSTED_PLATFORMS
+    })
+
+@app.route('/api/videos/bulk', methods=['POST'])
+def bulk_review_videos():
+    """
+    Approve and/or reject many videos in one write (one commit).
+    
+    Body: {"ids": [...], "action": "approve" | "reject"} or
+    {"actions": [{"id": ..., "action": ...}, ...]}. Each id gets its own
+    result; unknown ids fail individually without undoing the rest, and
+    the response is a 404 when none of them exist.
+    """
+    try:
+        items = parse_bulk_actions(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    found = store.review(items, {'posted_platforms': POSTED_PLATFORMS})
+    results = []
+    
+    for (video_id, action), success in zip(items, found):
+        result = {'id': video_id, 'action': action, 'success': success}
+        if not success:
+            result['message'] = 'Video not found'
+        results.append(result)
+    
+    updated = [result['id'] for result in results if result['success']]
+    if not updated:
+        return jsonify({'success': False, 'message': 'Videos not found', 'updated': 0, 'results': results}), 404
+    
+    publish_video_events('status-changed', updated)
+    
+    return jsonify({
+        'success': len(updated) == len(results),
+        'updated': len(updated),
+        'results': results
     })
 
 @app.route('/api/videos/<video_id>/reject', methods=['POST'])
 def reject_video(video_id):
     """Reject a video."""
-    conn = get_db_connection()
+    found, = store.review([(video_id, 'reject')])
     
-    conn.execute(
-        'UPDATE videos SET status = ? WHERE id = ?',
-        ('rejected', video_id)
-    )
-    conn.commit()
-    conn.close()
+    if not found:
+        return jsonify({'success': False, 'message': 'Video not found'}), 404
+    
+    publish_video_events('status-changed', [video_id])
     
     return jsonify({'success': True, 'message': 'Video rejected'})
 
@@ -169,25 +240,17 @@ def generate_video():
             'id': video_id,
             'trend': scenario['trend'],
             'script': scenario['script'],
-            'video_url': f'https://example.com/videos/baby_tax_video_{int(time.time())}.mp4',
-            'captions': json.dumps({
+            'videoUrl': f'https://example.com/videos/baby_tax_video_{int(time.time())}.mp4',
+            'captions': {
                 'tiktok': scenario['tiktok'],
                 'instagram': scenario['instagram'],
                 'youtube': scenario['youtube']
-            }),
+            },
             'status': 'pending'
         }
         
-        conn = get_db_connection()
-        conn.execute('''
-            INSERT INTO videos (id, trend, script, video_url, captions, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            mock_data['id'], mock_data['trend'], mock_data['script'],
-            mock_data['video_url'], mock_data['captions'], mock_data['status']
-        ))
-        conn.commit()
-        conn.close()
+        store.add(mock_data)
+        publish_video_events('video-created', [video_id])
         
         return jsonify({
             'success': True, 
@@ -200,39 +263,52 @@ def generate_video():
             'message': f'Error generating video: {str(e)}'
         }), 500
 
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Stream live dashboard updates as Server-Sent Events."""
+    return Response(
+        broker.stream(request.headers.get('Last-Event-ID')),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
-    """Get dashboard statistics."""
-    conn = get_db_connection()
+    """Get dashboard statistics (maintained counters, cached briefly)."""
+    # recent_videos is a sliding 7-day window, so the ETag also rolls
+    # over every minute even when nothing was written
+    change_seq = store.version()
+    etag = change_etag(change_seq, 'stats', int(time.time() // 60))
     
-    # Get counts by status
-    pending_count = conn.execute(
-        'SELECT COUNT(*) FROM videos WHERE status = ?', ('pending',)
-    ).fetchone()[0]
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    approved_count = conn.execute(
-        'SELECT COUNT(*) FROM videos WHERE status = ?', ('approved',)
-    ).fetchone()[0]
+    return with_validators(jsonify(store.stats()), etag)
+
+@app.route('/api/stats/timeseries', methods=['GET'])
+def get_stats_timeseries():
+    """
+    Videos created, approved, rejected and posted per hour or day, for charts.
     
-    rejected_count = conn.execute(
-        'SELECT COUNT(*) FROM videos WHERE status = ?', ('rejected',)
-    ).fetchone()[0]
+    Query params: bucket (hour or day, default hour) and days (default 7).
+    Points run oldest first with zeros for quiet buckets; posted is also
+    broken down per platform.
+    """
+    etag = change_etag(store.version(), 'timeseries', request_params(), int(time.time() // 60))
     
-    # Get recent activity
-    recent_videos = conn.execute(
-        'SELECT COUNT(*) FROM videos WHERE created_at > ?',
-        ((datetime.now() - timedelta(days=7)).isoformat(),)
-    ).fetchone()[0]
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    conn.close()
+    try:
+        series = store.timeseries(request.args.get('bucket', 'hour'), request.args.get('days', 7, type=int))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except NotImplementedError:
+        return jsonify({'success': False, 'message': 'Time series need the SQLite store'}), 501
     
-    return jsonify({
-        'pending': pending_count,
-        'approved': approved_count,
-        'rejected': rejected_count,
-        'recent_videos': recent_videos,
-        'total_videos': pending_count + approved_count + rejected_count
-    })
+    return with_validators(jsonify(series), etag)
 
 # Web Routes
 @app.route('/')
@@ -242,57 +318,42 @@ def dashboard():
 
 @app.route('/static/<path:filename>')
 def static_files(filename):
-    """Serve static files."""
-    return send_from_directory('static', filename)
+    """Serve static files (precompressed and long-cached for hashed builds)."""
+    return send_static(filename)
 
 # Initialize database on startup
 if __name__ == '__main__':
     init_db()
     
-    # Add some sample data for demo
-    conn = get_db_connection()
-    
-    # Check if we already have sample data
-    existing = conn.execute('SELECT COUNT(*) FROM videos').fetchone()[0]
-    
-    if existing == 0:
+    # Add some sample data for demo, unless we already have videos
+    if store.stats()['total_videos'] == 0:
         sample_videos = [
             {
                 'id': str(uuid.uuid4()),
                 'trend': 'Tax Season Memes Go Viral on TikTok',
                 'script': 'Hey grownups! *giggles* So I heard you\'re all stressed about taxes again? I\'m literally three months old and even I know you should call McLan Tax! 👶💰',
-                'video_url': 'https://example.com/videos/sample1.mp4',
-                'captions': json.dumps({
+                'videoUrl': 'https://example.com/videos/sample1.mp4',
+                'captions': {
                     'tiktok': 'When this baby knows more about taxes than you do 😂👶 #BabyTax #TaxSeason #McLanTax #FYP',
                     'instagram': 'POV: A baby gives better tax advice than your accountant 💀 @mclantax #reels #viral #tax',
                     'youtube': 'Baby Gives SAVAGE Tax Advice (You Won\'t Believe What Happens Next!) #shorts #tax #baby'
-                })
+                }
             },
             {
                 'id': str(uuid.uuid4()),
                 'trend': 'Inflation Concerns Dominate Social Media',
                 'script': 'Listen up adults! *baby babbles* I may only eat milk and baby food, but even I know inflation is crazy! My diapers cost more than your tax deductions! Call McLan Tax! 👶💸',
-                'video_url': 'https://example.com/videos/sample2.mp4',
-                'captions': json.dumps({
+                'videoUrl': 'https://example.com/videos/sample2.mp4',
+                'captions': {
                     'tiktok': 'This baby understands inflation better than economists 📈👶 #InflationBaby #TaxTips #McLanTax',
                     'instagram': 'When even babies are worried about the economy 😅 Let @mclantax help! #inflation #baby #tax',
                     'youtube': 'Baby Explains Inflation Crisis (Adults Are Shocked!) #shorts #inflation #baby #finance'
-                })
+                }
             }
         ]
         
         for video in sample_videos:
-            conn.execute('''
-                INSERT INTO videos (id, trend, script, video_url, captions, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                video['id'], video['trend'], video['script'],
-                video['video_url'], video['captions'], 'pending'
-            ))
-        
-        conn.commit()
-    
-    conn.close()
+            store.add(video)
     
     print("🍼 McLan Tax Baby Video Dashboard Starting...")
     print("📱 Dashboard: http://localhost:5000")
@@ -0,0 +1,435 @@
+// McLan Tax Baby Video Dashboard
+// Plain React.createElement calls (no JSX), so the browser runs this file
+// as-is; build_assets.py minifies, hashes and precompresses it.
+(function () {
+    'use strict';
+
+    const { useState, useEffect, useRef } = React;
+    const h = React.createElement;
+
+    function StatCard({ value, label }) {
+        return h('div', { className: 'stat-card rounded-2xl p-6 text-center text-white' },
+            h('div', { className: 'text-3xl font-bold' }, value || 0),
+            h('div', { className: 'text-sm opacity-80' }, label)
+        );
+    }
+
+    function Caption({ background, color, label, text }) {
+        return h('div', { className: `${background} p-3 rounded-lg` },
+            h('div', { className: `text-xs font-semibold ${color} mb-1` }, label),
+            h('div', { className: 'text-xs text-gray-700' }, text)
+        );
+    }
+
+    function VideoCard({ video, checked, onToggle, onApprove, onReject }) {
+        const captions = video.captions || {};
+        const pending = !video.status || video.status === 'pending';
+
+        return h('div', { className: 'card rounded-2xl shadow-xl overflow-hidden' },
+            h('div', { className: 'baby-gradient p-4' },
+                h('label', { className: 'flex items-start gap-3 cursor-pointer' },
+                    onToggle && h('input', {
+                        type: 'checkbox',
+                        checked: checked,
+                        onChange: onToggle,
+                        className: 'mt-1 h-5 w-5'
+                    }),
+                    h('h2', { className: 'text-xl font-bold text-gray-800 mb-2' }, '🔥 ', video.trend)
+                ),
+                h('div', { className: 'text-sm text-gray-600' },
+                    '📅 ', new Date(video.created_at).toLocaleDateString(),
+                    pending ? null : ` · ${video.status === 'approved' ? '✅ Approved' : '❌ Rejected'}`
+                )
+            ),
+
+            h('div', { className: 'p-6 space-y-4' },
+                // Search match (HTML-escaped by the server, matches in <mark>)
+                video.snippet && h('div', {
+                    className: 'search-snippet bg-yellow-50 p-3 rounded-lg text-sm text-gray-700',
+                    dangerouslySetInnerHTML: { __html: video.snippet }
+                }),
+
+                // Script
+                h('div', { className: 'bg-gray-50 p-4 rounded-lg' },
+                    h('div', { className: 'text-sm font-semibold text-gray-600 mb-2' }, '👶 Baby Script:'),
+                    h('p', { className: 'italic text-gray-800 text-sm leading-relaxed' }, `"${video.script}"`)
+                ),
+
+                // Video Preview
+                h('div', { className: 'bg-gray-100 p-4 rounded-lg text-center' },
+                    h('div', { className: 'text-6xl mb-2' }, '🎬'),
+                    h('div', { className: 'text-sm text-gray-600' }, 'Video Preview'),
+                    h('div', { className: 'text-xs text-gray-500 mt-1' }, video.videoUrl)
+                ),
+
+                // Captions
+                h('div', { className: 'space-y-2' },
+                    h('div', { className: 'text-sm font-semibold text-gray-600' }, '📱 Platform Captions:'),
+                    h(Caption, { background: 'bg-pink-50', color: 'text-pink-700', label: '📺 TikTok:', text: captions.tiktok }),
+                    h(Caption, { background: 'bg-purple-50', color: 'text-purple-700', label: '📸 Instagram:', text: captions.instagram }),
+                    h(Caption, { background: 'bg-red-50', color: 'text-red-700', label: '▶️ YouTube:', text: captions.youtube })
+                ),
+
+                // Action Buttons
+                pending && h('div', { className: 'flex gap-3 pt-4' },
+                    h('button', {
+                        onClick: onApprove,
+                        className: 'viral-button flex-1 text-white py-3 px-4 rounded-lg font-semibold text-sm'
+                    }, '✅ Approve & Post'),
+                    h('button', {
+                        onClick: onReject,
+                        className: 'reject-button flex-1 text-white py-3 px-4 rounded-lg font-semibold text-sm'
+                    }, '❌ Reject')
+                )
+            )
+        );
+    }
+
+    function Dashboard() {
+        const [videos, setVideos] = useState([]);
+        const [stats, setStats] = useState({});
+        const [loading, setLoading] = useState(true);
+        const [generating, setGenerating] = useState(false);
+        const [query, setQuery] = useState('');
+        const [results, setResults] = useState(null);
+
+        useEffect(() => {
+            fetchVideos();
+            fetchStats();
+
+            // Poll every 30 seconds only while live updates are unavailable
+            let interval = null;
+            const startPolling = () => {
+                if (!interval) {
+                    interval = setInterval(() => {
+                        fetchVideos();
+                        fetchStats();
+                    }, 30000);
+                }
+            };
+
+            if (!window.EventSource) {
+                startPolling();
+                return () => clearInterval(interval);
+            }
+
+            const source = new EventSource('/api/events');
+            source.addEventListener('video-created', (event) => {
+                const video = JSON.parse(event.data);
+                if (video.status === 'pending') {
+                    setVideos(prev => prev.some(v => v.id === video.id) ? prev : [video, ...prev]);
+                }
+            });
+            source.addEventListener('status-changed', (event) => {
+                const { id, status } = JSON.parse(event.data);
+                if (status !== 'pending') {
+                    setVideos(prev => prev.filter(v => v.id !== id));
+                }
+            });
+            source.addEventListener('stats-changed', (event) => {
+                setStats(JSON.parse(event.data));
+            });
+            source.addEventListener('resync', () => {
+                fetchVideos();
+                fetchStats();
+            });
+            source.onopen = () => {
+                // Back from a fallback period: stop polling and catch up
+                if (interval) {
+                    clearInterval(interval);
+                    interval = null;
+                    fetchVideos();
+                    fetchStats();
+                }
+            };
+            source.onerror = () => {
+                // The browser keeps retrying (unless the server said 204); poll meanwhile
+                startPolling();
+            };
+
+            return () => {
+                source.close();
+                clearInterval(interval);
+            };
+        }, []);
+
+        // Search as the reviewer types, once they pause
+        useEffect(() => {
+            const q = query.trim();
+            if (!q) {
+                setResults(null);
+                return;
+            }
+
+            let cancelled = false;
+            const timer = setTimeout(async () => {
+                try {
+                    const response = await fetch(`/api/videos/search?q=${encodeURIComponent(q)}&limit=30`);
+                    const data = await response.json();
+                    if (!cancelled && response.ok) setResults(data);
+                } catch (error) {
+                    console.error('Error searching videos:', error);
+                }
+            }, 250);
+
+            return () => {
+                cancelled = true;
+                clearTimeout(timer);
+            };
+        }, [query]);
+
+        const setResultStatus = (id, status) => {
+            setResults(prev => prev && prev.map(v => v.id === id ? { ...v, status } : v));
+        };
+
+        const syncCursor = useRef(null);
+
+        const applyDelta = (delta) => {
+            setVideos(prev => {
+                const byId = new Map(prev.map(v => [v.id, v]));
+                delta.changes.forEach(v => v.status === 'pending' ? byId.set(v.id, v) : byId.delete(v.id));
+                delta.deleted.forEach(id => byId.delete(id));
+                return Array.from(byId.values())
+                    .sort((a, b) => (b.created_at || '').localeCompare(a.created_at || ''));
+            });
+        };
+
+        const fetchVideos = async () => {
+            try {
+                // Once synced, only download what changed
+                if (syncCursor.current !== null) {
+                    const response = await fetch(`/api/videos?since=${syncCursor.current}`);
+                    if (response.ok) {
+                        const delta = await response.json();
+                        applyDelta(delta);
+                        syncCursor.current = delta.cursor;
+                        if (delta.has_more) fetchVideos();
+                        return;
+                    }
+                    syncCursor.current = null;
+                }
+
+                const response = await fetch('/api/videos');
+                const data = await response.json();
+                syncCursor.current = response.headers.get('X-Sync-Cursor');
+                setVideos(data);
+                setLoading(false);
+            } catch (error) {
+                console.error('Error fetching videos:', error);
+                setLoading(false);
+            }
+        };
+
+        const fetchStats = async () => {
+            try {
+                const response = await fetch('/api/stats');
+                const data = await response.json();
+                setStats(data);
+            } catch (error) {
+                console.error('Error fetching stats:', error);
+            }
+        };
+
+        const [selected, setSelected] = useState(new Set());
+        const selectedIds = videos.filter(v => selected.has(v.id)).map(v => v.id);
+
+        const toggleSelected = (id) => {
+            setSelected(prev => {
+                const next = new Set(prev);
+                next.has(id) ? next.delete(id) : next.add(id);
+                return next;
+            });
+        };
+
+        const handleBulk = async (action) => {
+            if (selectedIds.length === 0) return;
+            try {
+                const response = await fetch('/api/videos/bulk', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ ids: selectedIds, action })
+                });
+                const result = await response.json();
+
+                if (response.ok) {
+                    const done = new Set(result.results.filter(r => r.success).map(r => r.id));
+                    setVideos(prev => prev.filter(v => !done.has(v.id)));
+                    setSelected(new Set());
+                    fetchStats();
+                    const verb = action === 'approve' ? '✅ Approved' : '❌ Rejected';
+                    const missed = result.results.length - done.size;
+                    alert(`${verb} ${done.size} video(s)` + (missed ? ` (${missed} not found)` : ''));
+                } else {
+                    alert(result.message || 'Error updating videos');
+                }
+            } catch (error) {
+                console.error('Error updating videos:', error);
+                alert('Error updating videos');
+            }
+        };
+
+        const handleApprove = async (id) => {
+            try {
+                const response = await fetch(`/api/videos/${id}/approve`, {
+                    method: 'POST'
+                });
+                const result = await response.json();
+
+                if (result.success) {
+                    setVideos(prev => prev.filter(v => v.id !== id));
+                    setResultStatus(id, 'approved');
+                    fetchStats(); // Refresh stats
+                    alert(`✅ Video approved! Posting to: ${result.platforms.join(', ')}`);
+                }
+            } catch (error) {
+                console.error('Error approving video:', error);
+                alert('Error approving video');
+            }
+        };
+
+        const handleReject = async (id) => {
+            try {
+                const response = await fetch(`/api/videos/${id}/reject`, {
+                    method: 'POST'
+                });
+                const result = await response.json();
+
+                if (result.success) {
+                    setVideos(prev => prev.filter(v => v.id !== id));
+                    setResultStatus(id, 'rejected');
+                    fetchStats(); // Refresh stats
+                    alert('❌ Video rejected');
+                }
+            } catch (error) {
+                console.error('Error rejecting video:', error);
+                alert('Error rejecting video');
+            }
+        };
+
+        const handleGenerateVideo = async () => {
+            setGenerating(true);
+            try {
+                const response = await fetch('/api/videos/generate', {
+                    method: 'POST'
+                });
+                const result = await response.json();
+
+                if (result.success) {
+                    alert('🍼 New baby video generation started! It will appear shortly...');
+                    // Refresh videos after a short delay
+                    setTimeout(() => {
+                        fetchVideos();
+                        fetchStats();
+                    }, 3000);
+                }
+            } catch (error) {
+                console.error('Error generating video:', error);
+                alert('Error generating video');
+            } finally {
+                setGenerating(false);
+            }
+        };
+
+        if (loading) {
+            return h('div', { className: 'min-h-screen flex items-center justify-center' },
+                h('div', { className: 'text-white text-center' },
+                    h('div', { className: 'text-6xl mb-4' }, '🍼'),
+                    h('div', { className: 'text-2xl font-bold' }, 'Loading Baby Videos...')
+                )
+            );
+        }
+
+        const allSelected = selectedIds.length === videos.length;
+
+        return h('div', { className: 'min-h-screen p-6' },
+            h('div', { className: 'max-w-7xl mx-auto' },
+                // Header
+                h('div', { className: 'text-center mb-8' },
+                    h('h1', { className: 'text-5xl font-bold text-white mb-4' }, '🍼 McLan Tax Baby Video Dashboard'),
+                    h('p', { className: 'text-xl text-white opacity-90' }, 'AI-Powered Viral Content Creation & Management')
+                ),
+
+                // Stats Cards
+                h('div', { className: 'grid grid-cols-1 md:grid-cols-4 gap-6 mb-8' },
+                    h(StatCard, { value: stats.pending, label: '⏳ Pending Review' }),
+                    h(StatCard, { value: stats.approved, label: '✅ Approved' }),
+                    h(StatCard, { value: stats.total_videos, label: '📊 Total Videos' }),
+                    h(StatCard, { value: stats.recent_videos, label: '📅 This Week' })
+                ),
+
+                // Generate Button
+                h('div', { className: 'text-center mb-8' },
+                    h('button', {
+                        onClick: handleGenerateVideo,
+                        disabled: generating,
+                        className: 'viral-button text-white px-8 py-4 rounded-full text-lg font-bold shadow-lg disabled:opacity-50'
+                    }, generating ? '🔄 Generating...' : '🚀 Generate New Baby Video')
+                ),
+
+                // Search
+                h('div', { className: 'max-w-2xl mx-auto mb-8' },
+                    h('input', {
+                        type: 'search',
+                        value: query,
+                        onChange: (event) => setQuery(event.target.value),
+                        placeholder: '🔎 Search trends, scripts and captions...',
+                        className: 'w-full rounded-full px-6 py-3 text-gray-800 shadow-lg'
+                    })
+                ),
+
+                // Videos Grid
+                results !== null
+                    ? (results.length === 0
+                        ? h('div', { className: 'text-center text-white text-2xl font-bold' }, `No videos match "${query.trim()}"`)
+                        : h('div', { className: 'grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6' },
+                            results.map(video => h(VideoCard, {
+                                key: video.id,
+                                video: video,
+                                onApprove: () => handleApprove(video.id),
+                                onReject: () => handleReject(video.id)
+                            }))
+                        ))
+                : videos.length === 0
+                    ? h('div', { className: 'text-center text-white' },
+                        h('div', { className: 'text-6xl mb-4' }, '👶'),
+                        h('div', { className: 'text-2xl font-bold mb-2' }, 'No videos pending review'),
+                        h('div', { className: 'text-lg opacity-80' }, 'Generate some baby content to get started!')
+                    )
+                    : h('div', null,
+                        // Bulk Actions
+                        h('div', { className: 'stat-card rounded-2xl p-4 mb-6 flex flex-wrap items-center gap-3 text-white' },
+                            h('button', {
+                                onClick: () => setSelected(new Set(allSelected ? [] : videos.map(v => v.id))),
+                                className: 'px-4 py-2 rounded-lg font-semibold text-sm bg-white/20'
+                            }, allSelected ? '☐ Clear selection' : '☑️ Select all'),
+                            h('span', { className: 'text-sm opacity-80' }, `${selectedIds.length} selected`),
+                            h('div', { className: 'flex-1' }),
+                            h('button', {
+                                onClick: () => handleBulk('approve'),
+                                disabled: selectedIds.length === 0,
+                                className: 'viral-button text-white py-2 px-4 rounded-lg font-semibold text-sm disabled:opacity-50'
+                            }, '✅ Approve selected'),
+                            h('button', {
+                                onClick: () => handleBulk('reject'),
+                                disabled: selectedIds.length === 0,
+                                className: 'reject-button text-white py-2 px-4 rounded-lg font-semibold text-sm disabled:opacity-50'
+                            }, '❌ Reject selected')
+                        ),
+
+                        h('div', { className: 'grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6' },
+                            videos.map(video => h(VideoCard, {
+                                key: video.id,
+                                video: video,
+                                checked: selected.has(video.id),
+                                onToggle: () => toggleSelected(video.id),
+                                onApprove: () => handleApprove(video.id),
+                                onReject: () => handleReject(video.id)
+                            }))
+                        )
+                    )
+            )
+        );
+    }
+
+    ReactDOM.createRoot(document.getElementById('dashboard-root')).render(h(Dashboard));
+})();
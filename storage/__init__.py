@@ -0,0 +1,69 @@
+"""
+McLan Tax Baby Video Creator - Video Storage
+Pluggable video stores (sqlite, jsonl, postgres, memory) shared by every dashboard
+"""
+
+import os
+import tempfile
+from typing import Optional
+from storage.base import VideoStore
+
+BACKENDS = ('sqlite', 'jsonl', 'postgres', 'memory')
+
+# Wiped when a serverless instance goes away (Vercel's only writable directory)
+EPHEMERAL_DIRS = ('/tmp', tempfile.gettempdir())
+
+def is_ephemeral(path: Optional[str]) -> bool:
+    """Whether a store file would be lost with a serverless instance: in a temporary directory, or unset."""
+    if not path:
+        return True
+    path = os.path.realpath(path)
+    roots = {os.path.realpath(root) for root in EPHEMERAL_DIRS}
+    return any(os.path.commonpath([path, root]) == root for root in roots)
+
+def get_store(backend: Optional[str] = None, path: Optional[str] = None,
+              allow_ephemeral: bool = True) -> VideoStore:
+    """
+    Create the configured video store.
+
+    Backends are imported on demand, so the serverless API never loads
+    the SQLite stack (or its config and .env handling) unless asked to.
+
+    Args:
+        backend (str): sqlite, jsonl, postgres or memory (default: STORAGE_BACKEND, else sqlite)
+        path (str): Database or log file, or the Postgres connection URL
+            (default: STORAGE_PATH, else the backend's default; for postgres
+            DATABASE_URL, else POSTGRES_URL)
+        allow_ephemeral (bool): False refuses sqlite and jsonl files in a
+            temporary directory; memory must then be chosen by name
+
+    Raises:
+        ValueError: If the backend is unknown, postgres has no URL, or a
+            file would be ephemeral when that isn't allowed
+    """
+    backend = (backend or os.getenv('STORAGE_BACKEND') or 'sqlite').lower()
+    path = path or os.getenv('STORAGE_PATH')
+
+    if not allow_ephemeral and backend in ('sqlite', 'jsonl') and is_ephemeral(path):
+        raise ValueError(
+            f"STORAGE_PATH {path!r} is not durable: it is lost with the instance. "
+            "Use STORAGE_BACKEND=postgres, or STORAGE_BACKEND=memory for a demo"
+        )
+
+    if backend == 'sqlite':
+        from storage.sqlite import SqliteVideoStore
+        return SqliteVideoStore(path)
+    if backend == 'jsonl':
+        from storage.jsonl import JsonlVideoStore
+        return JsonlVideoStore(path or 'videos.jsonl')
+    if backend == 'postgres':
+        from storage.postgres import PostgresVideoStore
+        url = path or os.getenv('DATABASE_URL') or os.getenv('POSTGRES_URL')
+        if not url:
+            raise ValueError("STORAGE_BACKEND=postgres needs DATABASE_URL (or POSTGRES_URL)")
+        return PostgresVideoStore(url)
+    if backend == 'memory':
+        from storage.memory import MemoryVideoStore
+        return MemoryVideoStore()
+
+    raise ValueError(f"Unknown storage backend {backend!r} (expected one of: {', '.join(BACKENDS)})")
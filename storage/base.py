@@ -0,0 +1,116 @@
+"""
+McLan Tax Baby Video Creator - Storage Interface
+The contract every video storage backend implements
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from queries import VIDEO_FIELDS
+
+ACTIONS = ('approve', 'reject')
+
+def now_iso() -> str:
+    """The current UTC time in SQLite's CURRENT_TIMESTAMP format, so stored times compare with created_at."""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def project(video: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """A copy of an API-shaped video limited to `fields` (every field if None)."""
+    return {name: video.get(name) for name in (fields or VIDEO_FIELDS)}
+
+def review_fields(action: str, approve_fields: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Field changes for an approve/reject action."""
+    if action == 'approve':
+        return {'status': 'approved', 'approved_at': now_iso(), **(approve_fields or {})}
+    return {'status': 'rejected', 'rejected_at': now_iso()}
+
+class VideoStore:
+    """
+    Storage for dashboard videos.
+
+    Videos go in and come out in API shape: videoUrl, captions as a
+    dict, posted_platforms as a list. version() is a change sequence
+    that increases with every write; it backs ETags and delta sync.
+    """
+
+    def add(self, video: Dict[str, Any]):
+        """Store a new video (status defaults to pending, created_at to now)."""
+        raise NotImplementedError
+
+    def get(self, video_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        """One video, or None if it doesn't exist."""
+        raise NotImplementedError
+
+    def list(self, status: str, limit: int = 20, cursor: Optional[str] = None,
+             fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of videos with a status, newest first.
+
+        Returns:
+            Tuple[List[Dict[str, Any]], Optional[str]]: The page and the
+            cursor for the next one (None on the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        raise NotImplementedError
+
+    def list_archived(self, status: str, limit: int = 20, cursor: Optional[str] = None,
+                      fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of archived videos with a status, newest first, paged
+        like list(). Backends without an archive have none.
+        """
+        return [], None
+
+    def review(self, items: Sequence[Tuple[str, str]],
+               approve_fields: Optional[Dict[str, Any]] = None) -> List[bool]:
+        """
+        Apply (video id, 'approve' | 'reject') actions together.
+
+        Args:
+            items: The actions, in order
+            approve_fields: Extra fields to set on approval (e.g. posted_platforms)
+
+        Returns:
+            List[bool]: Per item, whether the video existed
+        """
+        raise NotImplementedError
+
+    def search(self, query: str, status: Optional[str] = None, limit: int = 20,
+               fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Videos whose trend, script or captions match every word of a
+        search (the last as a word prefix), best first, each with an HTML
+        `snippet` that marks the matches with <mark>.
+
+        Raises:
+            ValueError: If the query has no words
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, int]:
+        """pending, approved, rejected, recent_videos (7 days) and total_videos."""
+        raise NotImplementedError
+
+    def timeseries(self, bucket: str = 'hour', days: int = 7) -> Dict[str, Any]:
+        """
+        Videos created, approved and rejected, and posts per platform,
+        per hour or day (see queries.video_timeseries for the shape).
+        Only stores that keep rollups implement this.
+
+        Raises:
+            ValueError: If the bucket or days is invalid
+        """
+        raise NotImplementedError
+
+    def version(self) -> int:
+        """The latest change sequence number (0 when nothing was ever written)."""
+        raise NotImplementedError
+
+    def changes_since(self, since: int, limit: int = 100,
+                      fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Videos changed and ids deleted after a change sequence: changes, deleted, cursor, has_more."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release files or connections held by the store."""
@@ -0,0 +1,305 @@
+"""
+McLan Tax Baby Video Creator - JSONL Storage
+Append-only JSON Lines video log with compaction and a lazy-loading index
+"""
+
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from storage.memory import MemoryVideoStore, VideoIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
+
+FORMAT_VERSION = 1
+
+def _encode(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+
+class JsonlVideoStore(MemoryVideoStore):
+    """
+    Video store persisted as an append-only JSON Lines log.
+
+    Every write appends put/patch/delete records, so a write is one
+    small append no matter how many videos exist. Once COMPACT_RECORDS
+    records have been appended since the last compaction, the log is
+    rewritten as one put per video (plus delete tombstones) and replaced
+    atomically, together with a sidecar index of each video's status,
+    created_at, change sequence and byte offset.
+
+    Cold start reads only that index and the (bounded) records appended
+    since; video bodies are read with a seek the first time a page
+    needs them.
+    Other processes' appends are picked up from the end of the file
+    before every operation, and a compaction elsewhere (a new inode)
+    triggers a reload. Appends and compactions hold an exclusive lock on
+    a sidecar lock file where fcntl exists.
+    """
+
+    COMPACT_RECORDS = 1000
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.index_path = path + '.idx'
+        self._lock_path = path + '.lock'
+        self._lock_file = None
+        self._lock_depth = 0
+        self._loaded = False
+        self._reset()
+
+    def _reset(self):
+        self._index = VideoIndex()
+        self._videos = {}
+        self._locations: Dict[str, Tuple[int, int]] = {}
+        self._patches: Dict[str, Dict[str, Any]] = {}
+        self._tail = 0
+        self._offset = 0
+        self._inode = None
+        if getattr(self, '_file', None):
+            self._file.close()
+        self._file = None
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive lock across processes (re-entrant within this store)."""
+        if fcntl is None:
+            yield
+            return
+
+        if self._lock_file is None:
+            self._lock_file = open(self._lock_path, 'a')
+        if self._lock_depth == 0:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        self._lock_depth += 1
+        try:
+            yield
+        finally:
+            self._lock_depth -= 1
+            if self._lock_depth == 0:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    # Loading
+
+    def _load(self):
+        """Open the log, from the sidecar index if it matches, replaying the tail."""
+        with self._file_lock():
+            self._reset()
+
+            if not os.path.exists(self.path):
+                self._write_snapshot()
+
+            self._file = open(self.path, 'rb')
+            self._inode = os.fstat(self._file.fileno()).st_ino
+            header = json.loads(self._file.readline() or b'{}')
+            self._offset = self._file.tell()
+
+            index = self._read_index()
+            fast = bool(index) and header.get('generation') == index.get('generation')
+            if fast:
+                self._index.load(
+                    index['ids'], index['statuses'], index['created_at'], index['seqs'], index['deleted']
+                )
+                self._locations = dict(zip(index['ids'], zip(index['offsets'], index['lengths'])))
+                self._offset = index['size']
+
+            self._replay()
+            self._loaded = True
+
+            # No usable index: write one so the next cold start is fast
+            if not fast and self._tail:
+                self._compact()
+
+    def _read_index(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.index_path, 'rb') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return index if index.get('format') == FORMAT_VERSION else None
+
+    def _replay(self):
+        """Apply complete records appended after the current offset."""
+        self._file.seek(self._offset)
+        data = self._file.read()
+        end = data.rfind(b'\n') + 1
+
+        position = 0
+        while position < end:
+            newline = data.index(b'\n', position)
+            line = data[position:newline + 1]
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None  # A torn write from a crashed writer
+
+            if record and record.get('op') in ('put', 'patch', 'delete'):
+                self._apply(record, self._offset + position, len(line))
+                self._tail += 1
+            position = newline + 1
+
+        self._offset += end
+
+    def _sync(self):
+        if not self._loaded:
+            self._load()
+            return
+
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        if stat is None or stat.st_ino != self._inode:
+            self._load()
+        elif stat.st_size > self._offset:
+            self._replay()
+
+    # Records
+
+    def _apply(self, record: Dict[str, Any], offset: int = -1, length: int = 0):
+        op, seq = record['op'], record['seq']
+        if op == 'put':
+            video = record['video']
+            self._videos[video['id']] = video
+            self._locations[video['id']] = (offset, length)
+            self._patches.pop(video['id'], None)
+            self._index.put(video['id'], video.get('status'), video.get('created_at'), seq)
+        elif op == 'patch':
+            video_id, fields = record['id'], record['fields']
+            if video_id not in self._index:
+                return
+            self._patches.setdefault(video_id, {}).update(fields)
+            if video_id in self._videos:
+                self._videos[video_id].update(fields)
+            status = fields.get('status', self._index.status(video_id))
+            self._index.put(video_id, status, self._index.created_at(video_id), seq)
+        elif op == 'delete':
+            self._videos.pop(record['id'], None)
+            self._locations.pop(record['id'], None)
+            self._patches.pop(record['id'], None)
+            self._index.remove(record['id'], seq)
+
+    def _body(self, video_id: str) -> Dict[str, Any]:
+        video = self._videos.get(video_id)
+        if video is None:
+            offset, length = self._locations[video_id]
+            self._file.seek(offset)
+            video = json.loads(self._file.read(length))['video']
+            video.update(self._patches.get(video_id, {}))
+            self._videos[video_id] = video
+        return video
+
+    def _commit(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+
+        with self._file_lock():
+            # Catch up first so sequence numbers continue from other writers'
+            self._sync()
+            for number, record in enumerate(records, 1):
+                record['seq'] = self._index.version + number
+            lines = [_encode(record) for record in records]
+
+            with open(self.path, 'ab') as f:
+                start = f.tell()
+                if start > self._offset:
+                    # Fence off a torn line left by a crashed writer
+                    f.write(b'\n')
+                    start += 1
+                f.write(b''.join(lines))
+
+            # Reading our own append back keeps offsets and caches in one code path
+            self._offset = start
+            self._replay()
+
+            if self._tail >= self.COMPACT_RECORDS:
+                self._compact()
+
+    # Compaction
+
+    def _write_snapshot(self) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+        """Rewrite the log as one record per video (and tombstone), with a fresh sidecar index."""
+        generation = uuid.uuid4().hex
+        columns: Dict[str, list] = {name: [] for name in ('ids', 'statuses', 'created_at', 'seqs', 'offsets', 'lengths')}
+        tombstones: List[list] = []
+        locations: Dict[str, Tuple[int, int]] = {}
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as out:
+            out.write(_encode({'op': 'header', 'format': FORMAT_VERSION, 'generation': generation}))
+
+            # Sequence order keeps a replay of this file identical to the index
+            entries = []
+            for seq, video_id, deleted in self._index.history():
+                offset = out.tell()
+                if deleted:
+                    out.write(_encode({'seq': seq, 'op': 'delete', 'id': video_id}))
+                    tombstones.append([video_id, seq])
+                    continue
+
+                if video_id in self._patches or video_id not in self._locations:
+                    line = _encode({'seq': seq, 'op': 'put', 'video': self._body(video_id)})
+                else:
+                    # Unpatched: the original put line is still exact
+                    start, length = self._locations[video_id]
+                    self._file.seek(start)
+                    line = self._file.read(length)
+                out.write(line)
+                locations[video_id] = (offset, len(line))
+                entries.append((self._index.created_at(video_id), video_id, seq, offset, len(line)))
+
+            size = out.tell()
+            out.flush()
+            os.fsync(out.fileno())
+
+        # Index columns in created_at order, so loading them needs no real sort
+        for created_at, video_id, seq, offset, length in sorted(entries):
+            columns['ids'].append(video_id)
+            columns['statuses'].append(self._index.status(video_id))
+            columns['created_at'].append(created_at)
+            columns['seqs'].append(seq)
+            columns['offsets'].append(offset)
+            columns['lengths'].append(length)
+
+        index_tmp = self.index_path + '.tmp'
+        with open(index_tmp, 'w', encoding='utf-8') as f:
+            json.dump({
+                'format': FORMAT_VERSION,
+                'generation': generation,
+                'size': size,
+                **columns,
+                'deleted': tombstones
+            }, f, ensure_ascii=False, separators=(',', ':'))
+
+        # Log first: a reader that sees the old index with the new log
+        # notices the generation mismatch and replays the log instead
+        os.replace(tmp_path, self.path)
+        os.replace(index_tmp, self.index_path)
+        return size, locations
+
+    def _compact(self):
+        with self._file_lock():
+            size, locations = self._write_snapshot()
+
+            self._file.close()
+            self._file = open(self.path, 'rb')
+            self._inode = os.fstat(self._file.fileno()).st_ino
+            self._locations = locations
+            self._patches = {}
+            self._tail = 0
+            self._offset = size
+            print(f"🗜️ Compacted {self.path} to {len(locations)} videos")
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            if self._lock_file:
+                self._lock_file.close()
+                self._lock_file = None
+            self._loaded = False
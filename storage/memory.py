@@ -0,0 +1,331 @@
+"""
+McLan Tax Baby Video Creator - In-Memory Storage
+Indexed video store kept entirely in process memory
+"""
+
+import bisect
+import copy
+import html
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from queries import MAX_PAGE_SIZE, decode_cursor, encode_cursor, search_terms
+from storage.base import VideoStore, now_iso, project, review_fields
+
+# Search weights per field, as in the SQLite index's bm25 ranking
+SEARCH_WEIGHTS = (('trend', 10.0), ('captions', 2.0), ('script', 1.0))
+SNIPPET_WORDS = 16
+
+def _search_text(video: Dict[str, Any], field: str) -> str:
+    if field == 'captions':
+        return ' '.join(caption for caption in (video.get('captions') or {}).values() if caption)
+    return video.get(field) or ''
+
+def _term_matches(word: str, terms: Sequence[str]) -> bool:
+    word = word.lower()
+    return any(word.startswith(term) if len(term) > 1 else word == term for term in terms)
+
+def _snippet(text: str, terms: Sequence[str]) -> str:
+    """About SNIPPET_WORDS words of text from just before the first match, HTML-escaped, matches in <mark>."""
+    words = list(re.finditer(r'\w+', text))
+    hits = [number for number, word in enumerate(words) if _term_matches(word.group(), terms)]
+    start = max(0, (hits[0] if hits else 0) - SNIPPET_WORDS // 4)
+    end = min(len(words), start + SNIPPET_WORDS)
+    if not words:
+        return html.escape(text)
+
+    parts = ['…' if start else '']
+    position = words[start].start()
+    for word in words[start:end]:
+        parts.append(html.escape(text[position:word.start()]))
+        escaped = html.escape(word.group())
+        parts.append(f'<mark>{escaped}</mark>' if _term_matches(word.group(), terms) else escaped)
+        position = word.end()
+    parts.append('…' if end < len(words) else html.escape(text[position:]))
+    return ''.join(parts)
+
+class VideoIndex:
+    """
+    Sorted indexes over video metadata, without the videos themselves.
+
+    Keeps per-status buckets of (created_at, id) keys sorted with bisect,
+    one sorted index over every video, status counters, and the ids in
+    change-sequence order (deletes included, as tombstones). Counts are
+    O(1), a status change is a sorted-list remove/insert, a page is
+    O(page), the 7-day count is a binary search, and delta sync walks
+    back from the newest change.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, str]] = {}
+        self._counts: Counter = Counter()
+        self._created: List[Tuple[str, str]] = []
+        self._created_by_status: Dict[str, List[Tuple[str, str]]] = {}
+        # Insertion-ordered: each id is re-inserted at the end when it changes
+        self._changes: Dict[str, Tuple[int, bool]] = {}
+        self.version = 0
+
+    def load(self, ids: List[str], statuses: List[str], created_ats: List[str], seqs: List[int],
+             tombstones: Iterable[Tuple[str, int]] = ()):
+        """
+        Bulk-load parallel columns of video metadata plus (id, seq) tombstones.
+
+        Builds every index with one sort each instead of an insort per
+        video; columns already in created_at order sort in linear time.
+        """
+        created_ats = [created_at or '' for created_at in created_ats]
+        self._entries = dict(zip(ids, zip(statuses, created_ats)))
+
+        changes = sorted([*zip(seqs, ids, [False] * len(ids)), *((seq, video_id, True) for video_id, seq in tombstones)])
+        self._changes = {video_id: (seq, deleted) for seq, video_id, deleted in changes}
+        self.version = changes[-1][0] if changes else 0
+
+        self._counts = Counter(statuses)
+        self._created = sorted(zip(created_ats, ids))
+        self._created_by_status = {}
+        for key in self._created:
+            self._created_by_status.setdefault(self._entries[key[1]][0], []).append(key)
+
+    def _link(self, video_id: str, status: str, created_at: str):
+        key = (created_at, video_id)
+        self._counts[status] += 1
+        bisect.insort(self._created, key)
+        bisect.insort(self._created_by_status.setdefault(status, []), key)
+
+    def _unlink(self, video_id: str, status: str, created_at: str):
+        key = (created_at, video_id)
+        self._counts[status] -= 1
+        del self._created[bisect.bisect_left(self._created, key)]
+        keys = self._created_by_status[status]
+        del keys[bisect.bisect_left(keys, key)]
+
+    def _touch(self, video_id: str, seq: int, deleted: bool):
+        self._changes.pop(video_id, None)
+        self._changes[video_id] = (seq, deleted)
+        self.version = max(self.version, seq)
+
+    def put(self, video_id: str, status: str, created_at: Optional[str], seq: int):
+        """Insert or update a video's metadata at a change sequence."""
+        entry = (status, created_at or '')
+        old = self._entries.get(video_id)
+        if old != entry:
+            if old is not None:
+                self._unlink(video_id, *old)
+            self._link(video_id, *entry)
+            self._entries[video_id] = entry
+        self._touch(video_id, seq, False)
+
+    def remove(self, video_id: str, seq: int):
+        """Drop a video, leaving a tombstone at a change sequence."""
+        old = self._entries.pop(video_id, None)
+        if old is not None:
+            self._unlink(video_id, *old)
+            self._touch(video_id, seq, True)
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def status(self, video_id: str) -> str:
+        return self._entries[video_id][0]
+
+    def created_at(self, video_id: str) -> str:
+        return self._entries[video_id][1]
+
+    def page(self, status: str, limit: int, before: Optional[Tuple[str, str]] = None) -> Tuple[List[str], bool]:
+        """Ids of the newest `limit` videos with a status, older than `before`; and whether more follow."""
+        keys = self._created_by_status.get(status, [])
+        end = bisect.bisect_left(keys, before) if before else len(keys)
+        start = max(0, end - limit)
+        return [video_id for _, video_id in reversed(keys[start:end])], start > 0
+
+    def newest(self, status: Optional[str] = None) -> Iterator[str]:
+        """Ids newest first, of one status or of every video."""
+        keys = self._created_by_status.get(status, []) if status else self._created
+        return (video_id for _, video_id in reversed(keys))
+
+    def count(self, status: str) -> int:
+        return self._counts[status]
+
+    def count_created_after(self, timestamp: str) -> int:
+        return len(self._created) - bisect.bisect_right(self._created, (timestamp, '\uffff'))
+
+    def changes_since(self, since: int, limit: int) -> Tuple[List[Tuple[int, str, bool]], bool]:
+        """The first `limit` (seq, id, deleted) changes after `since`, and whether more follow."""
+        newer = []
+        for video_id in reversed(self._changes):
+            seq, deleted = self._changes[video_id]
+            if seq <= since:
+                break
+            newer.append((seq, video_id, deleted))
+        newer.reverse()
+        return newer[:limit], len(newer) > limit
+
+    def history(self) -> List[Tuple[int, str, bool]]:
+        """Every video's latest (seq, id, deleted) change, oldest first."""
+        return [(seq, video_id, deleted) for video_id, (seq, deleted) in self._changes.items()]
+
+class MemoryVideoStore(VideoStore):
+    """
+    Video store held in process memory, lost when the process exits.
+
+    Every write is a record - put (a whole video), patch (some fields)
+    or delete - applied under one lock, which is also the seam the JSONL
+    store uses to persist the same records.
+    """
+
+    def __init__(self, videos: Optional[Iterable[Dict[str, Any]]] = None):
+        self._index = VideoIndex()
+        self._videos: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+        # Records are copied in so callers (and sample data) never share them
+        if videos:
+            self._commit([{'op': 'put', 'video': video} for video in copy.deepcopy(list(videos))])
+
+    # Hooks for persistent subclasses
+
+    def _sync(self):
+        """Catch up with writes made elsewhere (nothing to do in memory)."""
+
+    def _commit(self, records: List[Dict[str, Any]]):
+        """Number records with the next change sequences and apply them."""
+        for record in records:
+            record['seq'] = self._index.version + 1
+            self._apply(record)
+
+    def _apply(self, record: Dict[str, Any]):
+        op = record['op']
+        if op == 'put':
+            video = record['video']
+            self._videos[video['id']] = video
+            self._index.put(video['id'], video.get('status'), video.get('created_at'), record['seq'])
+        elif op == 'patch':
+            video = self._videos[record['id']]
+            video.update(record['fields'])
+            self._index.put(video['id'], video.get('status'), video.get('created_at'), record['seq'])
+        elif op == 'delete':
+            self._videos.pop(record['id'], None)
+            self._index.remove(record['id'], record['seq'])
+
+    def _body(self, video_id: str) -> Dict[str, Any]:
+        return self._videos[video_id]
+
+    # VideoStore
+
+    def add(self, video: Dict[str, Any]):
+        video = dict(video)
+        video.setdefault('status', 'pending')
+        video.setdefault('created_at', now_iso())
+        with self._lock:
+            self._sync()
+            self._commit([{'op': 'put', 'video': video}])
+
+    def delete(self, video_id: str) -> bool:
+        with self._lock:
+            self._sync()
+            if video_id not in self._index:
+                return False
+            self._commit([{'op': 'delete', 'id': video_id}])
+            return True
+
+    def get(self, video_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._sync()
+            if video_id not in self._index:
+                return None
+            return project(self._body(video_id), fields)
+
+    def list(self, status: str, limit: int = 20, cursor: Optional[str] = None,
+             fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        before = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            self._sync()
+            ids, has_more = self._index.page(status, limit, before)
+            page = [project(self._body(video_id), fields) for video_id in ids]
+            next_cursor = encode_cursor(self._index.created_at(ids[-1]), ids[-1]) if has_more else None
+        return page, next_cursor
+
+    def review(self, items: Sequence[Tuple[str, str]],
+               approve_fields: Optional[Dict[str, Any]] = None) -> List[bool]:
+        with self._lock:
+            self._sync()
+            results = [video_id in self._index for video_id, _ in items]
+            self._commit([
+                {'op': 'patch', 'id': video_id, 'fields': review_fields(action, approve_fields)}
+                for (video_id, action), found in zip(items, results) if found
+            ])
+        return results
+
+    def search(self, query: str, status: Optional[str] = None, limit: int = 20,
+               fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Scan videos newest first for ones matching every search word.
+
+        Like the SQLite index, every match is ranked, here by
+        field-weighted counts of matching words. With no stemming, every
+        word matches as a prefix. Bodies a JSONL log hasn't loaded yet are
+        read as the scan reaches them.
+        """
+        terms = search_terms(query)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        with self._lock:
+            self._sync()
+            matches = []
+            for video_id in self._index.newest(status):
+                video = self._body(video_id)
+                found, score, best = set(), 0.0, (0.0, '')
+                for field, weight in SEARCH_WEIGHTS:
+                    text = _search_text(video, field)
+                    words = [word for word in re.findall(r'\w+', text) if _term_matches(word, terms)]
+                    found.update(term for term in terms for word in words if _term_matches(word, [term]))
+                    score += weight * len(words)
+                    best = max(best, (weight * len(words), text))
+                if len(found) == len(terms):
+                    matches.append((score, video_id, best[1]))
+
+            # sorted() is stable, so equal scores stay newest first
+            results = []
+            for score, video_id, text in sorted(matches, key=lambda match: -match[0])[:limit]:
+                video = project(self._body(video_id), fields)
+                video['snippet'] = _snippet(text, terms)
+                results.append(video)
+        return results
+
+    def stats(self) -> Dict[str, int]:
+        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
+        with self._lock:
+            self._sync()
+            stats = {status: self._index.count(status) for status in ('pending', 'approved', 'rejected')}
+            stats['recent_videos'] = self._index.count_created_after(week_ago)
+        stats['total_videos'] = stats['pending'] + stats['approved'] + stats['rejected']
+        return stats
+
+    def version(self) -> int:
+        with self._lock:
+            self._sync()
+            return self._index.version
+
+    def changes_since(self, since: int, limit: int = MAX_PAGE_SIZE,
+                      fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        names = list(dict.fromkeys(['id', 'status', *(fields or [])])) if fields else None
+        with self._lock:
+            self._sync()
+            changed, has_more = self._index.changes_since(since, limit)
+            return {
+                'changes': [project(self._body(video_id), names) for _, video_id, deleted in changed if not deleted],
+                'deleted': [video_id for _, video_id, deleted in changed if deleted],
+                'cursor': str(changed[-1][0] if changed else since),
+                'has_more': has_more
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._index)
@@ -0,0 +1,141 @@
+"""
+McLan Tax Baby Video Creator - Postgres Storage
+Video store kept in a hosted Postgres database, for serverless deployments
+"""
+
+from typing import Any, Dict, List
+from storage.memory import MemoryVideoStore, VideoIndex
+
+try:
+    import psycopg
+    from psycopg.types.json import Jsonb
+except ImportError:  # Only needed with STORAGE_BACKEND=postgres
+    psycopg = None
+
+# Serializes writers across instances (pg_advisory_xact_lock key)
+WRITE_LOCK = 0x6d636c616e
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS videos (
+        id TEXT PRIMARY KEY,
+        seq BIGINT NOT NULL UNIQUE,
+        status TEXT,
+        created_at TEXT,
+        deleted BOOLEAN NOT NULL DEFAULT FALSE,
+        video JSONB
+    )
+'''
+
+class PostgresVideoStore(MemoryVideoStore):
+    """
+    Video store persisted in Postgres, one row per video.
+
+    Each row holds a video's latest state and the change sequence that
+    produced it; a delete keeps the row as a tombstone (deleted, no
+    body) so delta sync still reports it. The in-memory index is loaded
+    from the metadata columns on cold start, and bodies are fetched the
+    first time a page needs them, as the JSONL store does.
+
+    Writes run in one transaction under an advisory lock, so sequence
+    numbers stay gapless across instances; every operation first picks
+    up rows with a sequence past the one this instance has seen.
+    """
+
+    def __init__(self, url: str):
+        if psycopg is None:
+            raise RuntimeError("psycopg is required for STORAGE_BACKEND=postgres: pip install 'psycopg[binary]'")
+        super().__init__()
+        self.url = url
+        self._conn = None
+        self._loaded = False
+
+    def connect(self):
+        """The store's connection, reopened if the server dropped it."""
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg.connect(self.url, autocommit=True)
+            self._conn.execute(SCHEMA)
+            self._loaded = False
+        return self._conn
+
+    # Loading
+
+    def _load(self):
+        rows = self.connect().execute('SELECT id, status, created_at, seq, deleted FROM videos').fetchall()
+        live = [row for row in rows if not row[4]]
+        self._videos = {}
+        self._index = VideoIndex()
+        self._index.load(
+            [row[0] for row in live], [row[1] for row in live], [row[2] for row in live],
+            [row[3] for row in live], [(row[0], row[3]) for row in rows if row[4]]
+        )
+        self._loaded = True
+
+    def _sync(self):
+        conn = self.connect()
+        if not self._loaded:
+            self._load()
+            return
+
+        rows = conn.execute('''
+            SELECT id, status, created_at, seq, deleted, video FROM videos WHERE seq > %s ORDER BY seq
+        ''', (self._index.version,)).fetchall()
+        for video_id, status, created_at, seq, deleted, video in rows:
+            if deleted:
+                self._videos.pop(video_id, None)
+                self._index.remove(video_id, seq)
+            else:
+                self._videos[video_id] = video
+                self._index.put(video_id, status, created_at, seq)
+
+    # Records
+
+    def _body(self, video_id: str) -> Dict[str, Any]:
+        video = self._videos.get(video_id)
+        if video is None:
+            video = self.connect().execute('SELECT video FROM videos WHERE id = %s', (video_id,)).fetchone()[0]
+            self._videos[video_id] = video
+        return video
+
+    def _commit(self, records: List[Dict[str, Any]]):
+        if not records:
+            return
+
+        conn = self.connect()
+        with conn.transaction():
+            conn.execute('SELECT pg_advisory_xact_lock(%s)', (WRITE_LOCK,))
+            # Catch up first so sequence numbers continue from other writers'
+            self._sync()
+
+            rows, bodies = [], {}
+            for record in records:
+                seq = self._index.version + len(rows) + 1
+                if record['op'] == 'delete':
+                    rows.append((record['id'], seq, None, None, True, None))
+                    continue
+                if record['op'] == 'put':
+                    video = dict(record['video'])
+                elif record['id'] in bodies or record['id'] in self._index:
+                    video = {**(bodies.get(record['id']) or self._body(record['id'])), **record['fields']}
+                else:
+                    continue  # Deleted by another instance since the caller checked
+                bodies[video['id']] = video
+                rows.append((video['id'], seq, video.get('status'), video.get('created_at'), False, Jsonb(video)))
+
+            with conn.cursor() as cursor:
+                cursor.executemany('''
+                    INSERT INTO videos (id, seq, status, created_at, deleted, video)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (id) DO UPDATE SET
+                        seq = EXCLUDED.seq, status = EXCLUDED.status, created_at = EXCLUDED.created_at,
+                        deleted = EXCLUDED.deleted, video = EXCLUDED.video
+                ''', rows)
+
+        # Reading our own rows back keeps caches and the index in one code path
+        self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._loaded = False
@@ -0,0 +1,141 @@
+"""
+McLan Tax Baby Video Creator - SQLite Storage
+Video store on the pooled, migrated SQLite database
+"""
+
+import json
+import os
+import sqlite3
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from config import Config
+import db
+from archive import archive_path, init_archive
+from content_index import init_content_index
+from migrations import migrate
+from queries import (
+    JSON_FIELDS, MAX_PAGE_SIZE, VIDEO_COLUMNS, StatsCache, current_change_seq, get_video, list_videos,
+    search_videos, video_changes, video_timeseries
+)
+from storage.base import VideoStore, review_fields
+
+def _columns(fields: Dict[str, Any]) -> Tuple[List[str], List[Any]]:
+    """videos columns and values for API-named fields (captions and posted_platforms as JSON)."""
+    columns, values = [], []
+    for name, value in fields.items():
+        if name in VIDEO_COLUMNS:
+            if name in JSON_FIELDS and value is not None:
+                value = json.dumps(value)
+            columns.append(VIDEO_COLUMNS[name])
+            values.append(value)
+    return columns, values
+
+class SqliteVideoStore(VideoStore):
+    """
+    Video store backed by the videos table.
+
+    Reads and writes go through the shared connection pool; the change
+    sequence, status counters and search index are kept by triggers,
+    so this store and direct SQL writers (workers, scripts) agree.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, stats_ttl: Optional[float] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.archive_path = archive_path(self.db_path)
+        self.stats_cache = StatsCache(Config.STATS_CACHE_TTL if stats_ttl is None else stats_ttl)
+
+        conn = db.connect(self.db_path)
+        try:
+            migrate(conn)
+            init_content_index(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        # Brings an existing archive's columns up to date with the live table
+        if os.path.exists(self.archive_path):
+            init_archive(self.archive_path)
+
+    def _connection(self):
+        return db.pooled_connection(self.db_path)
+
+    def add(self, video: Dict[str, Any]):
+        # created_at is left to CURRENT_TIMESTAMP so every row sorts alike
+        columns, values = _columns({k: v for k, v in video.items() if k != 'created_at'})
+        with self._connection() as conn:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO videos ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                    values
+                )
+
+    def get(self, video_id: str, fields: Optional[Sequence[str]] = None) -> Optional[Dict[str, Any]]:
+        with self._connection() as conn:
+            return get_video(conn, video_id, fields)
+
+    def list(self, status: str, limit: int = 20, cursor: Optional[str] = None,
+             fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        with self._connection() as conn:
+            return list_videos(conn, status, limit, cursor, fields)
+
+    def list_archived(self, status: str, limit: int = 20, cursor: Optional[str] = None,
+                      fields: Optional[Sequence[str]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Read from the database archive.py moves old videos into (nothing until it has run)."""
+        if not os.path.exists(self.archive_path):
+            return [], None
+        with db.pooled_connection(self.archive_path) as conn:
+            return list_videos(conn, status, limit, cursor, fields)
+
+    def review(self, items: Sequence[Tuple[str, str]], approve_fields: Optional[Dict[str, Any]] = None,
+               on_approve: Optional[Callable[[sqlite3.Connection, str], None]] = None,
+               on_reject: Optional[Callable[[sqlite3.Connection, str], None]] = None) -> List[bool]:
+        """
+        Apply review actions in one transaction (one commit).
+
+        Args:
+            on_approve: Called with (conn, video_id) inside the transaction
+                for each approved video, e.g. to queue its posts
+            on_reject: Called the same way for each rejected video, e.g.
+                to cancel posts queued by an earlier approval
+        """
+        results = []
+        with self._connection() as conn:
+            with conn:
+                for video_id, action in items:
+                    fields = review_fields(action, approve_fields)
+                    columns, values = _columns(fields)
+                    assignments = ', '.join(f'{column} = ?' for column in columns)
+                    found = conn.execute(
+                        f'UPDATE videos SET {assignments} WHERE id = ?', (*values, video_id)
+                    ).rowcount > 0
+
+                    if found and action == 'approve' and on_approve:
+                        on_approve(conn, video_id)
+                    elif found and action == 'reject' and on_reject:
+                        on_reject(conn, video_id)
+                    results.append(found)
+        return results
+
+    def search(self, query: str, status: Optional[str] = None, limit: int = 20,
+               fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        with self._connection() as conn:
+            return search_videos(conn, query, status, limit, fields)
+
+    def stats(self) -> Dict[str, int]:
+        with self._connection() as conn:
+            return self.stats_cache.get(conn, current_change_seq(conn))
+
+    def timeseries(self, bucket: str = 'hour', days: int = 7) -> Dict[str, Any]:
+        with self._connection() as conn:
+            return video_timeseries(conn, bucket, days)
+
+    def version(self) -> int:
+        with self._connection() as conn:
+            return current_change_seq(conn)
+
+    def changes_since(self, since: int, limit: int = MAX_PAGE_SIZE,
+                      fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        with self._connection() as conn:
+            return video_changes(conn, since, limit, fields)
+
+    def close(self):
+        db.get_pool(self.db_path).close_all()
+        db.get_pool(self.archive_path).close_all()
@@ -4,10 +4,12 @@ from config import Config
 class BabyTaxVideoTasks:
     """Task definitions for viral baby tax video creation workflow."""
     
-    def research_trending_topic(self, agent):
+    def research_trending_topic(self, agent, covered_topics=None):
         """Task for researching trending topics."""
+        covered = "\n".join(f"            - {topic}" for topic in (covered_topics or [])) or "            - (none yet)"
+        
         return Task(
-            description="""Research and identify current trending topics related to finance, lifestyle, 
+            description=f"""Research and identify current trending topics related to finance, lifestyle, 
             or controversy that can be creatively adapted into baby tax content. Focus on:
             
             1. Search for viral trends on social media platforms
@@ -16,6 +18,13 @@ class BabyTaxVideoTasks:
             4. Look for topics that can be tied to tax season or financial planning
             5. Evaluate potential for viral baby content adaptation
             
+            Run your searches in ONE Web Search Tool call by passing them all in
+            `queries` (e.g. one per topic: {', '.join(Config.CONTENT_TOPICS)}).
+            
+            Topics we already made videos about (skip these unless you have a clearly new angle;
+            use the Coverage Check Tool before researching a candidate further):
+{covered}
+            
             Provide 3-5 trending topic options with:
             - Brief description of the trend
             - Why it's trending/viral potential
@@ -158,6 +167,7 @@ class BabyTaxVideoTasks:
             2. Scheduling strategy:
                - Post at optimal times for each platform
                - Schedule {Config.POSTS_PER_DAY} posts per day
+               - Use schedule_time="auto" to take the next free daily slot per platform
                - Stagger posting times for maximum reach
                - Consider audience timezone preferences
             
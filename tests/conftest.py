@@ -0,0 +1,28 @@
+"""
+McLan Tax Baby Video Creator - Test Fixtures
+Shared pytest setup: the flat top-level modules on sys.path, temp databases
+"""
+
+import os
+import sqlite3
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A fresh database file path (nothing touches baby_videos.db)."""
+    return str(tmp_path / 'videos.db')
+
+@pytest.fixture
+def conn(db_path):
+    """A connection to a fresh, fully migrated database."""
+    from migrations import migrate
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    migrate(connection)
+    yield connection
+    connection.close()
@@ -0,0 +1,121 @@
+"""
+McLan Tax Baby Video Creator - Archival Tests
+Retention windows per review timestamp, batch moves, archived reads and vacuum
+"""
+
+import sqlite3
+import pytest
+from archive import _move_batch, archivable_ids, archive_path, archive_videos, incremental_vacuum, init_archive
+from outbox import enqueue_post, init_outbox
+from storage.sqlite import SqliteVideoStore
+
+def add_video(conn, video_id, status, created_days, approved_days=None, rejected_days=None):
+    """A video with timestamps that many days ago (UTC, as SQLite keeps them)."""
+    def ago(days):
+        return None if days is None else conn.execute("SELECT datetime('now', ?)", (f'-{days} days',)).fetchone()[0]
+
+    conn.execute('''
+        INSERT INTO videos (id, trend, script, status, created_at, approved_at, rejected_at)
+        VALUES (?, ?, 'Goo goo', ?, ?, ?, ?)
+    ''', (video_id, f'Trend {video_id}', status, ago(created_days), ago(approved_days), ago(rejected_days)))
+
+@pytest.fixture
+def aged(conn):
+    add_video(conn, 'rejected-old', 'rejected', 100, rejected_days=40)
+    add_video(conn, 'rejected-lately', 'rejected', 100, rejected_days=5)
+    add_video(conn, 'rejected-legacy', 'rejected', 35)
+    add_video(conn, 'approved-old', 'approved', 120, approved_days=95)
+    add_video(conn, 'approved-lately', 'approved', 200, approved_days=10)
+    add_video(conn, 'approved-posting', 'approved', 120, approved_days=100)
+    add_video(conn, 'pending-ancient', 'pending', 400)
+    init_outbox(conn)
+    enqueue_post(conn, 'approved-posting', 'tiktok', '/videos/a.mp4', 'caption')
+    return conn
+
+def test_each_status_ages_from_its_own_review(aged):
+    assert archivable_ids(aged, 30, 90, -1) == ['approved-old', 'rejected-old', 'rejected-legacy']
+    assert archivable_ids(aged, 30, 90, 1) == ['approved-old']
+
+def test_rejection_is_stamped_in_utc(db_path):
+    store = SqliteVideoStore(db_path)
+    try:
+        store.add({'id': 'v1', 'trend': 'Crypto gains', 'script': 'Goo goo'})
+        store.review([('v1', 'reject')])
+
+        conn = sqlite3.connect(db_path)
+        seconds = conn.execute(
+            "SELECT (julianday('now') - julianday(rejected_at)) * 86400 FROM videos WHERE id = 'v1'"
+        ).fetchone()[0]
+        conn.close()
+        assert abs(seconds) < 60
+    finally:
+        store.close()
+
+def test_move_batch_copies_then_deletes(aged, db_path, tmp_path):
+    archive = str(tmp_path / 'archive.db')
+    init_archive(archive)
+    aged.execute('ATTACH DATABASE ? AS archive', (archive,))
+
+    assert _move_batch(aged, ['rejected-old', 'approved-old']) == 2
+
+    archived = aged.execute('SELECT id, status, rejected_at IS NOT NULL FROM archive.videos ORDER BY id').fetchall()
+    assert [tuple(row) for row in archived] == [('approved-old', 'approved', 0), ('rejected-old', 'rejected', 1)]
+    assert aged.execute("SELECT COUNT(*) FROM main.videos WHERE id IN ('rejected-old', 'approved-old')").fetchone()[0] == 0
+    # Triggers saw the deletes
+    counts = dict(aged.execute('SELECT status, count FROM video_status_counts').fetchall())
+    assert counts == {'pending': 1, 'approved': 2, 'rejected': 2}
+    tombstones = {row[0] for row in aged.execute('SELECT id FROM video_tombstones')}
+    assert tombstones == {'rejected-old', 'approved-old'}
+
+def test_archived_videos_are_listed_from_the_archive(aged, db_path):
+    result = archive_videos(db_path, rejected_days=30, approved_days=90, batch_size=2)
+    assert (result['archived'], result['candidates']) == (3, 3)
+
+    store = SqliteVideoStore(db_path)
+    try:
+        rejected, cursor = store.list_archived('rejected', limit=1)
+        assert [video['id'] for video in rejected] == ['rejected-legacy']
+        rejected, cursor = store.list_archived('rejected', limit=1, cursor=cursor)
+        assert [video['id'] for video in rejected] == ['rejected-old']
+        assert cursor is None
+        assert [video['id'] for video in store.list_archived('approved')[0]] == ['approved-old']
+        assert 'approved-old' not in [video['id'] for video in store.list('approved')[0]]
+    finally:
+        store.close()
+
+def test_older_archive_gains_rejected_at(db_path):
+    path = archive_path(db_path)
+    legacy = sqlite3.connect(path)
+    legacy.execute('''
+        CREATE TABLE videos (
+            id TEXT PRIMARY KEY, trend TEXT NOT NULL, script TEXT NOT NULL, video_url TEXT, captions TEXT,
+            status TEXT, created_at TIMESTAMP, approved_at TIMESTAMP, posted_platforms TEXT, change_seq INTEGER,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    legacy.execute("INSERT INTO videos (id, trend, script, status, created_at) VALUES ('v1', 'T', 'S', 'rejected', '2024-01-01')")
+    legacy.commit()
+    legacy.close()
+
+    store = SqliteVideoStore(db_path)
+    try:
+        videos, _ = store.list_archived('rejected')
+        assert [(video['id'], video['rejected_at']) for video in videos] == [('v1', None)]
+    finally:
+        store.close()
+
+def test_full_vacuum_only_when_asked(db_path):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute('CREATE TABLE filler (data BLOB)')
+    conn.execute('''
+        WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 50)
+        INSERT INTO filler SELECT randomblob(4096) FROM n
+    ''')
+    conn.execute('DELETE FROM filler')
+
+    assert incremental_vacuum(conn) == 0
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 0
+
+    assert incremental_vacuum(conn, enable=True) > 0
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    conn.close()
@@ -0,0 +1,54 @@
+"""
+McLan Tax Baby Video Creator - Asset Build Tests
+Committed bundles are complete; the build refuses to skip brotli or Tailwind
+"""
+
+import json
+import os
+import shutil
+import pytest
+import build_assets
+from assets import DIST_DIR, MANIFEST_PATH
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_committed_dist_has_every_variant():
+    with open(MANIFEST_PATH, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    for built in manifest.values():
+        for suffix in ('', '.gz', '.br'):
+            assert os.path.exists(os.path.join(DIST_DIR, built + suffix)), built + suffix
+
+def test_pages_load_no_tailwind_runtime():
+    for page in ('templates/dashboard.html', 'api/index.py'):
+        with open(os.path.join(ROOT, page), encoding='utf-8') as f:
+            assert 'cdn.tailwindcss.com' not in f.read(), page
+
+def test_build_fails_without_brotli(tmp_path, monkeypatch):
+    monkeypatch.setattr(build_assets, 'brotli', None)
+
+    with pytest.raises(build_assets.BuildError, match='brotli'):
+        build_assets.build(out_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+def test_build_fails_without_tailwind_cli(tmp_path, monkeypatch):
+    pytest.importorskip('brotli')
+    monkeypatch.setattr(build_assets, 'TAILWIND_CLI', 'no-such-tailwindcss')
+
+    with pytest.raises(build_assets.BuildError, match='tailwindcss-bin'):
+        build_assets.build(out_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == []
+
+def test_css_bundle_includes_used_utilities(tmp_path):
+    pytest.importorskip('brotli')
+    if shutil.which(build_assets.TAILWIND_CLI) is None:
+        pytest.skip('Tailwind CLI not installed')
+
+    report = build_assets.build(out_dir=str(tmp_path))
+
+    with open(tmp_path / report['dashboard.css']['file'], encoding='utf-8') as f:
+        css = f.read()
+    assert r'.md\:grid-cols-4' in css
+    assert '.viral-button' in css
+    assert css.index('.text-white') < css.index('.viral-button')
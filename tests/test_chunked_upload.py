@@ -0,0 +1,176 @@
+"""
+McLan Tax Baby Video Creator - Chunked Upload Tests
+Resume, retry and chunk alignment against a local stand-in upload server
+"""
+
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+pytest.importorskip('tools')  # The package imports every agent tool (crewai_tools, ffmpeg, ...)
+from tools.chunked_upload import ChunkedUploader, UploadError, chunk_ranges
+
+MB = 1024 * 1024
+
+class StandInUploadServer(ThreadingHTTPServer):
+    """
+    Resumable upload endpoint in the YouTube style: 308 + Range per chunk,
+    201 at the end, and 'bytes */total' status queries. It can drop the
+    connection halfway through chunks, fail them with a status code, or
+    acknowledge them without keeping any bytes.
+    """
+
+    def __init__(self, drops: int = 0, fail_status: int = 0, discards: int = 0):
+        super().__init__(('127.0.0.1', 0), StandInUploadHandler)
+        self.received = bytearray()
+        self.content_ranges = []
+        self.drops_left = drops
+        self.fail_status = fail_status
+        self.discards_left = discards
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/upload'
+
+class StandInUploadHandler(BaseHTTPRequestHandler):
+    def do_PUT(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        content_range = self.headers['Content-Range']
+        server.content_ranges.append(content_range)
+
+        if content_range.startswith('bytes */'):
+            return self._reply_progress(int(content_range.split('/')[1]))
+
+        if server.fail_status:
+            self.send_response(server.fail_status)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        span, total = content_range[len('bytes '):].split('/')
+        start = int(span.split('-')[0])
+        if start != len(server.received):
+            return self._reply_progress(int(total))
+
+        if server.discards_left:
+            server.discards_left -= 1
+            return self._reply_progress(int(total))
+
+        # Keep half of a later chunk, then drop the connection
+        if server.drops_left and start > 0:
+            server.drops_left -= 1
+            server.received.extend(body[:len(body) // 2])
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+
+        server.received.extend(body)
+        self._reply_progress(int(total))
+
+    def _reply_progress(self, total: int):
+        received = self.server.received
+        done = len(received) >= total
+        self.send_response(201 if done else 308)
+        if received and not done:
+            self.send_header('Range', f'bytes=0-{len(received) - 1}')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(**kwargs) -> StandInUploadServer:
+        server = StandInUploadServer(**kwargs)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / 'video.mp4'
+    path.write_bytes(os.urandom(5 * MB + 123))
+    return str(path)
+
+def sha256_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+def test_upload_sends_whole_file_in_chunks(serve, video_file):
+    server = serve()
+    response, metrics = ChunkedUploader(chunk_size=MB, backoff=0.01).upload(server.url, video_file)
+
+    assert response.status_code == 201
+    assert hashlib.sha256(server.received).digest() == sha256_file(video_file)
+    assert metrics.chunks_sent == 6
+    assert metrics.retries == metrics.resumes == 0
+
+def test_dropped_connection_resumes_from_committed_offset(serve, video_file):
+    server = serve(drops=1)
+    response, metrics = ChunkedUploader(chunk_size=MB, backoff=0.01).upload(server.url, video_file)
+
+    assert response.status_code == 201
+    assert hashlib.sha256(server.received).digest() == sha256_file(video_file)
+    assert metrics.retries == 1
+    assert metrics.resumes == 1
+    # The status query, then the rest of the dropped chunk only (from MB + MB // 2)
+    status_at = server.content_ranges.index(f'bytes */{5 * MB + 123}')
+    assert server.content_ranges[status_at + 1] == f'bytes {MB + MB // 2}-{2 * MB - 1}/{5 * MB + 123}'
+
+def test_server_errors_retry_then_give_up(serve, video_file):
+    server = serve(fail_status=503)
+    uploader = ChunkedUploader(chunk_size=MB, max_retries=2, backoff=0.01)
+
+    with pytest.raises(UploadError, match='after 2 retries'):
+        uploader.upload(server.url, video_file)
+    chunk_puts = [r for r in server.content_ranges if not r.startswith('bytes */')]
+    assert len(chunk_puts) == 3
+
+def test_rejected_chunk_is_not_retried(serve, video_file):
+    server = serve(fail_status=400)
+
+    with pytest.raises(UploadError, match='Chunk rejected: 400'):
+        ChunkedUploader(chunk_size=MB, backoff=0.01).upload(server.url, video_file)
+    assert len(server.content_ranges) == 1
+
+def test_308_without_range_resends_from_what_the_server_holds(serve, video_file):
+    server = serve(discards=1)
+    response, metrics = ChunkedUploader(chunk_size=MB, backoff=0.01).upload(server.url, video_file)
+
+    assert response.status_code == 201
+    assert hashlib.sha256(server.received).digest() == sha256_file(video_file)
+    assert server.content_ranges[:2] == [f'bytes 0-{MB - 1}/{5 * MB + 123}'] * 2
+
+def test_server_that_never_commits_gives_up(serve, video_file):
+    server = serve(discards=100)
+
+    with pytest.raises(UploadError, match='stopped committing data at byte 0'):
+        ChunkedUploader(chunk_size=MB, max_retries=2, backoff=0.01).upload(server.url, video_file)
+    assert len(server.content_ranges) == 3
+
+def test_chunks_align_to_chunk_size(serve, video_file):
+    server = serve()
+    ChunkedUploader(chunk_size=MB, backoff=0.01).upload(server.url, video_file, merge_tail=True)
+
+    total = 5 * MB + 123
+    assert server.content_ranges == [
+        f'bytes {i * MB}-{(i + 1) * MB - 1}/{total}' for i in range(4)
+    ] + [f'bytes {4 * MB}-{total - 1}/{total}']
+
+def test_chunk_ranges():
+    assert chunk_ranges(0, 10) == []
+    assert chunk_ranges(25, 10) == [(0, 9), (10, 19), (20, 24)]
+    # TikTok: every chunk but the last is full size, the short tail is folded in
+    assert chunk_ranges(25, 10, merge_tail=True) == [(0, 9), (10, 24)]
+    assert chunk_ranges(5, 10, merge_tail=True) == [(0, 4)]
@@ -0,0 +1,64 @@
+"""
+McLan Tax Baby Video Creator - Content Index Tests
+Search result upserts and coverage lookups kept current by video_search
+"""
+
+import sqlite3
+from content_index import ContentIndex
+from migrations import migrate
+
+def add_video(conn, video_id, trend, script):
+    conn.execute('INSERT INTO videos (id, trend, script) VALUES (?, ?, ?)', (video_id, trend, script))
+
+def test_refetched_results_replace_instead_of_piling_up(conn, db_path):
+    index = ContentIndex(db_path)
+    results = [{'title': 'IRS refund delays', 'snippet': 'old', 'link': 'https://example.com/a'}]
+    index.add_search_results('tax refund', results)
+    index.add_search_results('tax refund', [{**results[0], 'snippet': 'new'}])
+    index.add_search_results('refund news', results)
+
+    rows = conn.execute('SELECT ref, body FROM content_index ORDER BY ref').fetchall()
+    assert [tuple(row) for row in rows] == [('refund news', 'old'), ('tax refund', 'new')]
+
+def test_coverage_follows_video_updates_and_deletes(conn, db_path):
+    index = ContentIndex(db_path)
+    add_video(conn, 'v1', 'Crypto gains taxed', 'Goo goo, my bitcoin')
+
+    assert [hit['ref'] for hit in index.already_covered('crypto gains')] == ['v1']
+
+    conn.execute("UPDATE videos SET trend = 'Daycare tax credit' WHERE id = 'v1'")
+    assert index.already_covered('crypto gains') == []
+    assert [hit['ref'] for hit in index.already_covered('daycare credit')] == ['v1']
+    assert index.recent_titles('trend') == ['Daycare tax credit']
+
+    conn.execute("DELETE FROM videos WHERE id = 'v1'")
+    assert index.already_covered('daycare credit') == []
+
+def test_legacy_content_index_is_migrated(db_path):
+    legacy = sqlite3.connect(db_path, isolation_level=None)
+    legacy.executescript('''
+        PRAGMA user_version = 6;
+        CREATE VIRTUAL TABLE content_index USING fts5(
+            kind UNINDEXED, ref UNINDEXED, title, body, indexed_at UNINDEXED, tokenize = 'porter unicode61'
+        );
+        CREATE TABLE videos (id TEXT PRIMARY KEY, trend TEXT, script TEXT);
+        CREATE TRIGGER videos_content_index_insert AFTER INSERT ON videos BEGIN
+            INSERT INTO content_index (kind, ref, title, body, indexed_at) VALUES ('trend', new.id, new.trend, '', 0);
+        END;
+        INSERT INTO content_index VALUES ('trend', 'v1', 'Crypto gains', '', 0);
+        INSERT INTO content_index VALUES ('search', 'tax refund', 'IRS refund delays', 'old', 1);
+        INSERT INTO content_index VALUES ('search', 'tax refund', 'IRS refund delays', 'old', 2);
+        INSERT INTO content_index VALUES ('search', 'tax refund', 'Child credit', 'kept', 2);
+    ''')
+    assert migrate(legacy) >= 7
+    legacy.close()
+
+    index = ContentIndex(db_path)
+    index.add_search_results('tax refund', [{'title': 'New story', 'snippet': 'fresh', 'link': 'https://example.com/n'}])
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name LIKE 'videos_content_index%'").fetchall() == []
+    rows = conn.execute('SELECT kind, title, body FROM content_index ORDER BY title').fetchall()
+    assert rows == [('search', 'Child credit', 'kept'), ('search', 'IRS refund delays', 'old'),
+                    ('search', 'New story', 'fresh')]
+    conn.close()
@@ -0,0 +1,40 @@
+"""
+McLan Tax Baby Video Creator - Live Events Tests
+Broker replay after reconnects and the per-process cap on open streams
+"""
+
+import pytest
+from config import Config
+from events import EventBroker
+
+@pytest.fixture
+def client(db_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_PATH', db_path)
+    import web_app
+    app = web_app.create_app(seed=False)
+    yield app.test_client()
+    web_app.store.close()
+
+def test_reconnect_replays_only_missed_events():
+    broker = EventBroker()
+    first = broker.publish('video-created', {'id': 'v1'})
+    broker.publish('video-created', {'id': 'v2'})
+
+    _, backlog = broker.subscribe(first)
+    assert [data['id'] for _, _, data in backlog] == ['v2']
+
+    # An id from before a server restart can't be replayed
+    _, backlog = broker.subscribe(first + 100)
+    assert [event for _, event, _ in backlog] == ['resync']
+
+def test_streams_past_the_cap_are_refused(client, monkeypatch):
+    import web_app
+    monkeypatch.setattr(Config, 'SSE_MAX_CLIENTS', 1)
+    held, _ = web_app.broker.subscribe()
+    try:
+        response = client.get('/api/events')
+    finally:
+        web_app.broker.unsubscribe(held)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
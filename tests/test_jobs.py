@@ -0,0 +1,124 @@
+"""
+McLan Tax Baby Video Creator - Job Queue Tests
+Leases and their renewal, retries with backoff and terminal states of the job runner
+"""
+
+import threading
+import time
+import pytest
+from config import Config
+from jobs import JobRunner, enqueue_job, get_job
+
+@pytest.fixture
+def queue(conn):
+    def add(kind='generate', payload=None):
+        return enqueue_job(conn, kind, payload)
+    return add
+
+def fail(payload):
+    raise RuntimeError('Heldra is down')
+
+def test_job_runs_to_done_with_its_result(conn, db_path, queue):
+    runner = JobRunner({'generate': lambda payload: {'topic': payload['topic']}}, db_path)
+    job_id = queue(payload={'topic': 'crypto'})
+
+    assert runner.run_next()
+    assert not runner.run_next()
+
+    job = get_job(conn, job_id)
+    assert (job['status'], job['attempts'], job['result']) == ('done', 1, {'topic': 'crypto'})
+    assert job['finished_at'] is not None
+
+def test_failed_job_backs_off_then_fails(conn, db_path, queue, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_MAX_ATTEMPTS', 2)
+    runner = JobRunner({'generate': fail}, db_path)
+    job_id = queue()
+
+    assert runner.run_next()
+    job = get_job(conn, job_id)
+    assert (job['status'], job['attempts'], job['last_error']) == ('queued', 1, 'Heldra is down')
+    assert not runner.run_next()  # Backing off
+
+    conn.execute('UPDATE jobs SET run_after = 0')
+    assert runner.run_next()
+    assert get_job(conn, job_id)['status'] == 'failed'
+
+def test_running_job_is_leased_to_one_runner(conn, db_path, queue):
+    first = JobRunner({'generate': fail}, db_path)
+    second = JobRunner({'generate': fail}, db_path)
+    queue()
+
+    claim_conn = first.connect()
+    assert first._claim(claim_conn)['status'] == 'running'
+    claim_conn.close()
+
+    assert not second.run_next()
+
+def test_expired_lease_requeues_until_last_attempt(conn, db_path, queue, monkeypatch):
+    monkeypatch.setattr(Config, 'JOB_MAX_ATTEMPTS', 2)
+    runner = JobRunner({'generate': lambda payload: 'ok'}, db_path, lease_seconds=-1)
+    job_id = queue()
+
+    # Two runners "die" mid-job in turn; the second death used the last attempt
+    for _ in range(2):
+        claim_conn = runner.connect()
+        assert runner._claim(claim_conn)['id'] == job_id
+        claim_conn.close()
+
+    assert not runner.run_next()
+    job = get_job(conn, job_id)
+    assert (job['status'], job['attempts'], job['last_error']) == ('failed', 2, 'Worker stopped while running')
+
+def test_runner_only_claims_kinds_it_handles(conn, db_path, queue):
+    runner = JobRunner({'generate': lambda payload: 'ok'}, db_path)
+    other = queue('archive')
+
+    assert not runner.run_next()
+    assert get_job(conn, other)['status'] == 'queued'
+
+def test_lease_is_renewed_while_the_handler_runs(conn, db_path, queue):
+    started, release = threading.Event(), threading.Event()
+
+    def slow(payload):
+        started.set()
+        release.wait(5)
+        return 'rendered'
+
+    first = JobRunner({'generate': slow}, db_path, lease_seconds=0.3)
+    second = JobRunner({'generate': slow}, db_path, lease_seconds=0.3)
+    job_id = queue()
+    thread = threading.Thread(target=first.run_next)
+    thread.start()
+    try:
+        assert started.wait(5)
+        time.sleep(0.6)  # Twice the lease
+        assert not second.run_next()
+    finally:
+        release.set()
+        thread.join(5)
+
+    job = get_job(conn, job_id)
+    assert (job['status'], job['attempts'], job['result']) == ('done', 1, 'rendered')
+
+def test_failed_at_most_once_job_is_unconfirmed_not_retried(conn, db_path, queue):
+    runner = JobRunner({'generate': fail}, db_path, at_most_once=('generate',))
+    job_id = queue()
+
+    assert runner.run_next()
+    conn.execute('UPDATE jobs SET run_after = 0')
+    assert not runner.run_next()
+
+    job = get_job(conn, job_id)
+    assert (job['status'], job['attempts'], job['last_error']) == ('unconfirmed', 1, 'Heldra is down')
+
+def test_lost_lease_on_at_most_once_job_is_unconfirmed(conn, db_path, queue):
+    runner = JobRunner({'generate': lambda payload: 'ok'}, db_path, lease_seconds=-1, at_most_once=('generate',))
+    job_id = queue()
+
+    claim_conn = runner.connect()
+    runner._claim(claim_conn)
+    claim_conn.close()
+
+    assert not runner.run_next()
+    job = get_job(conn, job_id)
+    assert (job['status'], job['attempts'], job['last_error']) == ('unconfirmed', 1, 'Worker stopped while running')
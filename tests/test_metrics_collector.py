@@ -0,0 +1,96 @@
+"""
+McLan Tax Baby Video Creator - Metrics Collector Tests
+Outbox discovery past unsent rows and per-platform fetch failures
+"""
+
+import time
+import pytest
+from metrics_collector import MetricsCollector
+from outbox import enqueue_post, init_outbox
+
+class FakeStatsClient:
+    """Returns fixed counters per platform; platforms in `failing` raise."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def fetch(self, platform, external_ids):
+        self.calls.append(platform)
+        if platform in self.failing:
+            raise ConnectionError(f"{platform} is down")
+        return {external_id: {"views": 100, "likes": 10, "comments": 1, "shares": 0} for external_id in external_ids}
+
+@pytest.fixture
+def outbox(conn):
+    init_outbox(conn)
+    return conn
+
+def queue(conn, video_id, platform):
+    enqueue_post(conn, video_id, platform, f'/videos/{video_id}.mp4', 'caption')
+    return conn.execute('SELECT id FROM post_outbox WHERE video_id = ? AND platform = ?',
+                        (video_id, platform)).fetchone()[0]
+
+def mark_sent(conn, row_id, external_id):
+    conn.execute("UPDATE post_outbox SET status = 'sent', result = ? WHERE id = ?",
+                 (f"Posted successfully. Video ID: {external_id}", row_id))
+
+def post_keys(conn):
+    return {row[0] for row in conn.execute('SELECT post_key FROM metric_posts')}
+
+def cursor(conn):
+    return int(conn.execute("SELECT value FROM metric_sync_cursors WHERE name = 'outbox'").fetchone()[0])
+
+def test_unsent_row_does_not_hold_back_later_sent_rows(outbox, db_path):
+    stuck = queue(outbox, 'v1', 'tiktok')
+    sent = queue(outbox, 'v2', 'tiktok')
+    mark_sent(outbox, sent, 'tt-2')
+    # Retrying: back in the queue with a future attempt time
+    outbox.execute("UPDATE post_outbox SET attempts = 1, next_attempt_at = ? WHERE id = ?",
+                   (time.time() + 3600, stuck))
+
+    collector = MetricsCollector(db_path, client=FakeStatsClient())
+    collector.collect_once()
+    assert post_keys(outbox) == {'tiktok:tt-2'}
+    assert cursor(outbox) == stuck - 1
+
+    # Seeing the sent row again on the next pass doesn't duplicate it
+    collector.collect_once()
+    assert post_keys(outbox) == {'tiktok:tt-2'}
+
+    mark_sent(outbox, stuck, 'tt-1')
+    collector.collect_once()
+    assert post_keys(outbox) == {'tiktok:tt-1', 'tiktok:tt-2'}
+    assert cursor(outbox) == sent
+
+def test_failed_and_unconfirmed_rows_let_the_cursor_pass(outbox, db_path):
+    failed = queue(outbox, 'v1', 'tiktok')
+    unconfirmed = queue(outbox, 'v2', 'tiktok')
+    outbox.execute("UPDATE post_outbox SET status = 'failed' WHERE id = ?", (failed,))
+    outbox.execute("UPDATE post_outbox SET status = 'unconfirmed' WHERE id = ?", (unconfirmed,))
+    sent = queue(outbox, 'v3', 'tiktok')
+    mark_sent(outbox, sent, 'tt-3')
+
+    MetricsCollector(db_path, client=FakeStatsClient()).collect_once()
+    assert post_keys(outbox) == {'tiktok:tt-3'}
+    assert cursor(outbox) == sent
+
+def test_failing_platform_is_rescheduled_and_others_still_polled(outbox, db_path):
+    mark_sent(outbox, queue(outbox, 'v1', 'tiktok'), 'tt-1')
+    mark_sent(outbox, queue(outbox, 'v1', 'youtube_shorts'), 'yt-1')
+    client = FakeStatsClient(failing={'tiktok'})
+
+    before = time.time()
+    changed = MetricsCollector(db_path, client=client).collect_once()
+
+    assert changed == 1
+    assert client.calls == ['tiktok', 'youtube_shorts']
+    tiktok = outbox.execute(
+        "SELECT views, poll_interval, next_poll_at FROM metric_posts WHERE post_key = 'tiktok:tt-1'"
+    ).fetchone()
+    youtube = outbox.execute(
+        "SELECT views FROM metric_posts WHERE post_key = 'youtube_shorts:yt-1'"
+    ).fetchone()
+    assert tiktok['views'] == 0
+    assert tiktok['next_poll_at'] >= before + tiktok['poll_interval']
+    assert youtube['views'] == 100
@@ -0,0 +1,99 @@
+"""
+McLan Tax Baby Video Creator - Migration Tests
+Legacy (pre-versioning) databases upgraded with their data
+"""
+
+import json
+import sqlite3
+import pytest
+from migrations import MIGRATIONS, migrate, schema_version
+from queries import get_video, search_videos
+
+LATEST = MIGRATIONS[-1][0]
+
+LEGACY_VIDEOS = (
+    ('v1', 'Crypto gains taxed', 'Goo goo bitcoin', {'tiktok': 'Baby hodler'}, 'pending', None,
+     '2024-01-01 10:00:00', None),
+    ('v2', 'Daycare credit', 'Receipts please', {'tiktok': 'Diaper deductions'}, 'approved',
+     ['tiktok', 'instagram'], '2024-01-01 11:30:00', '2024-01-02 09:00:00'),
+    ('v3', 'Inflation memes', 'Milk costs more', {}, 'rejected', None, '2024-01-02 08:00:00', None),
+)
+
+@pytest.fixture
+def legacy(db_path):
+    """A database from before schema versioning: the original videos table at user_version 0."""
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    connection.row_factory = sqlite3.Row
+    connection.execute('''
+        CREATE TABLE videos (
+            id TEXT PRIMARY KEY,
+            trend TEXT NOT NULL,
+            script TEXT NOT NULL,
+            video_url TEXT,
+            captions TEXT,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            approved_at TIMESTAMP,
+            posted_platforms TEXT
+        )
+    ''')
+    connection.executemany('''
+        INSERT INTO videos (id, trend, script, captions, status, posted_platforms, created_at, approved_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', [
+        (video_id, trend, script, json.dumps(captions), status,
+         json.dumps(posted) if posted is not None else None, created_at, approved_at)
+        for video_id, trend, script, captions, status, posted, created_at, approved_at in LEGACY_VIDEOS
+    ])
+    yield connection
+    connection.close()
+
+def test_legacy_database_is_migrated_with_its_data(legacy):
+    assert schema_version(legacy) == 0
+
+    assert migrate(legacy) == LATEST
+
+    counts = dict(legacy.execute('SELECT status, count FROM video_status_counts').fetchall())
+    assert counts == {'pending': 1, 'approved': 1, 'rejected': 1}
+
+    sequence = [row[0] for row in legacy.execute('SELECT change_seq FROM videos ORDER BY created_at')]
+    assert sequence == [1, 2, 3]
+
+    video = get_video(legacy, 'v2')
+    assert video['captions'] == {'tiktok': 'Diaper deductions'}
+    assert video['posted_platforms'] == ['tiktok', 'instagram']
+    assert [v['id'] for v in search_videos(legacy, 'diaper')] == ['v2']
+
+    days = {
+        (row['bucket_start'], row['platform']): (row['created'], row['approved'], row['rejected'], row['posted'])
+        for row in legacy.execute("SELECT * FROM video_rollups WHERE bucket = 'day'")
+    }
+    assert days[(1704067200, '')] == (2, 0, 0, 0)
+    assert days[(1704153600, '')] == (1, 1, 1, 0)
+    # Existing posts count on the day the video was approved
+    assert days[(1704153600, 'tiktok')] == (0, 0, 0, 1)
+    assert days[(1704153600, 'instagram')] == (0, 0, 0, 1)
+
+def test_migrating_again_changes_nothing(legacy):
+    migrate(legacy)
+    before = [tuple(row) for row in legacy.execute('SELECT * FROM videos ORDER BY id')]
+
+    assert migrate(legacy) == LATEST
+    assert [tuple(row) for row in legacy.execute('SELECT * FROM videos ORDER BY id')] == before
+
+def test_triggers_keep_migrated_database_current(legacy):
+    migrate(legacy)
+
+    legacy.execute("UPDATE videos SET status = 'approved', captions = ? WHERE id = 'v1'",
+                   (json.dumps({'tiktok': 'Lullaby ledger'}),))
+    legacy.execute("UPDATE videos SET posted_platforms = ? WHERE id = 'v2'",
+                   (json.dumps(['tiktok', 'instagram', 'youtube_shorts']),))
+    legacy.execute("DELETE FROM videos WHERE id = 'v3'")
+
+    counts = dict(legacy.execute('SELECT status, count FROM video_status_counts').fetchall())
+    assert counts == {'pending': 0, 'approved': 2, 'rejected': 0}
+    assert [v['id'] for v in search_videos(legacy, 'lullaby')] == ['v1']
+    assert legacy.execute("SELECT id FROM video_tombstones").fetchall()[0][0] == 'v3'
+    posted = dict(legacy.execute("SELECT platform, SUM(posted) FROM video_rollups "
+                                 "WHERE bucket = 'day' AND platform != '' GROUP BY platform").fetchall())
+    assert posted == {'tiktok': 1, 'instagram': 1, 'youtube_shorts': 1}
@@ -0,0 +1,202 @@
+"""
+McLan Tax Baby Video Creator - Outbox Tests
+Sending outbox rows end to end and the sender's lease/retry state machine
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import pytest
+from config import Config
+from outbox import OutboxSender, enqueue_post, outbox_rows
+
+VIDEO_BYTES = os.urandom(300 * 1024)
+
+class StandInPlatformHandler(BaseHTTPRequestHandler):
+    """The video host plus YouTube's resumable upload API."""
+
+    def do_GET(self):
+        if self.path != '/videos/baby.mp4':
+            return self._reply(404)
+        self._reply(200, VIDEO_BYTES, 'video/mp4')
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if not self.path.startswith('/upload/youtube/v3/videos?uploadType=resumable'):
+            return self._reply(404)
+        self.send_response(200)
+        self.send_header('Location', f'http://127.0.0.1:{self.server.server_port}/upload-session')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_PUT(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.uploads.append(body)
+        self._reply(201, json.dumps({'id': 'yt-123'}).encode('utf-8'), 'application/json')
+
+    def _reply(self, status, body=b'', content_type='text/plain'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def platform(monkeypatch, tmp_path):
+    """A stand-in platform, with the upload session routing googleapis.com to it."""
+    pytest.importorskip('tools')  # The package imports every agent tool (crewai_tools, ffmpeg, ...)
+    import requests
+    from requests.adapters import HTTPAdapter
+    import tools.chunked_upload
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInPlatformHandler)
+    server.uploads = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    class LocalAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            parts = urlsplit(request.url)
+            request.url = f"{base}{parts.path}{'?' + parts.query if parts.query else ''}"
+            return super().send(request, **kwargs)
+
+    session = requests.Session()
+    session.mount('https://www.googleapis.com/', LocalAdapter())
+    monkeypatch.setattr(tools.chunked_upload, '_session', session)
+    monkeypatch.setattr(Config, 'UPLOAD_CACHE_DIR', str(tmp_path / 'uploads'))
+
+    server.base = base
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def add_video(conn, video_id, video_url):
+    conn.execute(
+        "INSERT INTO videos (id, trend, script, video_url, status) VALUES (?, 'Tax', 'Script', ?, 'approved')",
+        (video_id, video_url)
+    )
+
+def test_sends_url_video_end_to_end(conn, db_path, platform):
+    sender = OutboxSender(db_path)  # The real post_fn: PostToSocialTool
+    video_url = f'{platform.base}/videos/baby.mp4'
+    add_video(conn, 'v1', video_url)
+    enqueue_post(conn, 'v1', 'youtube_shorts', video_url, 'Baby explains taxes')
+
+    assert sender.send_next()
+
+    row = outbox_rows(conn, 'v1')[0]
+    assert row['status'] == 'sent', row['last_error']
+    assert row['result'].startswith('Posted successfully! Video ID: yt-123')
+    assert platform.uploads == [VIDEO_BYTES]
+    posted = conn.execute("SELECT posted_platforms FROM videos WHERE id = 'v1'").fetchone()[0]
+    assert json.loads(posted) == ['youtube_shorts']
+
+def test_failed_download_is_retried(conn, db_path, platform):
+    sender = OutboxSender(db_path)
+    video_url = f'{platform.base}/videos/missing.mp4'
+    add_video(conn, 'v1', video_url)
+    enqueue_post(conn, 'v1', 'youtube_shorts', video_url, 'Baby explains taxes')
+
+    assert sender.send_next()
+
+    row = outbox_rows(conn, 'v1')[0]
+    assert row['status'] == 'queued'
+    assert '404' in row['last_error']
+    assert platform.uploads == []
+    assert os.listdir(Config.UPLOAD_CACHE_DIR) == []
+
+class ScriptedPost:
+    """post_fn stand-in that replays results (an Exception instance is raised)."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self, video_path, caption, platform):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+def queued_post(conn, video_id='v1'):
+    add_video(conn, video_id, f'/videos/{video_id}.mp4')
+    enqueue_post(conn, video_id, 'tiktok', f'/videos/{video_id}.mp4', 'caption')
+
+def test_same_video_and_platform_is_queued_once(conn, db_path):
+    OutboxSender(db_path, post_fn=ScriptedPost())
+    queued_post(conn)
+
+    assert not enqueue_post(conn, 'v1', 'tiktok', '/videos/other.mp4', 'caption')
+    assert len(outbox_rows(conn, 'v1')) == 1
+
+def test_claimed_row_is_leased_to_one_sender(conn, db_path):
+    first, second = OutboxSender(db_path, post_fn=ScriptedPost()), OutboxSender(db_path, post_fn=ScriptedPost())
+    queued_post(conn)
+
+    claim_conn = first.connect()
+    row = first._claim(claim_conn)
+    claim_conn.close()
+
+    assert row['status'] == 'sending' and row['attempts'] == 1
+    assert not second.send_next()
+
+def test_expired_lease_is_parked_as_unconfirmed(conn, db_path):
+    post = ScriptedPost()
+    sender = OutboxSender(db_path, post_fn=post, lease_seconds=-1)
+    queued_post(conn)
+    claim_conn = sender.connect()
+    sender._claim(claim_conn)  # The sender "dies" holding the lease
+    claim_conn.close()
+
+    assert not sender.send_next()
+
+    row = outbox_rows(conn, 'v1')[0]
+    assert row['status'] == 'unconfirmed'
+    assert post.calls == 0
+
+def test_explicit_failure_backs_off_then_fails(conn, db_path, monkeypatch):
+    monkeypatch.setattr(Config, 'OUTBOX_MAX_ATTEMPTS', 2)
+    post = ScriptedPost('Error posting to TikTok: 400', RuntimeError('Bad caption'))
+    sender = OutboxSender(db_path, post_fn=post)
+    queued_post(conn)
+
+    assert sender.send_next()
+    row = outbox_rows(conn, 'v1')[0]
+    assert (row['status'], row['attempts']) == ('queued', 1)
+    assert row['next_attempt_at'] > 0
+    assert not sender.send_next()  # Not due yet
+
+    conn.execute('UPDATE post_outbox SET next_attempt_at = 0')
+    assert sender.send_next()
+    row = outbox_rows(conn, 'v1')[0]
+    assert (row['status'], row['attempts'], row['last_error']) == ('failed', 2, 'Bad caption')
+
+def test_ambiguous_error_is_not_retried(conn, db_path):
+    post = ScriptedPost(TimeoutError('Read timed out'))
+    sender = OutboxSender(db_path, post_fn=post)
+    queued_post(conn)
+
+    assert sender.send_next()
+    conn.execute('UPDATE post_outbox SET next_attempt_at = 0')
+    assert not sender.send_next()
+
+    assert outbox_rows(conn, 'v1')[0]['status'] == 'unconfirmed'
+    assert post.calls == 1
+
+def test_success_marks_sent_once_per_platform(conn, db_path):
+    sender = OutboxSender(db_path, post_fn=ScriptedPost('Posted successfully! Video ID: tt-1'))
+    queued_post(conn)
+    conn.execute("UPDATE videos SET posted_platforms = '[\"tiktok\"]' WHERE id = 'v1'")
+
+    assert sender.send_next()
+
+    row = outbox_rows(conn, 'v1')[0]
+    assert row['status'] == 'sent' and row['sent_at'] is not None
+    posted = conn.execute("SELECT posted_platforms FROM videos WHERE id = 'v1'").fetchone()[0]
+    assert json.loads(posted) == ['tiktok']
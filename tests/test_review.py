@@ -0,0 +1,57 @@
+"""
+McLan Tax Baby Video Creator - Review Endpoint Tests
+Rejecting approved videos cancels unsent posts; unknown ids are 404s
+"""
+
+import sqlite3
+import pytest
+from config import Config
+
+@pytest.fixture
+def client(db_path, monkeypatch):
+    monkeypatch.setattr(Config, 'DATABASE_PATH', db_path)
+    import web_app
+    app = web_app.create_app(seed=False)
+    web_app.store.add({
+        'id': 'v1', 'trend': 'Crypto gains', 'script': 'Goo goo', 'videoUrl': 'https://example.com/v1.mp4',
+        'captions': {'tiktok': 'caption'}
+    })
+    yield app.test_client()
+    web_app.store.close()
+
+def outbox_statuses(db_path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute('SELECT platform, status FROM post_outbox ORDER BY platform').fetchall()
+    conn.close()
+    return dict(rows)
+
+def test_reject_after_approve_cancels_queued_posts(client, db_path):
+    assert client.post('/api/videos/v1/approve').status_code == 202
+    conn = sqlite3.connect(db_path)
+    with conn:
+        # One post already went out; rejecting can't take it back
+        conn.execute("UPDATE post_outbox SET status = 'sent' WHERE platform = 'tiktok'")
+    conn.close()
+
+    response = client.post('/api/videos/v1/reject')
+
+    assert response.status_code == 200
+    assert outbox_statuses(db_path) == {'tiktok': 'sent'}
+    assert client.get('/api/videos/v1/posts').get_json()['done'] is True
+
+def test_bulk_reject_cancels_queued_posts(client, db_path):
+    client.post('/api/videos/v1/approve')
+    assert set(outbox_statuses(db_path).values()) == {'queued'}
+
+    response = client.post('/api/videos/bulk', json={'ids': ['v1', 'nope'], 'action': 'reject'})
+
+    assert response.status_code == 200
+    assert [r['success'] for r in response.get_json()['results']] == [True, False]
+    assert outbox_statuses(db_path) == {}
+
+def test_unknown_ids_are_not_found(client):
+    assert client.post('/api/videos/nope/reject').status_code == 404
+    assert client.post('/api/videos/nope/approve').status_code == 404
+    response = client.post('/api/videos/bulk', json={'ids': ['nope'], 'action': 'reject'})
+    assert response.status_code == 404
+    assert response.get_json()['updated'] == 0
@@ -0,0 +1,131 @@
+"""
+McLan Tax Baby Video Creator - Scheduler Tests
+Slot allocation, atomic dispatch claims, crash recovery and outbox hand-off
+"""
+
+import threading
+from datetime import datetime, timedelta
+import pytest
+from outbox import outbox_rows
+from scheduler import PostDispatcher, PostSchedule, slot_minute
+
+@pytest.fixture
+def schedule(db_path):
+    return PostSchedule(db_path)
+
+def test_next_slot_skips_taken_slot_despite_float_drift(schedule):
+    after = datetime(2030, 1, 1, 0, 0)
+    first = schedule.next_slot('tiktok', after)
+    # Stored a hair off the computed slot, as a round trip through a string or another clock would
+    schedule.add('/videos/a.mp4', 'caption', 'tiktok', first.timestamp() + 0.0004)
+
+    second = schedule.next_slot('tiktok', after)
+    assert second > first
+    assert slot_minute(second.timestamp()) != slot_minute(first.timestamp())
+
+def test_failed_posts_free_their_slot(schedule):
+    after = datetime(2030, 1, 1, 0, 0)
+    first = schedule.next_slot('tiktok', after)
+    post_id = schedule.add('/videos/a.mp4', 'caption', 'tiktok', first.timestamp())
+    schedule.mark(post_id, 'failed', 'boom')
+
+    assert schedule.next_slot('tiktok', after) == first
+
+def test_claim_is_granted_once(schedule):
+    post_id = schedule.add('/videos/a.mp4', 'caption', 'tiktok', 0)
+
+    assert schedule.claim(post_id)['status'] == 'dispatching'
+    assert schedule.claim(post_id) is None
+
+def test_claim_left_by_crashed_dispatcher_is_sent_on_restart(schedule, db_path):
+    post_id = schedule.add('/videos/a.mp4', 'caption', 'tiktok', 0, video_id='video-1')
+    # The first dispatcher claims the post and dies before marking it
+    crashed = PostDispatcher(schedule, post_fn=lambda *args: 'ok')
+    crashed._load_pending()
+    assert schedule.claim(post_id) is not None
+    assert crashed._last_seen_id == post_id
+
+    sent = threading.Event()
+    restarted = PostDispatcher(PostSchedule(db_path), post_fn=lambda *args: sent.set() or 'ok',
+                               poll_interval=0.05, stale_seconds=0)
+    restarted.start()
+    try:
+        assert sent.wait(5)
+    finally:
+        restarted.stop()
+        restarted.join(5)
+    assert schedule.get(post_id)['status'] == 'dispatched'
+
+def test_fresh_claim_is_not_released(schedule):
+    post_id = schedule.add('/videos/a.mp4', 'caption', 'tiktok', 0)
+    schedule.claim(post_id)
+
+    assert schedule.release_stale(60) == 0
+    assert schedule.get(post_id)['status'] == 'dispatching'
+
+def test_released_post_is_reloaded_past_the_cursor(schedule):
+    dispatcher = PostDispatcher(schedule, post_fn=lambda *args: 'ok', stale_seconds=0)
+    post_id = schedule.add('/videos/a.mp4', 'caption', 'tiktok', 0)
+    dispatcher._load_pending()
+    dispatcher._heap.clear()
+    dispatcher._queued.clear()
+    schedule.claim(post_id)
+
+    dispatcher._release_stale()
+    assert dispatcher._heap == [(0, post_id)]
+
+def test_competing_dispatchers_send_each_post_once(db_path):
+    schedule = PostSchedule(db_path)
+    post_ids = [schedule.add(f'/videos/{i}.mp4', 'caption', 'tiktok', 0) for i in range(20)]
+    sent = []
+    lock = threading.Lock()
+
+    def post_fn(video_id, video_path, caption, platform):
+        with lock:
+            sent.append(video_path)
+        return 'ok'
+
+    dispatchers = [PostDispatcher(PostSchedule(db_path), post_fn=post_fn) for _ in range(4)]
+    threads = [threading.Thread(target=lambda d=d: [d._dispatch(post_id) for post_id in post_ids])
+               for d in dispatchers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(sent) == sorted(f'/videos/{i}.mp4' for i in range(20))
+    assert {schedule.get(post_id)['status'] for post_id in post_ids} == {'dispatched'}
+
+def test_dispatch_hands_off_to_outbox_by_video_id(schedule):
+    dispatcher = PostDispatcher(schedule)
+    first = schedule.add('/videos/a.mp4', 'caption', 'tiktok', 0, video_id='video-1')
+    again = schedule.add('/videos/a.mp4', 'caption', 'tiktok', 0, video_id='video-1')
+    dispatcher._dispatch(first)
+    dispatcher._dispatch(again)
+
+    assert schedule.get(first)['result'].startswith('Queued in outbox')
+    assert schedule.get(again)['result'].startswith('Already in outbox')
+    conn = schedule.connect()
+    assert [row['video_path'] for row in outbox_rows(conn, 'video-1')] == ['/videos/a.mp4']
+    conn.close()
+
+def test_rescheduling_a_file_without_video_id_posts_again(schedule):
+    dispatcher = PostDispatcher(schedule)
+    first = schedule.add('/videos/a.mp4', 'caption', 'tiktok', 0)
+    again = schedule.add('/videos/a.mp4', 'caption', 'tiktok', 0)
+    dispatcher._dispatch(first)
+    dispatcher._dispatch(again)
+
+    assert schedule.get(first)['result'].startswith('Queued in outbox')
+    assert schedule.get(again)['result'].startswith('Queued in outbox')
+
+def test_dispatcher_thread_fires_due_posts(schedule):
+    sent = threading.Event()
+    dispatcher = PostDispatcher(schedule, post_fn=lambda *args: sent.set() or 'ok', poll_interval=0.05)
+    schedule.add('/videos/a.mp4', 'caption', 'tiktok', (datetime.now() - timedelta(minutes=5)).timestamp())
+    dispatcher.start()
+    try:
+        assert sent.wait(5)
+    finally:
+        dispatcher.stop()
+        dispatcher.join(5)
@@ -0,0 +1,29 @@
+"""
+McLan Tax Baby Video Creator - Script Similarity Tests
+Packed MinHash signatures and near-duplicate lookups
+"""
+
+import random
+from benchmark import legacy_minhash
+from script_similarity import ScriptSimilarityIndex, minhash
+
+def test_signatures_match_the_per_permutation_formula():
+    # Stored signatures must stay comparable with newly computed ones
+    rng = random.Random(3)
+    words = 'baby tax refund crypto daycare credit irs audit wallet goo'.split()
+    scripts = ['', 'Hi!', 'Goo goo taxes 👶'] + [
+        ' '.join(rng.choice(words) + str(rng.randrange(40)) for _ in range(rng.randrange(1, 120)))
+        for _ in range(50)
+    ]
+    for script in scripts:
+        assert minhash.__wrapped__(script) == legacy_minhash(script)
+
+def test_near_duplicate_is_found_and_fresh_script_is_not(db_path):
+    index = ScriptSimilarityIndex(db_path, threshold=0.5)
+    original = ("Goo goo, listen up: if you sold crypto this year the IRS wants a piece, "
+                "and no, hiding it in your diaper bag does not count as cold storage")
+    index.add('heldra:1', original)
+
+    edited = original.replace('this year', 'last year')
+    assert [ref for ref, _ in index.find_similar(edited)] == ['heldra:1']
+    assert index.find_similar("Daycare receipts are a tax credit, mommy, keep every single one of them") == []
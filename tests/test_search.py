@@ -0,0 +1,43 @@
+"""
+McLan Tax Baby Video Creator - Search Tests
+Every match is ranked, however many newer videos also match
+"""
+
+import pytest
+from queries import search_videos
+from storage.memory import MemoryVideoStore
+
+MATCHES = 600
+
+def videos():
+    # The best match is the oldest: its trend names the word, while the
+    # newer videos only mention it in their scripts
+    yield {'id': 'best', 'trend': 'Mortgage interest deduction', 'script': 'Goo goo', 'status': 'approved'}
+    for i in range(MATCHES):
+        yield {'id': f'v{i:03}', 'trend': 'Tax season', 'script': f'Goo goo mortgage {i}', 'status': 'pending'}
+
+@pytest.fixture
+def indexed(conn):
+    conn.execute('BEGIN')
+    conn.executemany(
+        'INSERT INTO videos (id, trend, script, status) VALUES (:id, :trend, :script, :status)', videos()
+    )
+    conn.execute('COMMIT')
+    return conn
+
+def test_oldest_best_match_outranks_newer_ones(indexed):
+    results = search_videos(indexed, 'mortgage', limit=3)
+
+    assert [video['id'] for video in results] == ['best', f'v{MATCHES - 1:03}', f'v{MATCHES - 2:03}']
+    assert results[0]['snippet'].startswith('<mark>Mortgage</mark>')
+
+def test_status_filter_ranks_within_the_status(indexed):
+    assert [video['id'] for video in search_videos(indexed, 'mortgage', 'approved')] == ['best']
+    assert len(search_videos(indexed, 'mortgage', 'pending', limit=100)) == 100
+
+def test_memory_store_ranks_every_match():
+    store = MemoryVideoStore()
+    for video in videos():
+        store.add(video)
+
+    assert store.search('mortgage', limit=1)[0]['id'] == 'best'
@@ -0,0 +1,188 @@
+"""
+McLan Tax Baby Video Creator - Storage Tests
+JSONL log recovery, compaction and sharing; store selection for deployments
+"""
+
+import json
+import os
+import threading
+import pytest
+from storage import get_store, is_ephemeral
+from storage.jsonl import JsonlVideoStore
+
+def video(video_id, created_at='2025-01-13 12:00:00'):
+    return {'id': video_id, 'trend': f'Trend {video_id}', 'script': 'Goo goo', 'created_at': created_at}
+
+@pytest.fixture
+def log_path(tmp_path):
+    return str(tmp_path / 'videos.jsonl')
+
+def open_store(path, compact_records=JsonlVideoStore.COMPACT_RECORDS):
+    store = JsonlVideoStore(path)
+    store.COMPACT_RECORDS = compact_records
+    return store
+
+def test_torn_write_is_skipped_and_fenced_off(log_path):
+    store = open_store(log_path)
+    store.add(video('v1'))
+    store.close()
+
+    # A writer that crashed mid-append
+    with open(log_path, 'ab') as f:
+        f.write(b'{"seq":2,"op":"put","video":{"id":"torn"')
+
+    store = open_store(log_path)
+    assert store.get('torn') is None
+    store.add(video('v2'))
+    store.close()
+
+    store = open_store(log_path)
+    try:
+        assert len(store) == 2
+        assert store.get('v2')['trend'] == 'Trend v2'
+        assert store.version() == 2
+    finally:
+        store.close()
+
+def test_compaction_folds_patches_and_deletes(log_path):
+    store = open_store(log_path, compact_records=4)
+    try:
+        store.add(video('v1'))
+        store.add(video('v2'))
+        store.delete('v2')
+        store.review([('v1', 'approve')])
+
+        with open(log_path, 'rb') as f:
+            records = [json.loads(line) for line in f]
+        assert [record['op'] for record in records] == ['header', 'delete', 'put']
+        assert records[2]['video']['status'] == 'approved'
+        assert store.changes_since(0)['deleted'] == ['v2']
+    finally:
+        store.close()
+
+def test_reopen_reads_the_index_then_only_the_tail(log_path):
+    store = open_store(log_path, compact_records=2)
+    store.add(video('v1', '2025-01-13 10:00:00'))
+    store.add(video('v2', '2025-01-13 11:00:00'))
+    store.add(video('v3', '2025-01-13 12:00:00'))
+    store.close()
+
+    store = open_store(log_path)
+    try:
+        assert store.version() == 3
+        # Only the record appended after compaction was replayed; the
+        # other bodies wait until a page needs them
+        assert store._tail == 1
+        assert set(store._videos) == {'v3'}
+        assert [v['id'] for v in store.list('pending')[0]] == ['v3', 'v2', 'v1']
+    finally:
+        store.close()
+
+def test_stale_index_generation_is_rebuilt(log_path):
+    store = open_store(log_path, compact_records=2)
+    store.add(video('v1'))
+    store.add(video('v2'))
+    store.close()
+
+    with open(log_path + '.idx') as f:
+        index = json.load(f)
+    index['generation'] = 'stale'
+    index['ids'] = ['v1']
+    with open(log_path + '.idx', 'w') as f:
+        json.dump(index, f)
+
+    store = open_store(log_path)
+    try:
+        assert {v['id'] for v in store.list('pending')[0]} == {'v1', 'v2'}
+        with open(log_path, 'rb') as f:
+            header = json.loads(f.readline())
+        with open(log_path + '.idx') as f:
+            assert json.load(f)['generation'] == header['generation']
+    finally:
+        store.close()
+
+def test_stores_sharing_a_file_see_each_others_writes(log_path):
+    first, second = open_store(log_path, compact_records=3), open_store(log_path)
+    try:
+        first.add(video('v1'))
+        second.add(video('v2'))
+        assert second.version() == 2
+        first.review([('v2', 'approve')])
+        assert second.get('v2')['status'] == 'approved'
+
+        # first compacts (a new inode): second reloads instead of reading stale offsets
+        first.add(video('v3'))
+        assert [v['id'] for v in second.list('pending')[0]] == ['v3', 'v1']
+    finally:
+        first.close()
+        second.close()
+
+def test_concurrent_writers_never_reuse_a_sequence(log_path):
+    stores = [open_store(log_path, compact_records=25) for _ in range(2)]
+
+    def write(store, prefix):
+        for i in range(40):
+            store.add(video(f'{prefix}{i}'))
+
+    threads = [threading.Thread(target=write, args=(store, prefix)) for store, prefix in zip(stores, 'ab')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for store in stores:
+        store.close()
+
+    store = open_store(log_path)
+    try:
+        assert len(store) == 80
+        assert store.version() == 80
+    finally:
+        store.close()
+
+def test_ephemeral_files_are_refused_when_asked(tmp_path, monkeypatch):
+    monkeypatch.delenv('STORAGE_PATH', raising=False)
+    assert is_ephemeral('/tmp/mclantax_videos.jsonl')
+    assert is_ephemeral(None)
+    assert not is_ephemeral(os.path.join(os.sep, 'var', 'data', 'videos.jsonl'))
+
+    with pytest.raises(ValueError, match='not durable'):
+        get_store('jsonl', '/tmp/mclantax_videos.jsonl', allow_ephemeral=False)
+    with pytest.raises(ValueError, match='not durable'):
+        get_store('sqlite', allow_ephemeral=False)
+    assert len(get_store('memory', allow_ephemeral=False)) == 0
+
+def test_postgres_needs_a_url(monkeypatch):
+    for name in ('STORAGE_PATH', 'DATABASE_URL', 'POSTGRES_URL'):
+        monkeypatch.delenv(name, raising=False)
+    with pytest.raises(ValueError, match='DATABASE_URL'):
+        get_store('postgres')
+
+@pytest.fixture
+def pg_store():
+    pytest.importorskip('psycopg')
+    url = os.getenv('TEST_DATABASE_URL')
+    if not url:
+        pytest.skip('TEST_DATABASE_URL not set')
+    from storage.postgres import PostgresVideoStore
+    store = PostgresVideoStore(url)
+    store.connect().execute('TRUNCATE videos')
+    yield store
+    store.close()
+
+def test_postgres_store_is_shared_across_instances(pg_store):
+    from storage.postgres import PostgresVideoStore
+    pg_store.add(video('v1'))
+    pg_store.add(video('v2'))
+
+    other = PostgresVideoStore(pg_store.url)
+    try:
+        assert other.version() == 2
+        other.review([('v1', 'approve')])
+        other.delete('v2')
+
+        assert pg_store.get('v1')['status'] == 'approved'
+        assert pg_store.get('v2') is None
+        assert pg_store.changes_since(2)['deleted'] == ['v2']
+        assert pg_store.version() == 4
+    finally:
+        other.close()
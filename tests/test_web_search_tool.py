@@ -0,0 +1,33 @@
+"""
+McLan Tax Baby Video Creator - Web Search Tool Tests
+Batch searches with blank queries
+"""
+
+import pytest
+
+pytest.importorskip('tools')
+from config import Config
+from tools.web_search_tool import WebSearchTool
+
+@pytest.fixture
+def live_key(monkeypatch):
+    # A real-looking key, so the tool doesn't fall back to mock results
+    monkeypatch.setattr(Config, 'SERPAPI_API_KEY', 'test-key')
+
+def test_all_blank_queries_return_without_searching(live_key, monkeypatch):
+    monkeypatch.setattr(WebSearchTool, '_cached_search', lambda self, q: pytest.fail('searched'))
+
+    assert WebSearchTool()._run(queries=['', '   ', None]).startswith('No search queries given')
+    assert WebSearchTool()._run(query='  ').startswith('No search query given')
+
+def test_blank_queries_are_dropped_from_a_batch(live_key, monkeypatch):
+    searched = []
+    def search(self, q):
+        searched.append(q)
+        return {'organic_results': [{'title': q, 'snippet': '', 'link': f'https://example.com/{q}'}]}
+    monkeypatch.setattr(WebSearchTool, '_cached_search', search)
+
+    digest = WebSearchTool()._run(queries=[' ', 'tax refund', ''])
+
+    assert searched == ['tax refund']
+    assert digest.startswith('MERGED RESULTS FOR 1 SEARCHES')
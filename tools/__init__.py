@@ -2,10 +2,12 @@ from .web_search_tool import WebSearchTool
 from .heldra_api_tool import HeldraAPITool
 from .ffmpeg_tool import FFMPEGTool
 from .social_media_tool import PostToSocialTool
+from .coverage_check_tool import CoverageCheckTool
 
 __all__ = [
     "WebSearchTool",
     "HeldraAPITool", 
     "FFMPEGTool",
-    "PostToSocialTool"
+    "PostToSocialTool",
+    "CoverageCheckTool"
 ] 
\ No newline at end of file
@@ -0,0 +1,303 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+
+# Status codes upload servers use to say "chunk stored, send the next one"
+INCOMPLETE_STATUSES = (206, 308)
+COMPLETE_STATUSES = (200, 201)
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_upload_session() -> requests.Session:
+    """
+    Get the process-wide HTTP session used for uploads.
+
+    The session keeps a pool of keep-alive connections per host, so
+    consecutive chunks and consecutive posts reuse the same sockets
+    instead of paying a new TCP/TLS handshake every time.
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=Config.UPLOAD_POOL_SIZE,
+                pool_maxsize=Config.UPLOAD_POOL_SIZE
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+
+        return _session
+
+def fetch_video(video_path: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Get a local file for a video, downloading it first if it is a URL.
+
+    Dashboard videos are stored by URL, but TikTok and YouTube upload the
+    file's bytes. Downloads stream into UPLOAD_CACHE_DIR under a name
+    derived from the URL, so every platform posting a video shares one
+    download, and a partial download never looks finished.
+
+    Args:
+        video_path (str): Local path, or http(s) URL of the rendered video
+        cache_dir (str): Where downloads go (default: UPLOAD_CACHE_DIR)
+
+    Returns:
+        str: Path to a local copy of the video
+    """
+    if not re.match(r"https?://", video_path):
+        return video_path
+
+    cache_dir = cache_dir or Config.UPLOAD_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    extension = os.path.splitext(urlparse(video_path).path)[1] or ".mp4"
+    local_path = os.path.join(cache_dir, hashlib.sha256(video_path.encode("utf-8")).hexdigest()[:32] + extension)
+    if os.path.exists(local_path):
+        return local_path
+
+    with get_upload_session().get(video_path, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        fd, partial_path = tempfile.mkstemp(suffix=".part", dir=cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as partial:
+                for block in response.iter_content(chunk_size=1024 * 1024):
+                    partial.write(block)
+            os.replace(partial_path, local_path)
+        except BaseException:
+            os.remove(partial_path)
+            raise
+
+    return local_path
+
+def chunk_ranges(total_size: int, chunk_size: int, merge_tail: bool = False) -> List[Tuple[int, int]]:
+    """
+    Split a file into inclusive (start, end) byte ranges.
+
+    Args:
+        total_size (int): File size in bytes
+        chunk_size (int): Target chunk size in bytes
+        merge_tail (bool): Fold a short final chunk into the previous one
+            (TikTok requires every chunk except the last to be full size)
+
+    Returns:
+        List[Tuple[int, int]]: Byte ranges covering the whole file
+    """
+    if total_size <= 0:
+        return []
+
+    chunk_size = max(1, min(chunk_size, total_size))
+
+    if merge_tail:
+        count = max(1, total_size // chunk_size)
+        ranges = [(i * chunk_size, (i + 1) * chunk_size - 1) for i in range(count)]
+        ranges[-1] = (ranges[-1][0], total_size - 1)
+        return ranges
+
+    return [
+        (start, min(start + chunk_size, total_size) - 1)
+        for start in range(0, total_size, chunk_size)
+    ]
+
+class UploadError(Exception):
+    """Raised when an upload cannot be completed after retries."""
+
+class UploadMetrics:
+    """Throughput and retry counters for a single upload."""
+
+    def __init__(self, total_bytes: int):
+        self.total_bytes = total_bytes
+        self.bytes_sent = 0
+        self.chunks_sent = 0
+        self.retries = 0
+        self.resumes = 0
+        self.started_at = time.monotonic()
+        self.finished_at = None
+
+    def finish(self):
+        self.finished_at = time.monotonic()
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return max(end - self.started_at, 1e-9)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second actually put on the wire."""
+        return self.bytes_sent / self.elapsed
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "total_bytes": self.total_bytes,
+            "bytes_sent": self.bytes_sent,
+            "chunks_sent": self.chunks_sent,
+            "retries": self.retries,
+            "resumes": self.resumes,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "throughput_bytes_per_second": round(self.throughput, 1)
+        }
+
+    def summary(self) -> str:
+        return (
+            f"{self.total_bytes / 1_000_000:.1f} MB in {self.chunks_sent} chunks "
+            f"({self.retries} retries) at {self.throughput / 1_000_000:.2f} MB/s"
+        )
+
+class ChunkedUploader:
+    """
+    Streams a file to a resumable upload URL in Content-Range chunks.
+
+    Works with both the YouTube resumable protocol (308 + Range header)
+    and TikTok's chunked FILE_UPLOAD protocol (206 per chunk, 201 at the
+    end). Each chunk is read from disk only when it is about to be sent,
+    and a failed chunk is retried after asking the server how many bytes
+    it already committed, so a dropped connection never restarts the file.
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None, chunk_size: Optional[int] = None,
+                 max_retries: Optional[int] = None, backoff: float = 1.0, timeout: float = 60.0):
+        self.session = session or get_upload_session()
+        self.chunk_size = chunk_size or Config.UPLOAD_CHUNK_SIZE
+        self.max_retries = Config.UPLOAD_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+    def upload(self, upload_url: str, file_path: str, headers: Optional[Dict[str, str]] = None,
+               content_type: str = "video/mp4", merge_tail: bool = False) -> Tuple[requests.Response, UploadMetrics]:
+        """
+        Upload a file in chunks, resuming after transient failures.
+
+        Args:
+            upload_url (str): Session URL returned by the platform's init call
+            file_path (str): Path to the local file
+            headers (Dict[str, str]): Extra headers sent with every chunk
+            content_type (str): MIME type of the file
+            merge_tail (bool): See chunk_ranges()
+
+        Returns:
+            Tuple[requests.Response, UploadMetrics]: Final server response and metrics
+        """
+        total_size = os.path.getsize(file_path)
+        metrics = UploadMetrics(total_size)
+        ranges = chunk_ranges(total_size, self.chunk_size, merge_tail)
+        base_headers = dict(headers or {})
+        base_headers["Content-Type"] = content_type
+
+        with open(file_path, "rb") as video_file:
+            offset = 0
+            response = None
+            stalls = 0
+
+            while offset < total_size:
+                start, end = ranges[self._range_index(ranges, offset)]
+                # After a resume the server may hold part of this chunk already
+                start = max(start, offset)
+
+                video_file.seek(start)
+                body = video_file.read(end - start + 1)
+                chunk_headers = dict(base_headers)
+                chunk_headers["Content-Range"] = f"bytes {start}-{end}/{total_size}"
+
+                response, offset = self._send_chunk(upload_url, body, chunk_headers, metrics, total_size,
+                                                    start, end + 1)
+
+                if response.status_code in COMPLETE_STATUSES:
+                    metrics.finish()
+                    return response, metrics
+
+                # A server that acknowledges chunks without keeping them
+                # would otherwise be fed the same bytes forever
+                stalls = stalls + 1 if offset <= start else 0
+                if stalls > self.max_retries:
+                    raise UploadError(f"Server stopped committing data at byte {offset} of {total_size}")
+
+            metrics.finish()
+            raise UploadError(f"Server never acknowledged completion ({response.status_code if response is not None else 'no response'})")
+
+    def _send_chunk(self, upload_url: str, body: bytes, headers: Dict[str, str], metrics: UploadMetrics,
+                    total_size: int, chunk_start: int, chunk_end: int) -> Tuple[requests.Response, int]:
+        """
+        PUT one chunk, retrying with backoff.
+
+        Returns the last server response and the offset to continue from.
+        After a failure the server is asked for its committed offset, so the
+        caller resumes exactly where the server left off. If the server
+        holds none of the chunk, it is resent here against the same retry
+        budget, so a server that keeps failing can't stall the upload forever.
+        """
+        attempt = 0
+
+        while True:
+            try:
+                response = self.session.put(upload_url, data=body, headers=headers, timeout=self.timeout)
+
+                if response.status_code in COMPLETE_STATUSES or response.status_code in INCOMPLETE_STATUSES:
+                    metrics.bytes_sent += len(body)
+                    metrics.chunks_sent += 1
+                    # A 308 without a Range header means the server holds no bytes yet
+                    stored = 0 if response.status_code == 308 else chunk_end
+                    return response, self._committed_offset(response, stored)
+
+                if response.status_code < 500 and response.status_code != 429:
+                    raise UploadError(f"Chunk rejected: {response.status_code} - {response.text[:200]}")
+
+            except (requests.ConnectionError, requests.Timeout):
+                pass
+
+            attempt += 1
+            metrics.retries += 1
+
+            if attempt > self.max_retries:
+                raise UploadError(f"Chunk failed after {self.max_retries} retries")
+
+            time.sleep(self.backoff * (2 ** (attempt - 1)))
+
+            # Ask the server what it already has before resending anything
+            status_response = self._query_status(upload_url, headers, total_size)
+
+            if status_response is not None:
+                if status_response.status_code in COMPLETE_STATUSES:
+                    metrics.resumes += 1
+                    return status_response, total_size
+                committed = self._committed_offset(status_response, 0)
+                if committed != chunk_start:
+                    metrics.resumes += 1
+                    return status_response, committed
+
+    def _query_status(self, upload_url: str, headers: Dict[str, str], total_size: int) -> Optional[requests.Response]:
+        """Send an empty 'bytes */total' PUT to learn the committed offset."""
+        status_headers = dict(headers)
+        status_headers["Content-Range"] = f"bytes */{total_size}"
+
+        try:
+            response = self.session.put(upload_url, data=b"", headers=status_headers, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            return None
+
+        if response.status_code in COMPLETE_STATUSES or response.status_code in INCOMPLETE_STATUSES:
+            return response
+        return None
+
+    def _committed_offset(self, response: requests.Response, default: int) -> int:
+        """Parse a 'Range: bytes=0-N' header into the next offset to send."""
+        match = re.match(r"bytes=(\d+)-(\d+)", response.headers.get("Range", ""))
+        if match:
+            return int(match.group(2)) + 1
+        return default
+
+    def _range_index(self, ranges: List[Tuple[int, int]], offset: int) -> int:
+        for index, (start, end) in enumerate(ranges):
+            if start <= offset <= end:
+                return index
+        return len(ranges) - 1
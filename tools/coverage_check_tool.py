@@ -0,0 +1,32 @@
+from crewai_tools import BaseTool
+from content_index import ContentIndex
+
+class CoverageCheckTool(BaseTool):
+    name: str = "Coverage Check Tool"
+    description: str = "Check whether a trend or topic was already covered by a past video before spending searches or script work on it."
+    
+    def _run(self, topic: str) -> str:
+        """
+        Look up a topic in the index of past trends and scripts.
+        
+        Args:
+            topic (str): The trend or topic to check
+            
+        Returns:
+            str: Matching past videos, or a note that the topic is new
+        """
+        try:
+            hits = ContentIndex().already_covered(topic)
+            
+            if not hits:
+                return f"NOT COVERED: '{topic}' has no close match in past videos. Safe to research."
+            
+            lines = [f"ALREADY COVERED: '{topic}' matches {len(hits)} past item(s):"]
+            for hit in hits:
+                lines.append(f"- {hit['title']} (video {hit['ref']}, {int(hit['coverage'] * 100)}% overlap)")
+            lines.append("Pick a different trend or a clearly new angle.")
+            
+            return "\n".join(lines)
+            
+        except Exception as e:
+            return f"Error checking coverage: {str(e)}"
@@ -4,6 +4,7 @@ import time
 from typing import Dict, Any, Optional
 from crewai_tools import BaseTool
 from config import Config
+from script_similarity import get_script_index, minhash
 
 class HeldraAPITool(BaseTool):
     name: str = "Heldra API Tool"
@@ -22,8 +23,23 @@ class HeldraAPITool(BaseTool):
             str: Video generation result with URL or error message
         """
         try:
+            # Renders are the most expensive step: refuse near-copies of past scripts
+            script_index = get_script_index()
+            script_index.refresh()
+            signature = minhash(script)
+            duplicates = script_index.find_similar(signature=signature)
+            
+            if duplicates:
+                ref, score = duplicates[0]
+                return (
+                    f"Script rejected before rendering: {int(score * 100)}% similar to an existing script ({ref}). "
+                    "Write a fresh script with a new angle."
+                )
+            
             if Config.HELDRA_API_KEY == "your_heldra_api_key_here":
-                return self._mock_video_generation(script, voice_style, visual_style)
+                result = self._mock_video_generation(script, voice_style, visual_style)
+                script_index.add(f"heldra:mock:{int(time.time() * 1000)}", signature=signature)
+                return result
             
             # Prepare video generation request
             payload = {
@@ -62,7 +78,10 @@ class HeldraAPITool(BaseTool):
                 job_id = result.get("job_id")
                 
                 # Poll for completion
-                return self._poll_video_status(job_id, headers)
+                result = self._poll_video_status(job_id, headers)
+                if result.startswith("Video generated successfully"):
+                    script_index.add(f"heldra:{job_id}", signature=signature)
+                return result
             else:
                 return f"Error generating video: {response.status_code} - {response.text}"
                 
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from config import Config
+import db
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query so near-identical searches share a cache entry.
+
+    Lowercases, drops punctuation and sorts the words, so
+    "Tax season memes!" and "memes tax  season" hit the same key.
+    """
+    words = re.findall(r"[a-z0-9$%#@']+", query.lower())
+    return " ".join(sorted(set(words)))
+
+def cache_key(query: str, country: str, language: str) -> str:
+    normalized = f"{normalize_query(query)}|{country.lower()}|{language.lower()}"
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+class SearchCache:
+    """
+    Persistent search-result cache with stale-while-revalidate.
+
+    Entries younger than the TTL are served directly. Entries past the
+    TTL but inside the stale window are served immediately while a
+    background thread refreshes them, so callers only block on the
+    search API for queries they have never (or not recently) seen.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, ttl: Optional[float] = None, max_stale: Optional[float] = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self.ttl = Config.SEARCH_CACHE_TTL if ttl is None else ttl
+        self.max_stale = Config.SEARCH_CACHE_MAX_STALE if max_stale is None else max_stale
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+        conn = self.connect()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_cache (
+                cache_key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                country TEXT NOT NULL,
+                language TEXT NOT NULL,
+                results TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def connect(self):
+        return db.connect(self.db_path)
+
+    def get_or_fetch(self, query: str, country: str, language: str,
+                     fetch_fn: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return cached results for a query, fetching or refreshing as needed.
+
+        Args:
+            query (str): The search query
+            country (str): Country code (SerpAPI "gl")
+            language (str): Language code (SerpAPI "hl")
+            fetch_fn (Callable): Performs the real search; raising means "don't cache"
+
+        Returns:
+            Dict[str, Any]: Search results
+        """
+        key = cache_key(query, country, language)
+        entry = self._load(key)
+
+        if entry is not None:
+            results, fetched_at = entry
+            age = time.time() - fetched_at
+
+            if age < self.ttl:
+                return results
+            if age < self.ttl + self.max_stale:
+                self._refresh_in_background(key, query, country, language, fetch_fn)
+                return results
+
+        results = fetch_fn()
+        self._store(key, query, country, language, results)
+        return results
+
+    def _load(self, key: str):
+        conn = self.connect()
+        row = conn.execute(
+            'SELECT results, fetched_at FROM search_cache WHERE cache_key = ?', (key,)
+        ).fetchone()
+        conn.close()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def _store(self, key: str, query: str, country: str, language: str, results: Dict[str, Any]):
+        conn = self.connect()
+        conn.execute('''
+            INSERT OR REPLACE INTO search_cache (cache_key, query, country, language, results, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (key, query, country, language, json.dumps(results), time.time()))
+        conn.commit()
+        conn.close()
+
+    def _refresh_in_background(self, key: str, query: str, country: str, language: str,
+                               fetch_fn: Callable[[], Dict[str, Any]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, query, country, language, fetch_fn())
+            except Exception:
+                pass  # Keep serving the stale copy; the next hit retries
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="search-cache-refresh", daemon=True).start()
+
+    def purge(self) -> int:
+        """Delete entries too old to be served even as stale."""
+        conn = self.connect()
+        deleted = conn.execute(
+            'DELETE FROM search_cache WHERE fetched_at < ?',
+            (time.time() - self.ttl - self.max_stale,)
+        ).rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_search_cache() -> SearchCache:
+    """Get the process-wide search cache."""
+    global _cache
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = SearchCache()
+        return _cache
@@ -1,3 +1,4 @@
+import os
 import requests
 import json
 import schedule
@@ -6,6 +7,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List
 from crewai_tools import BaseTool
 from config import Config
+from .chunked_upload import ChunkedUploader, chunk_ranges, fetch_video, get_upload_session
 
 class PostToSocialTool(BaseTool):
     name: str = "Post to Social Media Tool"
@@ -19,7 +21,7 @@ class PostToSocialTool(BaseTool):
             video_path (str): Path to the video file
             caption (str): Caption for the post
             platforms (List[str]): List of platforms to post to
-            schedule_time (str): Optional schedule time (ISO format)
+            schedule_time (str): Optional schedule time (ISO format, or "auto" for the next free slot)
             
         Returns:
             str: Posting results for each platform
@@ -59,35 +61,53 @@ class PostToSocialTool(BaseTool):
             return f"Unsupported platform: {platform}"
     
     def _post_to_tiktok(self, video_path: str, caption: str) -> str:
-        """Post video to TikTok."""
+        """Post video to TikTok using the chunked FILE_UPLOAD flow."""
         try:
-            # TikTok API endpoint (simplified)
-            url = "https://open-api.tiktok.com/share/video/upload/"
+            video_path = fetch_video(video_path)
+            session = get_upload_session()
+            video_size = os.path.getsize(video_path)
+            # TikTok wants full-size chunks with the remainder folded into the last one
+            chunk_size = min(Config.UPLOAD_CHUNK_SIZE, video_size)
+            total_chunk_count = len(chunk_ranges(video_size, chunk_size, merge_tail=True))
             
             headers = {
                 "Authorization": f"Bearer {Config.TIKTOK_ACCESS_TOKEN}",
-                "Content-Type": "application/json"
+                "Content-Type": "application/json; charset=UTF-8"
             }
             
-            # Prepare video upload
-            with open(video_path, 'rb') as video_file:
-                files = {'video': video_file}
-                data = {
-                    'text': f"{caption} {Config.BRAND_HANDLE}",
-                    'privacy_level': 'SELF_ONLY',  # Start with private for testing
-                    'disable_duet': False,
-                    'disable_comment': False,
-                    'disable_stitch': False,
-                    'brand_content_toggle': False
+            # Open an upload session
+            init_payload = {
+                "post_info": {
+                    "title": f"{caption} {Config.BRAND_HANDLE}",
+                    "privacy_level": "SELF_ONLY",  # Start with private for testing
+                    "disable_duet": False,
+                    "disable_comment": False,
+                    "disable_stitch": False,
+                    "brand_content_toggle": False
+                },
+                "source_info": {
+                    "source": "FILE_UPLOAD",
+                    "video_size": video_size,
+                    "chunk_size": chunk_size,
+                    "total_chunk_count": total_chunk_count
                 }
-                
-                response = requests.post(url, headers=headers, data=data, files=files)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return f"Posted successfully! Video ID: {result.get('video_id', 'N/A')}"
-                else:
-                    return f"Error posting: {response.status_code}"
+            }
+            
+            response = session.post(
+                "https://open.tiktokapis.com/v2/post/publish/video/init/",
+                headers=headers,
+                json=init_payload,
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                return f"Error posting: {response.status_code}"
+            
+            data = response.json().get("data", {})
+            uploader = ChunkedUploader(chunk_size=chunk_size)
+            upload_response, metrics = uploader.upload(data["upload_url"], video_path, merge_tail=True)
+            
+            return f"Posted successfully! Publish ID: {data.get('publish_id', 'N/A')} ({metrics.summary()})"
                     
         except Exception as e:
             return f"TikTok posting error: {str(e)}"
@@ -105,7 +125,8 @@ class PostToSocialTool(BaseTool):
                 'access_token': Config.INSTAGRAM_ACCESS_TOKEN
             }
             
-            response = requests.post(url, params=params)
+            session = get_upload_session()
+            response = session.post(url, params=params, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -118,7 +139,7 @@ class PostToSocialTool(BaseTool):
                     'access_token': Config.INSTAGRAM_ACCESS_TOKEN
                 }
                 
-                publish_response = requests.post(publish_url, params=publish_params)
+                publish_response = session.post(publish_url, params=publish_params, timeout=30)
                 
                 if publish_response.status_code == 200:
                     return f"Posted successfully! Media ID: {media_id}"
@@ -131,14 +152,20 @@ class PostToSocialTool(BaseTool):
             return f"Instagram posting error: {str(e)}"
     
     def _post_to_youtube_shorts(self, video_path: str, caption: str) -> str:
-        """Post video to YouTube Shorts."""
+        """Post video to YouTube Shorts using a resumable upload session."""
         try:
+            video_path = fetch_video(video_path)
+            session = get_upload_session()
+            video_size = os.path.getsize(video_path)
+            
             # YouTube Data API v3
             url = "https://www.googleapis.com/upload/youtube/v3/videos"
             
             headers = {
                 "Authorization": f"Bearer {Config.YOUTUBE_API_KEY}",
-                "Content-Type": "application/json"
+                "Content-Type": "application/json; charset=UTF-8",
+                "X-Upload-Content-Type": "video/mp4",
+                "X-Upload-Content-Length": str(video_size)
             }
             
             metadata = {
@@ -153,29 +180,47 @@ class PostToSocialTool(BaseTool):
                 }
             }
             
-            with open(video_path, 'rb') as video_file:
-                files = {'video': video_file}
-                data = {'snippet': json.dumps(metadata)}
-                
-                response = requests.post(url, headers=headers, data=data, files=files)
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    return f"Posted successfully! Video ID: {result.get('id', 'N/A')}"
-                else:
-                    return f"Error posting: {response.status_code}"
+            # Open a resumable session; the upload URL comes back in Location
+            response = session.post(
+                url,
+                params={"uploadType": "resumable", "part": "snippet,status"},
+                headers=headers,
+                json=metadata,
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                return f"Error posting: {response.status_code}"
+            
+            uploader = ChunkedUploader()
+            upload_response, metrics = uploader.upload(
+                response.headers["Location"],
+                video_path,
+                headers={"Authorization": f"Bearer {Config.YOUTUBE_API_KEY}"}
+            )
+            
+            result = upload_response.json()
+            return f"Posted successfully! Video ID: {result.get('id', 'N/A')} ({metrics.summary()})"
                     
         except Exception as e:
             return f"YouTube posting error: {str(e)}"
     
     def _schedule_post(self, video_path: str, caption: str, platform: str, schedule_time: str) -> str:
-        """Schedule a post for later."""
+        """Store a post for the dispatcher to publish later."""
         try:
-            # Parse schedule time
-            scheduled_datetime = datetime.fromisoformat(schedule_time)
+            from scheduler import PostSchedule
+            
+            schedule_store = PostSchedule()
+            
+            # "auto" picks the platform's next free POSTS_PER_DAY slot
+            if schedule_time == "auto":
+                scheduled_datetime = schedule_store.next_slot(platform)
+            else:
+                scheduled_datetime = datetime.fromisoformat(schedule_time)
+            
+            post_id = schedule_store.add(video_path, caption, platform, scheduled_datetime.timestamp())
             
-            # For demo purposes, just return scheduled confirmation
-            return f"Scheduled for {scheduled_datetime.strftime('%Y-%m-%d %H:%M:%S')}"
+            return f"Scheduled for {scheduled_datetime.strftime('%Y-%m-%d %H:%M:%S')} (schedule ID: {post_id})"
             
         except Exception as e:
             return f"Error scheduling: {str(e)}"
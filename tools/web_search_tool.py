@@ -1,48 +1,162 @@
+import re
 import requests
 import json
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
 from crewai_tools import BaseTool
 from config import Config
+from content_index import ContentIndex
+from .search_cache import get_search_cache
+
+def _normalize_url(url: str) -> str:
+    """Reduce a URL to host + path so tracking params and www. don't split duplicates."""
+    parts = urlsplit(url or "")
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/')}"
+
+def _title_tokens(title: str) -> frozenset:
+    return frozenset(re.findall(r"[a-z0-9]+", (title or "").lower()))
+
+def _similar_titles(a: frozenset, b: frozenset, threshold: float = 0.8) -> bool:
+    if not a or not b:
+        return False
+    return len(a & b) / len(a | b) >= threshold
+
+def merge_results(results_by_query: Dict[str, Dict[str, Any]], top_n: int = 10) -> List[Dict[str, Any]]:
+    """
+    Merge organic results from several queries into one ranked list.
+
+    Results are deduplicated by normalized URL and by title similarity.
+    Each result scores 1 / (rank + 1) per query it appears in (reciprocal
+    rank fusion), so items several searches agree on float to the top.
+    """
+    merged = []
+    by_url = {}
+
+    for query, results in results_by_query.items():
+        for rank, result in enumerate(results.get("organic_results", [])):
+            url_key = _normalize_url(result.get("link"))
+            tokens = _title_tokens(result.get("title"))
+
+            entry = by_url.get(url_key) if url_key else None
+            if entry is None:
+                entry = next((e for e in merged if _similar_titles(e["tokens"], tokens)), None)
+
+            if entry is None:
+                entry = {"result": result, "tokens": tokens, "score": 0.0, "queries": []}
+                merged.append(entry)
+                if url_key:
+                    by_url[url_key] = entry
+
+            entry["score"] += 1.0 / (rank + 1)
+            if query not in entry["queries"]:
+                entry["queries"].append(query)
+
+    merged.sort(key=lambda e: e["score"], reverse=True)
+    return [dict(e["result"], score=round(e["score"], 3), queries=e["queries"]) for e in merged[:top_n]]
 
 class WebSearchTool(BaseTool):
     name: str = "Web Search Tool"
-    description: str = "Search the web for trending topics, viral content, and current events related to finance, lifestyle, or controversy."
+    description: str = (
+        "Search the web for trending topics, viral content, and current events related to finance, lifestyle, or controversy. "
+        "Pass several searches at once in `queries` to get one merged, deduplicated, ranked digest."
+    )
     
-    def _run(self, query: str) -> str:
+    def _run(self, query: Optional[str] = None, queries: Optional[List[str]] = None) -> str:
         """
         Search the web for trending topics and viral content.
         
         Args:
             query (str): The search query
+            queries (List[str]): Several queries to run concurrently and merge
             
         Returns:
             str: Formatted search results with trending topics
         """
         try:
+            if queries:
+                return self._run_batch(([query] if query else []) + list(queries))
+            if not query or not query.strip():
+                return "No search query given."
+            
             # Using SerpAPI for web search
             if Config.SERPAPI_API_KEY == "your_serpapi_key_here":
                 return self._mock_trending_results(query)
             
-            params = {
-                "q": query,
-                "api_key": Config.SERPAPI_API_KEY,
-                "engine": "google",
-                "num": 10,
-                "gl": "us",
-                "hl": "en"
-            }
-            
-            response = requests.get("https://serpapi.com/search", params=params)
-            
-            if response.status_code == 200:
-                results = response.json()
-                return self._format_search_results(results)
-            else:
-                return f"Error searching: {response.status_code}"
+            return self._format_search_results(self._cached_search(query))
                 
         except Exception as e:
             return f"Error during web search: {str(e)}"
     
+    def _run_batch(self, queries: List[str]) -> str:
+        """Run several queries concurrently and return one ranked digest."""
+        queries = list(dict.fromkeys(q.strip() for q in queries if q and q.strip()))
+        if not queries:
+            return "No search queries given: every query was blank."
+        
+        if Config.SERPAPI_API_KEY == "your_serpapi_key_here":
+            return self._mock_trending_results(", ".join(queries))
+        
+        results_by_query = {}
+        errors = []
+        
+        with ThreadPoolExecutor(max_workers=min(Config.SEARCH_CONCURRENCY, len(queries))) as executor:
+            futures = {q: executor.submit(self._cached_search, q) for q in queries}
+            for q, future in futures.items():
+                try:
+                    results_by_query[q] = future.result()
+                except Exception as e:
+                    errors.append(f"{q}: {str(e)}")
+        
+        digest = [f"MERGED RESULTS FOR {len(results_by_query)} SEARCHES"]
+        for position, result in enumerate(merge_results(results_by_query), 1):
+            digest.append(f"{position}. {result.get('title', 'N/A')}")
+            digest.append(f"   {result.get('snippet', 'N/A')}")
+            digest.append(f"   {result.get('link', 'N/A')} (matched: {', '.join(result['queries'])})")
+        
+        if errors:
+            digest.append("Failed searches: " + "; ".join(errors))
+        
+        return "\n".join(digest)
+    
+    def _cached_search(self, query: str) -> Dict[str, Any]:
+        """Search through the cache; stale entries refresh in the background."""
+        country, language = "us", "en"
+        return get_search_cache().get_or_fetch(
+            query, country, language,
+            lambda: self._fetch_results(query, country, language)
+        )
+    
+    def _fetch_results(self, query: str, country: str, language: str) -> Dict[str, Any]:
+        """Query SerpAPI and keep only the fields we format."""
+        params = {
+            "q": query,
+            "api_key": Config.SERPAPI_API_KEY,
+            "engine": "google",
+            "num": 10,
+            "gl": country,
+            "hl": language
+        }
+        
+        response = requests.get("https://serpapi.com/search", params=params, timeout=30)
+        
+        if response.status_code != 200:
+            raise RuntimeError(f"Error searching: {response.status_code}")
+        
+        results = response.json()
+        organic_results = [
+            {key: result.get(key) for key in ("title", "snippet", "link")}
+            for result in results.get("organic_results", [])
+        ]
+        
+        # Remember what we found so later runs can skip covered ground
+        ContentIndex().add_search_results(query, organic_results)
+        
+        return {"organic_results": organic_results}
+    
     def _format_search_results(self, results: Dict[str, Any]) -> str:
         """Format search results for the agent."""
         formatted_results = []
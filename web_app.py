@@ -4,289 +4,411 @@ McLan Tax Baby Video Creator - Web Dashboard
 Flask backend for the visual dashboard interface
 """
 
-from flask import Flask, jsonify, request, render_template, send_from_directory
+from flask import Blueprint, Flask, Response, g, jsonify, request, render_template
 from flask_cors import CORS
-import json
-import os
-import sqlite3
-from datetime import datetime, timedelta
+from typing import Optional
 import uuid
-from crew import BabyTaxVideoCrew
 from config import Config
-import threading
+from db import connect, get_pool, setup_lock
+from queries import get_video, parse_bulk_actions, parse_fields
+from storage.sqlite import SqliteVideoStore
+from assets import asset_url, send_static
+from json_provider import init_json
+from events import get_broker, start_change_feed
+from http_cache import change_etag, not_modified, request_params, with_validators
+from jobs import enqueue_job, get_job, init_jobs
+from outbox import cancel_posts, enqueue_post, init_outbox, outbox_rows
+from metrics_collector import init_metrics, query_rollups
 import time
 
-app = Flask(__name__)
-CORS(app)
+# Every route lives on this blueprint; create_app() builds the app around it
+routes = Blueprint('dashboard', __name__)
+
+broker = get_broker()
+
+# Video storage, opened by init_db()
+store = None
+
+# Demo videos for an empty database
+SAMPLE_VIDEOS = [
+    {
+        'trend': 'Tax Season Memes Go Viral on TikTok',
+        'script': 'Hey grownups! *giggles* So I heard you\'re all stressed about taxes again? I\'m literally three months old and even I know you should call McLan Tax! 👶💰',
+        'videoUrl': 'https://example.com/videos/sample1.mp4',
+        'captions': {
+            'tiktok': 'When this baby knows more about taxes than you do 😂👶 #BabyTax #TaxSeason #McLanTax #FYP',
+            'instagram': 'POV: A baby gives better tax advice than your accountant 💀 @mclantax #reels #viral #tax',
+            'youtube': 'Baby Gives SAVAGE Tax Advice (You Won\'t Believe What Happens Next!) #shorts #tax #baby'
+        }
+    },
+    {
+        'trend': 'Inflation Concerns Dominate Social Media',
+        'script': 'Listen up adults! *baby babbles* I may only eat milk and baby food, but even I know inflation is crazy! My diapers cost more than your tax deductions! Call McLan Tax! 👶💸',
+        'videoUrl': 'https://example.com/videos/sample2.mp4',
+        'captions': {
+            'tiktok': 'This baby understands inflation better than economists 📈👶 #InflationBaby #TaxTips #McLanTax',
+            'instagram': 'When even babies are worried about the economy 😅 Let @mclantax help! #inflation #baby #tax',
+            'youtube': 'Baby Explains Inflation Crisis (Adults Are Shocked!) #shorts #inflation #baby #finance'
+        }
+    }
+]
 
 # Database setup
-def init_db():
-    """Initialize the SQLite database."""
-    conn = sqlite3.connect('baby_videos.db')
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS videos (
-            id TEXT PRIMARY KEY,
-            trend TEXT NOT NULL,
-            script TEXT NOT NULL,
-            video_url TEXT,
-            captions TEXT,
-            status TEXT DEFAULT 'pending',
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            approved_at TIMESTAMP,
-            posted_platforms TEXT
-        )
-    ''')
+def init_db(seed: Optional[bool] = None):
+    """
+    Initialize the SQLite database and the video store on it.
+    
+    Safe to call from every worker process of a WSGI server: setup runs
+    under a file lock, so one process migrates (and seeds an empty
+    database) while the others wait and then find it done.
+    
+    Args:
+        seed (bool): Add the sample videos to an empty database (default: SEED_SAMPLE_VIDEOS)
+    """
+    global store
+    
+    with setup_lock():
+        # Runs the videos migrations and content index setup
+        store = SqliteVideoStore()
+        
+        conn = connect()
+        init_outbox(conn)
+        init_metrics(conn)
+        init_jobs(conn)
+        
+        conn.commit()
+        conn.close()
+        
+        if (Config.SEED_SAMPLE_VIDEOS if seed is None else seed) and store.stats()['total_videos'] == 0:
+            for video in SAMPLE_VIDEOS:
+                store.add({'id': str(uuid.uuid4()), **video})
+            print(f"🌱 Added {len(SAMPLE_VIDEOS)} sample videos")
+
+def create_app(seed: Optional[bool] = None) -> Flask:
+    """
+    Build the dashboard app (see wsgi.py).
+    
+    The web process only serves requests: generation runs as jobs in
+    worker.py, next to the posting outbox, metrics and the scheduler.
+    
+    Args:
+        seed (bool): Add the sample videos to an empty database (default: SEED_SAMPLE_VIDEOS)
+    """
+    init_db(seed)
     
-    conn.commit()
-    conn.close()
+    # static/ is served by static_files() below, with hashed builds cached long-term
+    app = Flask(__name__, static_folder=None)
+    app.add_template_global(asset_url)
+    init_json(app)
+    CORS(app, expose_headers=['X-Next-Cursor', 'X-Sync-Cursor'])
+    app.register_blueprint(routes)
+    
+    return app
 
 def get_db_connection():
-    """Get database connection."""
-    conn = sqlite3.connect('baby_videos.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get this request's database connection, borrowed from the pool."""
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+@routes.teardown_app_request
+def release_db_connection(exception=None):
+    """Return the request's connection to the pool."""
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+def queue_posts(conn, video_id):
+    """Queue an approved video's posts inside the approval transaction."""
+    video = get_video(conn, video_id, ('trend', 'videoUrl', 'captions'))
+    
+    # The outbox sender does the uploads; approval never waits on them
+    for platform in Config.PLATFORMS:
+        caption = video['captions'].get(Config.CAPTION_KEYS.get(platform, platform), video['trend'])
+        enqueue_post(conn, video_id, platform, video['videoUrl'], caption)
 
 # API Routes
-@app.route('/api/videos', methods=['GET'])
+@routes.route('/api/videos', methods=['GET'])
 def get_videos():
-    """Get all pending videos for review."""
-    conn = get_db_connection()
+    """
+    Get one page of videos for review, newest first.
     
+    Query params: status (default pending), limit (max 100), cursor (from
+    the previous page's X-Next-Cursor header) and fields (comma-separated
+    projection, e.g. fields=id,trend,status for list views). archived=1
+    pages through videos archive.py has moved out of the live database.
+    
+    With since=<X-Sync-Cursor> it instead returns only what changed after
+    that point: {changes, deleted, cursor, has_more}.
+    
+    Responses carry an ETag; a matching If-None-Match gets a 304 without
+    any row being read.
+    """
     # Get filter parameters
     status = request.args.get('status', 'pending')
     limit = request.args.get('limit', 20, type=int)
+    since = request.args.get('since')
     
-    videos = conn.execute(
-        'SELECT * FROM videos WHERE status = ? ORDER BY created_at DESC LIMIT ?',
-        (status, limit)
-    ).fetchall()
-    
-    conn.close()
-    
-    # Convert to JSON format
-    video_list = []
-    for video in videos:
-        captions = json.loads(video['captions']) if video['captions'] else {}
-        video_data = {
-            'id': video['id'],
-            'trend': video['trend'],
-            'script': video['script'],
-            'videoUrl': video['video_url'],
-            'captions': captions,
-            'status': video['status'],
-            'created_at': video['created_at'],
-            'approved_at': video['approved_at'],
-            'posted_platforms': video['posted_platforms']
-        }
-        video_list.append(video_data)
+    # Read before listing: anything committed in between shows up (at
+    # worst twice) in the next delta, and only makes the ETag stale
+    sync_cursor = store.version()
+    etag = change_etag(sync_cursor, 'videos', request_params())
+    sync_header = [('X-Sync-Cursor', str(sync_cursor))]
+    
+    cached = not_modified(etag, sync_header)
+    if cached:
+        return cached
+    
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        
+        if since is not None:
+            if not since.isdigit():
+                raise ValueError('Invalid since cursor')
+            return with_validators(jsonify(store.changes_since(int(since), limit, fields)), etag)
+        
+        list_page = store.list_archived if request.args.get('archived') in ('1', 'true') else store.list
+        video_list, next_cursor = list_page(status, limit, request.args.get('cursor'), fields)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    # The body stays a plain list; paging and sync cursors travel in headers
+    response = with_validators(jsonify(video_list), etag, sync_header)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+@routes.route('/api/videos/search', methods=['GET'])
+def search_videos():
+    """
+    Full-text search over trends, scripts and captions, best match first.
+    
+    Query params: q (every word must match, the last as a prefix),
+    status (optional), limit (max 100) and fields. Each result also has a
+    `snippet`: HTML-escaped text with the matches in <mark> tags.
+    """
+    etag = change_etag(store.version(), 'search', request_params())
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    return jsonify(video_list)
+    try:
+        fields = parse_fields(request.args.get('fields'))
+        results = store.search(
+            request.args.get('q', ''),
+            request.args.get('status') or None,
+            request.args.get('limit', 20, type=int),
+            fields
+        )
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    
+    return with_validators(jsonify(results), etag)
 
-@app.route('/api/videos/<video_id>/approve', methods=['POST'])
+@routes.route('/api/videos/<video_id>/approve', methods=['POST'])
 def approve_video(video_id):
-    """Approve a video and post it to social media."""
+    """Approve a video and queue it for posting to social media."""
+    # Status change and posting work commit together or not at all
+    found, = store.review([(video_id, 'approve')], on_approve=queue_posts)
+    
+    if not found:
+        return jsonify({'success': False, 'message': 'Video not found'}), 404
+    
+    return jsonify({
+        'success': True, 
+        'message': 'Video approved and queued for posting to all platforms',
+        'platforms': Config.PLATFORMS,
+        'progress_url': f'/api/videos/{video_id}/posts'
+    }), 202
+
+@routes.route('/api/videos/<video_id>/posts', methods=['GET'])
+def get_video_posts(video_id):
+    """Get per-platform posting progress for an approved video."""
     conn = get_db_connection()
+    rows = outbox_rows(conn, video_id)
     
-    # Update video status
-    conn.execute(
-        'UPDATE videos SET status = ?, approved_at = ? WHERE id = ?',
-        ('approved', datetime.now().isoformat(), video_id)
-    )
-    conn.commit()
+    if not rows:
+        return jsonify({'success': False, 'message': 'No posts queued for this video'}), 404
+    
+    platforms = [{
+        'platform': row['platform'],
+        'status': row['status'],
+        'attempts': row['attempts'],
+        'last_error': row['last_error'],
+        'result': row['result'],
+        'sent_at': row['sent_at']
+    } for row in rows]
+    
+    return jsonify({
+        'video_id': video_id,
+        'platforms': platforms,
+        'done': all(p['status'] in ('sent', 'failed', 'unconfirmed') for p in platforms)
+    })
+
+@routes.route('/api/videos/bulk', methods=['POST'])
+def bulk_review_videos():
+    """
+    Approve and/or reject many videos in one transaction (one commit).
     
-    # Get video data for posting
-    video = conn.execute(
-        'SELECT * FROM videos WHERE id = ?', (video_id,)
-    ).fetchone()
+    Body: {"ids": [...], "action": "approve" | "reject"} or
+    {"actions": [{"id": ..., "action": ...}, ...]}. Each id gets its own
+    result; unknown ids fail individually without undoing the rest, and
+    the response is a 404 when none of them exist.
+    """
+    try:
+        items = parse_bulk_actions(request.get_json(silent=True))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
-    conn.close()
+    results = []
     
-    if video:
-        # TODO: Integrate with actual social media posting
-        # For now, simulate posting
-        posted_platforms = ['tiktok', 'instagram', 'youtube_shorts']
-        
-        conn = get_db_connection()
-        conn.execute(
-            'UPDATE videos SET posted_platforms = ? WHERE id = ?',
-            (json.dumps(posted_platforms), video_id)
-        )
-        conn.commit()
-        conn.close()
-        
-        return jsonify({
-            'success': True, 
-            'message': 'Video approved and posted to all platforms',
-            'platforms': posted_platforms
-        })
+    outcomes = store.review(items, on_approve=queue_posts, on_reject=cancel_posts)
+    
+    for (video_id, action), found in zip(items, outcomes):
+        result = {'id': video_id, 'action': action, 'success': found}
+        if not found:
+            result['message'] = 'Video not found'
+        elif action == 'approve':
+            result['progress_url'] = f'/api/videos/{video_id}/posts'
+        results.append(result)
     
-    return jsonify({'success': False, 'message': 'Video not found'}), 404
+    updated = [result['id'] for result in results if result['success']]
+    if not updated:
+        return jsonify({'success': False, 'message': 'Videos not found', 'updated': 0, 'results': results}), 404
+    
+    return jsonify({
+        'success': len(updated) == len(results),
+        'updated': len(updated),
+        'results': results
+    })
 
-@app.route('/api/videos/<video_id>/reject', methods=['POST'])
+@routes.route('/api/videos/<video_id>/reject', methods=['POST'])
 def reject_video(video_id):
-    """Reject a video."""
-    conn = get_db_connection()
+    """Reject a video and cancel any of its posts that haven't gone out yet."""
+    # Rejecting after approval: the status change and the cancellation commit together
+    found, = store.review([(video_id, 'reject')], on_reject=cancel_posts)
     
-    conn.execute(
-        'UPDATE videos SET status = ? WHERE id = ?',
-        ('rejected', video_id)
-    )
-    conn.commit()
-    conn.close()
+    if not found:
+        return jsonify({'success': False, 'message': 'Video not found'}), 404
     
     return jsonify({'success': True, 'message': 'Video rejected'})
 
-@app.route('/api/videos/generate', methods=['POST'])
+@routes.route('/api/videos/generate', methods=['POST'])
 def generate_video():
-    """Generate a new video using CrewAI."""
-    try:
-        # Run CrewAI in background thread
-        def run_crew():
-            baby_crew = BabyTaxVideoCrew()
-            result = baby_crew.run_daily_content_creation()
-            
-            # Parse CrewAI result and save to database
-            # For demo purposes, create mock data
-            video_id = str(uuid.uuid4())
-            
-            mock_data = {
-                'id': video_id,
-                'trend': 'Tax Season Memes Go Viral on TikTok',
-                'script': 'Hey grownups! So I heard you\'re all stressed about taxes again? I\'m literally three months old and even I know you should call McLan Tax! They make taxes as easy as taking candy from a baby! 👶💰',
-                'video_url': f'https://example.com/videos/baby_tax_video_{int(time.time())}.mp4',
-                'captions': json.dumps({
-                    'tiktok': 'When this baby knows more about taxes than you do 😂👶 #BabyTax #TaxSeason #McLanTax #FYP',
-                    'instagram': 'POV: A baby gives better tax advice than your accountant 💀 This little one knows what\'s up! 👶✨ @mclantax #reels #viral #tax',
-                    'youtube': 'Baby Gives SAVAGE Tax Advice (You Won\'t Believe What Happens Next!) #shorts #tax #baby #viral'
-                }),
-                'status': 'pending'
-            }
-            
-            conn = get_db_connection()
-            conn.execute('''
-                INSERT INTO videos (id, trend, script, video_url, captions, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                mock_data['id'], mock_data['trend'], mock_data['script'],
-                mock_data['video_url'], mock_data['captions'], mock_data['status']
-            ))
-            conn.commit()
-            conn.close()
-        
-        # Start generation in background
-        thread = threading.Thread(target=run_crew)
-        thread.daemon = True
-        thread.start()
-        
-        return jsonify({
-            'success': True, 
-            'message': 'Video generation started in background'
-        })
-        
-    except Exception as e:
-        return jsonify({
-            'success': False, 
-            'message': f'Error generating video: {str(e)}'
-        }), 500
+    """Queue a video generation job for worker.py (CrewAI runs there, not in the web process)."""
+    conn = get_db_connection()
+    with conn:
+        job_id = enqueue_job(conn, 'generate')
+    
+    return jsonify({
+        'success': True, 
+        'message': 'Video generation queued',
+        'job_id': job_id,
+        'status_url': f'/api/jobs/{job_id}'
+    }), 202
+
+@routes.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Get a background job's status (queued, running, done, failed or unconfirmed) and result."""
+    job = get_job(get_db_connection(), job_id)
+    
+    if job is None:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    
+    return jsonify(job)
+
+@routes.route('/api/events', methods=['GET'])
+def stream_events():
+    """Stream live dashboard updates as Server-Sent Events."""
+    # On threaded workers each stream holds a request thread for as long
+    # as the tab is open; past the cap the dashboard falls back to polling
+    if broker.subscriber_count() >= Config.SSE_MAX_CLIENTS:
+        response = jsonify({'success': False, 'message': 'Too many live connections'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    
+    # Writes from any process (other web workers, worker.py) reach the
+    # broker through the change feed, started by the first subscriber
+    start_change_feed(store)
+    
+    return Response(
+        broker.stream(request.headers.get('Last-Event-ID')),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
-@app.route('/api/stats', methods=['GET'])
+@routes.route('/api/stats', methods=['GET'])
 def get_stats():
-    """Get dashboard statistics."""
-    conn = get_db_connection()
+    """Get dashboard statistics (trigger-maintained counters, cached briefly)."""
+    # recent_videos is a sliding 7-day window, so the ETag also rolls
+    # over every minute even when nothing was written
+    change_seq = store.version()
+    etag = change_etag(change_seq, 'stats', int(time.time() // 60))
     
-    # Get counts by status
-    pending_count = conn.execute(
-        'SELECT COUNT(*) FROM videos WHERE status = ?', ('pending',)
-    ).fetchone()[0]
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    approved_count = conn.execute(
-        'SELECT COUNT(*) FROM videos WHERE status = ?', ('approved',)
-    ).fetchone()[0]
+    return with_validators(jsonify(store.stats()), etag)
+
+@routes.route('/api/stats/timeseries', methods=['GET'])
+def get_stats_timeseries():
+    """
+    Videos created, approved, rejected and posted per hour or day, for charts.
     
-    rejected_count = conn.execute(
-        'SELECT COUNT(*) FROM videos WHERE status = ?', ('rejected',)
-    ).fetchone()[0]
+    Query params: bucket (hour or day, default hour) and days (default 7).
+    Points run oldest first with zeros for quiet buckets; posted is also
+    broken down per platform.
+    """
+    etag = change_etag(store.version(), 'timeseries', request_params(), int(time.time() // 60))
     
-    # Get recent activity
-    recent_videos = conn.execute(
-        'SELECT COUNT(*) FROM videos WHERE created_at > ?',
-        (datetime.now() - timedelta(days=7),)
-    ).fetchone()[0]
+    cached = not_modified(etag)
+    if cached:
+        return cached
     
-    conn.close()
+    try:
+        series = store.timeseries(request.args.get('bucket', 'hour'), request.args.get('days', 7, type=int))
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
     
-    return jsonify({
-        'pending': pending_count,
-        'approved': approved_count,
-        'rejected': rejected_count,
-        'recent_videos': recent_videos,
-        'total_videos': pending_count + approved_count + rejected_count
-    })
+    return with_validators(jsonify(series), etag)
+
+@routes.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Get engagement gained per hour or day, per platform."""
+    bucket = request.args.get('bucket', 'hour')
+    days = request.args.get('days', 7, type=int)
+    platform = request.args.get('platform')
+    
+    if bucket not in ('hour', 'day'):
+        return jsonify({'success': False, 'message': 'bucket must be hour or day'}), 400
+    
+    conn = get_db_connection()
+    rollups = query_rollups(conn, bucket, time.time() - days * 86400, platform)
+    
+    return jsonify({'bucket': bucket, 'rollups': rollups})
 
 # Web Routes
-@app.route('/')
+@routes.route('/')
 def dashboard():
     """Serve the main dashboard page."""
     return render_template('dashboard.html')
 
-@app.route('/static/<path:filename>')
+@routes.route('/static/<path:filename>')
 def static_files(filename):
-    """Serve static files."""
-    return send_from_directory('static', filename)
+    """Serve static files (precompressed and long-cached for hashed builds)."""
+    return send_static(filename)
 
-# Initialize database on startup
 if __name__ == '__main__':
-    init_db()
-    
-    # Add some sample data for demo
-    conn = get_db_connection()
-    
-    # Check if we already have sample data
-    existing = conn.execute('SELECT COUNT(*) FROM videos').fetchone()[0]
-    
-    if existing == 0:
-        sample_videos = [
-            {
-                'id': str(uuid.uuid4()),
-                'trend': 'Tax Season Memes Go Viral on TikTok',
-                'script': 'Hey grownups! *giggles* So I heard you\'re all stressed about taxes again? I\'m literally three months old and even I know you should call McLan Tax! 👶💰',
-                'video_url': 'https://example.com/videos/sample1.mp4',
-                'captions': json.dumps({
-                    'tiktok': 'When this baby knows more about taxes than you do 😂👶 #BabyTax #TaxSeason #McLanTax #FYP',
-                    'instagram': 'POV: A baby gives better tax advice than your accountant 💀 @mclantax #reels #viral #tax',
-                    'youtube': 'Baby Gives SAVAGE Tax Advice (You Won\'t Believe What Happens Next!) #shorts #tax #baby'
-                })
-            },
-            {
-                'id': str(uuid.uuid4()),
-                'trend': 'Inflation Concerns Dominate Social Media',
-                'script': 'Listen up adults! *baby babbles* I may only eat milk and baby food, but even I know inflation is crazy! My diapers cost more than your tax deductions! Call McLan Tax! 👶💸',
-                'video_url': 'https://example.com/videos/sample2.mp4',
-                'captions': json.dumps({
-                    'tiktok': 'This baby understands inflation better than economists 📈👶 #InflationBaby #TaxTips #McLanTax',
-                    'instagram': 'When even babies are worried about the economy 😅 Let @mclantax help! #inflation #baby #tax',
-                    'youtube': 'Baby Explains Inflation Crisis (Adults Are Shocked!) #shorts #inflation #baby #finance'
-                })
-            }
-        ]
-        
-        for video in sample_videos:
-            conn.execute('''
-                INSERT INTO videos (id, trend, script, video_url, captions, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                video['id'], video['trend'], video['script'],
-                video['video_url'], video['captions'], 'pending'
-            ))
-        
-        conn.commit()
+    app = create_app()
     
-    conn.close()
+    # Single-process development: run the background work alongside the
+    # dev server (deployments run wsgi.py and worker.py separately)
+    from worker import start_workers
+    start_workers()
     
     print("🍼 McLan Tax Baby Video Dashboard Starting...")
     print("📱 Dashboard: http://localhost:5000")
     print("🔌 API: http://localhost:5000/api/videos")
     
-    app.run(debug=True, port=5000) 
\ No newline at end of file
+    app.run(debug=True, port=5000)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+McLan Tax Baby Video Creator - Worker
+Background work kept out of the web processes: generation jobs, posting, metrics and scheduled posts
+"""
+
+import argparse
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from config import Config
+from db import setup_lock
+from jobs import JobRunner
+from metrics_collector import MetricsCollector
+from outbox import OutboxSender
+from scheduler import PostDispatcher, PostSchedule
+from storage.sqlite import SqliteVideoStore
+
+COMPONENTS = ('jobs', 'outbox', 'metrics', 'scheduler')
+
+def job_handlers(store: SqliteVideoStore) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """Handlers for each job kind the web app queues."""
+
+    def generate(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the crew and store the new video for review."""
+        # Imported here so only processes that generate load CrewAI
+        from crew import BabyTaxVideoCrew
+
+        baby_crew = BabyTaxVideoCrew()
+        baby_crew.run_daily_content_creation()
+
+        # Parse CrewAI result and save to database
+        # For demo purposes, create mock data
+        video_id = str(uuid.uuid4())
+
+        store.add({
+            'id': video_id,
+            'trend': 'Tax Season Memes Go Viral on TikTok',
+            'script': 'Hey grownups! So I heard you\'re all stressed about taxes again? I\'m literally three months old and even I know you should call McLan Tax! They make taxes as easy as taking candy from a baby! 👶💰',
+            'videoUrl': f'https://example.com/videos/baby_tax_video_{int(time.time())}.mp4',
+            'captions': {
+                'tiktok': 'When this baby knows more about taxes than you do 😂👶 #BabyTax #TaxSeason #McLanTax #FYP',
+                'instagram': 'POV: A baby gives better tax advice than your accountant 💀 This little one knows what\'s up! 👶✨ @mclantax #reels #viral #tax',
+                'youtube': 'Baby Gives SAVAGE Tax Advice (You Won\'t Believe What Happens Next!) #shorts #tax #baby #viral'
+            },
+            'status': 'pending'
+        })
+        return {'video_id': video_id}
+
+    return {'generate': generate}
+
+# Job kinds that must not run twice: rerunning generate pays for another render
+AT_MOST_ONCE_JOBS = ('generate',)
+
+def start_workers(components: Sequence[str] = COMPONENTS, db_path: Optional[str] = None,
+                  job_threads: int = 1) -> List[threading.Thread]:
+    """
+    Start the background threads for the given components.
+
+    Every component coordinates through the database (leases, unique
+    keys), so several worker processes can run side by side.
+
+    Returns:
+        List[threading.Thread]: The started threads (each has stop())
+    """
+    with setup_lock(db_path):
+        store = SqliteVideoStore(db_path)
+
+        threads: List[threading.Thread] = []
+        if 'jobs' in components:
+            handlers = job_handlers(store)
+            threads += [JobRunner(handlers, db_path, at_most_once=AT_MOST_ONCE_JOBS) for _ in range(job_threads)]
+        if 'outbox' in components:
+            threads.append(OutboxSender(db_path))
+        if 'metrics' in components:
+            threads.append(MetricsCollector(db_path))
+        if 'scheduler' in components:
+            threads.append(PostDispatcher(PostSchedule(db_path)))
+
+    for thread in threads:
+        thread.start()
+    return threads
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the dashboard\'s background work')
+    parser.add_argument('--only', default=','.join(COMPONENTS),
+                        help=f"Comma-separated components to run (default: {','.join(COMPONENTS)})")
+    parser.add_argument('--job-threads', type=int, default=1, help='Jobs run at once by this process')
+    args = parser.parse_args()
+
+    components = [name.strip() for name in args.only.split(',') if name.strip()]
+    unknown = set(components) - set(COMPONENTS)
+    if unknown:
+        parser.error(f"Unknown components: {', '.join(sorted(unknown))}")
+
+    threads = start_workers(components, job_threads=args.job_threads)
+
+    print(f"👷 McLan Tax worker running: {', '.join(components)}")
+    print(f"🗄️ Database: {Config.DATABASE_PATH}")
+
+    try:
+        while all(thread.is_alive() for thread in threads):
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n🛑 Worker stopped")
+        for thread in threads:
+            thread.stop()
+
+if __name__ == "__main__":
+    main()
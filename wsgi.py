@@ -0,0 +1,8 @@
+"""
+McLan Tax Baby Video Creator - WSGI Entry Point
+The dashboard app for production servers, e.g. gunicorn --workers 4 wsgi:app
+"""
+
+from web_app import create_app
+
+app = create_app()